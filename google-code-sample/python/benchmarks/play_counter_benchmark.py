@@ -0,0 +1,30 @@
+"""Measures the cost of recording a play in the TOP_PLAYED counter.
+
+Run from the python/ directory with:
+    python3 -m benchmarks.play_counter_benchmark
+"""
+from src.heavy_hitters import SpaceSaving
+import random
+import timeit
+
+PLAYS = 200_000
+
+
+def _zipf_stream(catalog_size, plays, seed=0):
+    """Returns video ids drawn with a long-tailed popularity distribution."""
+    rng = random.Random(seed)
+    return [f"video_{min(int(rng.paretovariate(1.1)), catalog_size)}"
+            for _ in range(plays)]
+
+
+if __name__ == "__main__":
+    for catalog_size in (1_000, 1_000_000):
+        stream = _zipf_stream(catalog_size, PLAYS)
+        for capacity in (100, 1000, 10000):
+            counter = SpaceSaving(capacity)
+            seconds = timeit.timeit(
+                "for video_id in stream: add(video_id)", number=1,
+                globals={"stream": stream, "add": counter.add})
+            print(f"catalog {catalog_size:>9,}  capacity {capacity:>6,}: "
+                  f"{seconds / PLAYS * 1e9:7.0f} ns per play, "
+                  f"error bound {counter.error_bound:.1f} plays")
@@ -0,0 +1,54 @@
+"""Measures what watch time accounting adds to each play/pause transition.
+
+Run from the python/ directory with:
+    python3 -m benchmarks.watch_time_benchmark
+"""
+from src import playback_history
+from src.watch_time import WatchTimeAggregate, WatchTimeRecorder
+import os
+import random
+import tempfile
+import timeit
+
+EVENTS = 200_000
+
+
+def _events(catalog_size, count, seed=0):
+    """Returns (video_id, event) pairs cycling through play, pause, continue, stop."""
+    rng = random.Random(seed)
+    cycle = (playback_history.PLAY, playback_history.PAUSE,
+             playback_history.CONTINUE, playback_history.STOP)
+    events = []
+    for _ in range(count // len(cycle)):
+        video_id = f"video_{rng.randrange(catalog_size)}"
+        events.extend((video_id, event) for event in cycle)
+    return events
+
+
+def _measure(aggregate, events, batch_size):
+    """Returns the mean seconds record() takes per transition."""
+    recorder = WatchTimeRecorder(aggregate, batch_size=batch_size)
+    seconds = timeit.timeit(
+        "for video_id, event in events: record(video_id, event)", number=1,
+        globals={"events": events, "record": recorder.record})
+    return seconds / len(events)
+
+
+if __name__ == "__main__":
+    events = _events(100_000, EVENTS)
+    for batch_size in (1, 64, 256, 4096):
+        print(f"batch size {batch_size:>5,}: "
+              f"{_measure(WatchTimeAggregate(), events, batch_size) * 1e9:7.0f} "
+              "ns per transition")
+    # A file-backed aggregate already holding totals for many videos, so the
+    # cost of persisting each merge shows up
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "watch_time.txt")
+        WatchTimeAggregate(path).merge(
+            {f"video_{number}": 1 for number in range(200_000)}, {})
+        for batch_size in (64, 256, 4096):
+            aggregate = WatchTimeAggregate(path)
+            print(f"batch size {batch_size:>5,}, file with "
+                  f"{len(aggregate):,} videos: "
+                  f"{_measure(aggregate, events, batch_size) * 1e9:7.0f} "
+                  "ns per transition")
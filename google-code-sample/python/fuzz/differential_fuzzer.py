@@ -0,0 +1,249 @@
+"""Differential fuzzer comparing VideoPlayer with the reference model.
+
+Generates random command sequences over synthetic catalogs, runs each one
+through the optimized VideoPlayer and through ReferenceVideoPlayer, compares
+their output line by line and shrinks any failing sequence to a minimal one.
+
+Run from the python/ directory with:
+    python3 -m fuzz.differential_fuzzer --runs 200 --engine sqlite
+"""
+from fuzz.reference_player import ReferenceVideoPlayer
+from src.command_parser import CommandParser
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+from unittest import mock
+import argparse
+import contextlib
+import io
+import random
+import sys
+
+_TITLE_WORDS = ("Amazing", "Cat", "cats", "Dog", "Google", "Life", "at",
+                "Funny", "Video", "Another")
+# Mixed-case spellings catch backends that fold case differently
+_TAGS = ("#cat", "#Cat", "#dog", "#DOG", "#animal", "#google", "#funny", "#life")
+_PLAYLIST_NAMES = ("mix", "MIX", "Favs", "chill", "not found")
+_FLAG_REASONS = ("spam", "dont_like_cats", "")
+_ANSWERS = ("1", "2", "3", "0", "-1", "10", "no", " 2")
+
+
+def make_catalog(rng, size):
+    """Returns a list of (title, video_id, tags) records.
+
+    Titles are built from a small vocabulary so searches hit several videos,
+    and may repeat.
+    """
+    records = []
+    for number in range(size):
+        title = " ".join(rng.choice(_TITLE_WORDS) for _ in range(rng.randint(1, 3)))
+        tags = rng.sample(_TAGS, rng.randint(0, 3))
+        records.append((title, f"video_{number}_id", tags))
+    return records
+
+
+def generate_commands(rng, records, length):
+    """Returns a list of (command, answer) steps.
+
+    Args:
+        rng: The random.Random to draw from.
+        records: The catalog the commands refer to.
+        length: The number of steps.
+
+    Returns:
+        Steps where command is a list of words and answer is the line typed
+        at the search prompt (None for commands that do not prompt).
+    """
+    video_ids = [video_id for _, video_id, _ in records] + ["missing_video_id"]
+
+    def video_id():
+        return rng.choice(video_ids)
+
+    def playlist():
+        return rng.choice(_PLAYLIST_NAMES)
+
+    generators = (
+        (3, lambda: ["PLAY", video_id()]),
+        (2, lambda: ["PLAY_RANDOM"]),
+        (1, lambda: ["STOP"]),
+        (1, lambda: ["PAUSE"]),
+        (1, lambda: ["CONTINUE"]),
+        (1, lambda: ["SHOW_PLAYING"]),
+        (1, lambda: ["NUMBER_OF_VIDEOS"]),
+        (1, lambda: ["SHOW_ALL_VIDEOS"]),
+        (2, lambda: ["FLAG_VIDEO", video_id()] + [
+            reason for reason in [rng.choice(_FLAG_REASONS)] if reason]),
+        (2, lambda: ["ALLOW_VIDEO", video_id()]),
+        (1, lambda: ["CREATE_PLAYLIST", playlist()]),
+        (3, lambda: ["ADD_TO_PLAYLIST", playlist(), video_id()]),
+        (2, lambda: ["REMOVE_FROM_PLAYLIST", playlist(), video_id()]),
+        (1, lambda: ["SHOW_PLAYLIST", playlist()]),
+        (1, lambda: ["SHOW_ALL_PLAYLISTS"]),
+        (1, lambda: ["CLEAR_PLAYLIST", playlist()]),
+        (1, lambda: ["DELETE_PLAYLIST", playlist()]),
+        (2, lambda: ["SEARCH_VIDEOS", rng.choice(_TITLE_WORDS).lower()]),
+        (2, lambda: ["SEARCH_VIDEOS_WITH_TAG", rng.choice(_TAGS + ("#CAT", "cat"))]),
+    )
+    weights = [weight for weight, _ in generators]
+    makers = [maker for _, maker in generators]
+    steps = []
+    for _ in range(length):
+        command = rng.choices(makers, weights)[0]()
+        answer = rng.choice(_ANSWERS) if command[0].startswith("SEARCH") else None
+        steps.append((command, answer))
+    return steps
+
+
+def memory_engine(records):
+    """Returns a VideoPlayer over the in-memory VideoLibrary."""
+    def build_library():
+        library = VideoLibrary()
+        for video in list(library.videos()):
+            library.remove_video(video.video_id)
+        for title, video_id, tags in records:
+            library.add_video(Video(title, video_id, tags, library.tag_dictionary))
+        return library
+    return VideoPlayer(library_factory=build_library)
+
+
+def sqlite_engine(records):
+    """Returns a VideoPlayer over SqliteVideoLibrary and SqlitePlaylist."""
+    library = SqliteVideoLibrary()
+    for title, video_id, tags in records:
+        library.add_video(Video(title, video_id, tags))
+    return VideoPlayer(library_factory=lambda: library,
+                       playlist_factory=library.create_playlist)
+
+
+ENGINES = {"memory": memory_engine, "sqlite": sqlite_engine}
+
+
+def run_engine(engine, records, steps, seed=0):
+    """Runs steps through an optimized player.
+
+    Returns:
+        (outputs, random_choices): the output lines of each step and the ids
+        of the videos PLAY_RANDOM picked, in order.
+    """
+    random.seed(seed)
+    player = engine(records)
+    parser = CommandParser(player)
+    outputs = []
+    random_choices = []
+    try:
+        for step in steps:
+            output, = _run(parser, [step])
+            outputs.append(output)
+            if step[0][0] == "PLAY_RANDOM" and output and \
+                    output[-1].startswith("Playing video:"):
+                random_choices.append(player._current_video_id)
+    finally:
+        close = getattr(player._video_library, "close", None)
+        if close:
+            close()
+    return outputs, random_choices
+
+
+def _run(parser, steps):
+    """Runs steps through a command parser and returns the output lines of each."""
+    outputs = []
+    for command, answer in steps:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), \
+                mock.patch("builtins.input", return_value=answer or ""):
+            parser.execute_command(command)
+        outputs.append(output.getvalue().splitlines())
+    return outputs
+
+
+def find_divergence(engine, records, steps, seed=0):
+    """Runs steps through both players and compares their output.
+
+    Returns:
+        None if the outputs match, else (index, expected, actual) for the
+        first step whose output differs.
+    """
+    actual, random_choices = run_engine(engine, records, steps, seed)
+    expected = _run(
+        CommandParser(ReferenceVideoPlayer(records, random_choices)), steps)
+    for index, (expected_lines, actual_lines) in enumerate(zip(expected, actual)):
+        if expected_lines != actual_lines:
+            return index, expected_lines, actual_lines
+    return None
+
+
+def shrink(fails, steps):
+    """Returns a minimal sub-sequence of steps for which fails() holds.
+
+    Uses delta debugging: removes ever smaller chunks of steps while the
+    failure persists, ending with single steps, so removing any one step
+    from the result makes it pass.
+
+    Args:
+        fails: Callable taking a list of steps and returning a boolean.
+        steps: A failing list of steps.
+    """
+    chunk = len(steps) // 2
+    while chunk >= 1:
+        start = 0
+        while start < len(steps):
+            candidate = steps[:start] + steps[start + chunk:]
+            if candidate and fails(candidate):
+                steps = candidate
+            else:
+                start += chunk
+        chunk //= 2
+    return steps
+
+
+def fuzz(engine, runs, length, catalog_size, seed=0):
+    """Fuzzes an engine against the reference model.
+
+    Returns:
+        None if every run matched, else (records, steps, divergence) for
+        the first failing run, with steps shrunk to a minimal sequence.
+    """
+    for run in range(runs):
+        rng = random.Random(seed + run)
+        records = make_catalog(rng, catalog_size)
+        steps = generate_commands(rng, records, length)
+        if find_divergence(engine, records, steps, seed + run) is None:
+            continue
+        steps = shrink(
+            lambda candidate: find_divergence(
+                engine, records, candidate, seed + run) is not None,
+            steps)
+        return records, steps, find_divergence(engine, records, steps, seed + run)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="memory")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--videos", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    failure = fuzz(ENGINES[args.engine], args.runs, args.steps, args.videos, args.seed)
+    if failure is None:
+        print(f"{args.runs} runs of {args.steps} commands matched the reference model")
+        return 0
+    records, steps, (index, expected, actual) = failure
+    print("Catalog:")
+    for title, video_id, tags in records:
+        print(f"\t{title} | {video_id} | {','.join(tags)}")
+    print("Minimal failing sequence:")
+    for command, answer in steps:
+        print(f"\t{' '.join(command)}" + (f"  (answer: {answer!r})" if answer is not None else ""))
+    print(f"Step {index + 1} expected:")
+    print("\n".join(f"\t{line}" for line in expected))
+    print("but got:")
+    print("\n".join(f"\t{line}" for line in actual))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
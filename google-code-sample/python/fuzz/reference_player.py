@@ -0,0 +1,240 @@
+"""A reference video player class.
+
+It keeps the original, straightforward implementation of the core commands
+(linear scans over a dict of videos, list-based playlists) so the optimized
+VideoPlayer can be checked against it. Keep it simple rather than fast.
+"""
+
+
+class ReferenceVideo:
+    """A plain video record."""
+
+    def __init__(self, title, video_id, tags):
+        self.title = title
+        self.video_id = video_id
+        self.tags = tuple(tags)
+        self.flag_reason = ""
+
+    def __str__(self):
+        description = f"{self.title} ({self.video_id}) [{' '.join(self.tags)}]"
+        if self.flag_reason:
+            description += f" - FLAGGED (reason: {self.flag_reason})"
+        return description
+
+
+class ReferencePlaylist:
+    """A playlist holding a list of video ids."""
+
+    def __init__(self, title):
+        self.title = title
+        self.videos = []
+
+
+class ReferenceVideoPlayer:
+    """The reference model of VideoPlayer for the core commands."""
+
+    def __init__(self, records, random_choices=()):
+        """The ReferenceVideoPlayer class is initialized.
+
+        Args:
+            records: (title, video_id, tags) tuples making up the catalog.
+            random_choices: Video ids that PLAY_RANDOM picks, in order. The
+                optimized player draws randomly, so the harness replays its
+                picks here and this model only checks they were valid.
+        """
+        self._videos = {video_id: ReferenceVideo(title, video_id, tags)
+                        for title, video_id, tags in records}
+        self._random_choices = iter(random_choices)
+        self._current_video_id = ""
+        self._paused = False
+        self._playlists = {}
+
+    def number_of_videos(self):
+        print(f"{len(self._videos)} videos in the library")
+
+    def show_all_videos(self):
+        print("Here's a list of all available videos:")
+        for video in sorted(self._videos.values(), key=lambda v: v.title):
+            print(f"\t{video}")
+
+    def play_video(self, video_id):
+        video = self._videos.get(video_id)
+        if not video:
+            print("Cannot play video: Video does not exist")
+        elif video.flag_reason:
+            print(f"Cannot play video: Video is currently flagged (reason: {video.flag_reason})")
+        else:
+            self._stop_current_video()
+            self._current_video_id = video_id
+            print(f"Playing video: {video.title}")
+
+    def stop_video(self):
+        if self._current_video_id:
+            self._stop_current_video()
+        else:
+            print("Cannot stop video: No video is currently playing")
+
+    def _stop_current_video(self):
+        if self._current_video_id:
+            print(f"Stopping video: {self._videos[self._current_video_id].title}")
+            self._current_video_id = ""
+            self._paused = False
+
+    def play_random_video(self):
+        available = [video for video in self._videos.values() if not video.flag_reason]
+        if not available:
+            print("No videos available")
+            return
+        choice = next(self._random_choices, None)
+        video = self._videos.get(choice)
+        if video not in available:
+            print(f"Invalid random choice: {choice}")
+            return
+        self._stop_current_video()
+        self._current_video_id = video.video_id
+        print(f"Playing video: {video.title}")
+
+    def pause_video(self):
+        if self._paused:
+            print(f"Video already paused: {self._videos[self._current_video_id].title}")
+        elif self._current_video_id:
+            self._paused = True
+            print(f"Pausing video: {self._videos[self._current_video_id].title}")
+        else:
+            print("Cannot pause video: No video is currently playing")
+
+    def continue_video(self):
+        if self._paused:
+            self._paused = False
+            print(f"Continuing video: {self._videos[self._current_video_id].title}")
+        elif self._current_video_id:
+            print("Cannot continue video: Video is not paused")
+        else:
+            print("Cannot continue video: No video is currently playing")
+
+    def show_playing(self):
+        if self._current_video_id:
+            paused_status = " - PAUSED" if self._paused else ""
+            print(f"Currently playing: {self._videos[self._current_video_id]}{paused_status}")
+        else:
+            print("No video is currently playing")
+
+    def create_playlist(self, playlist_name):
+        if " " in playlist_name:
+            return
+        if playlist_name.lower() in self._playlists:
+            print("Cannot create playlist: A playlist with the same name already exists")
+        else:
+            self._playlists[playlist_name.lower()] = ReferencePlaylist(playlist_name)
+            print(f"Successfully created new playlist: {playlist_name}")
+
+    def add_to_playlist(self, playlist_name, video_id):
+        playlist = self._playlists.get(playlist_name.lower())
+        video = self._videos.get(video_id)
+        if not playlist:
+            print(f"Cannot add video to {playlist_name}: Playlist does not exist")
+        elif not video:
+            print(f"Cannot add video to {playlist_name}: Video does not exist")
+        elif video.flag_reason:
+            print(f"Cannot add video to {playlist_name}: Video is currently flagged (reason: {video.flag_reason})")
+        elif video_id in playlist.videos:
+            print(f"Cannot add video to {playlist_name}: Video already added")
+        else:
+            playlist.videos.append(video_id)
+            print(f"Added video to {playlist_name}: {video.title}")
+
+    def show_all_playlists(self):
+        if self._playlists:
+            print("Showing all playlists:")
+            for name in sorted(self._playlists):
+                print(f"\t{self._playlists[name].title}")
+        else:
+            print("No playlists exist yet")
+
+    def show_playlist(self, playlist_name):
+        playlist = self._playlists.get(playlist_name.lower())
+        if not playlist:
+            print(f"Cannot show playlist {playlist_name}: Playlist does not exist")
+            return
+        print(f"Showing playlist: {playlist_name}")
+        if playlist.videos:
+            for video_id in playlist.videos:
+                print(f"\t{self._videos[video_id]}")
+        else:
+            print("\tNo videos here yet")
+
+    def remove_from_playlist(self, playlist_name, video_id):
+        playlist = self._playlists.get(playlist_name.lower())
+        if not playlist:
+            print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        elif video_id in playlist.videos:
+            playlist.videos.remove(video_id)
+            print(f"Removed video from {playlist_name}: {self._videos[video_id].title}")
+        elif video_id in self._videos:
+            print(f"Cannot remove video from {playlist_name}: Video is not in playlist")
+        else:
+            print(f"Cannot remove video from {playlist_name}: Video does not exist")
+
+    def clear_playlist(self, playlist_name):
+        playlist = self._playlists.get(playlist_name.lower())
+        if playlist:
+            playlist.videos.clear()
+            print(f"Successfully removed all videos from {playlist_name}")
+        else:
+            print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+
+    def delete_playlist(self, playlist_name):
+        if self._playlists.pop(playlist_name.lower(), None):
+            print(f"Deleted playlist: {playlist_name}")
+        else:
+            print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
+
+    def search_videos(self, search_term):
+        self._show_results(search_term, [
+            video for video in self._videos.values()
+            if search_term.lower() in video.title.lower()])
+
+    def search_videos_tag(self, video_tag):
+        self._show_results(video_tag, [
+            video for video in self._videos.values()
+            if video_tag.lower() in video.tags])
+
+    def _show_results(self, query, videos):
+        videos = sorted((video for video in videos if not video.flag_reason),
+                        key=lambda v: v.title)
+        if not videos:
+            print(f"No search results for {query}")
+            return
+        print(f"Here are the results for {query}:")
+        for number, video in enumerate(videos, start=1):
+            print(f"\t{number}) {video}")
+        print("Would you like to play any of the above? If yes, specify the number of the video.")
+        print("If your answer is not a valid number, we will assume it's a no.")
+        try:
+            answer = int(input())
+        except ValueError:
+            return
+        if 0 < answer <= len(videos):
+            self.play_video(videos[answer - 1].video_id)
+
+    def flag_video(self, video_id, flag_reason=""):
+        video = self._videos.get(video_id)
+        if not video:
+            print("Cannot flag video: Video does not exist")
+        elif video.flag_reason:
+            print("Cannot flag video: Video is already flagged")
+        else:
+            video.flag_reason = flag_reason or "Not supplied"
+            if video_id == self._current_video_id:
+                self.stop_video()
+            print(f"Successfully flagged video: {video.title} (reason: {video.flag_reason})")
+
+    def allow_video(self, video_id):
+        video = self._videos.get(video_id)
+        if not video:
+            print("Cannot remove flag from video: Video does not exist")
+        elif video.flag_reason:
+            video.flag_reason = ""
+            print(f"Successfully removed flag from video: {video.title}")
+        else:
+            print("Cannot remove flag from video: Video is not flagged")
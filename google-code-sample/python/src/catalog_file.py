@@ -0,0 +1,127 @@
+"""Opening of plain or compressed catalog files."""
+
+import io
+import queue
+import threading
+
+# Leading bytes identifying each supported compression format.
+_MAGIC_NUMBERS = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "lzma"),
+)
+
+# Compressed data is decompressed in chunks of this many bytes, and at most
+# _MAX_CHUNKS chunks wait to be parsed, which bounds the memory in flight.
+_CHUNK_SIZE = 1 << 16
+_MAX_CHUNKS = 16
+
+_END = None  # queued after the last chunk
+
+
+def detect_compression(path):
+    """Returns "gzip", "bz2" or "lzma" from the leading bytes of a file, or
+    None if it is not compressed."""
+    with open(path, "rb") as catalog:
+        head = catalog.read(6)
+    for magic, compression in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_compressed(path, compression):
+    if compression == "gzip":
+        import gzip
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        import bz2
+        return bz2.open(path, "rb")
+    import lzma
+    return lzma.open(path, "rb")
+
+
+class _DecompressingReader(io.RawIOBase):
+    """A binary stream of the decompressed bytes of a file.
+
+    A background thread decompresses the file into a bounded queue while the
+    caller parses what is already there; the decompression modules release
+    the GIL, so both run at the same time. Nothing is written to disk.
+    """
+
+    def __init__(self, path, compression, chunk_size, max_chunks):
+        self._chunks = queue.Queue(max_chunks)
+        self._closing = threading.Event()
+        self._pending = b""
+        self._finished = False
+        self._thread = threading.Thread(
+            target=self._decompress, args=(path, compression, chunk_size),
+            daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        """Queues an item, giving up if the reader is closed meanwhile."""
+        while not self._closing.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _decompress(self, path, compression, chunk_size):
+        try:
+            with _open_compressed(path, compression) as compressed:
+                while True:
+                    chunk = compressed.read(chunk_size)
+                    if not chunk or not self._put(chunk):
+                        break
+        except Exception as e:
+            self._put(e)
+        self._put(_END)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._pending and not self._finished:
+            chunk = self._chunks.get()
+            if isinstance(chunk, Exception):
+                self._finished = True
+                raise chunk
+            if chunk is _END:
+                self._finished = True
+            else:
+                self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._closing.set()
+            self._thread.join()
+        super().close()
+
+
+def open_catalog(path):
+    """Opens a catalog file for reading text, decompressing it on the fly.
+
+    gzip, bz2 and xz/lzma files are recognized by their contents rather than
+    their names and are streamed through a background decompression thread.
+
+    Args:
+        path: The path of the catalog file.
+
+    Returns:
+        A text file object; close it (or use it as a context manager) to stop
+        the decompression thread.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path)
+    return io.TextIOWrapper(
+        io.BufferedReader(
+            _DecompressingReader(path, compression, _CHUNK_SIZE, _MAX_CHUNKS),
+            _CHUNK_SIZE))
@@ -1,7 +1,6 @@
 """A command parser class."""
 
-import textwrap
-from typing import Sequence
+from collections.abc import Sequence
 
 
 class CommandException(Exception):
@@ -51,6 +50,21 @@ class CommandParser:
         elif command[0].upper() == "SHOW_PLAYING":
             self._player.show_playing()
 
+        elif command[0].upper() == "HISTORY":
+            self._player.show_history(*self._optional_count(command, "HISTORY"))
+
+        elif command[0].upper() == "RECENTLY_PLAYED":
+            self._player.show_recently_played(
+                *self._optional_count(command, "RECENTLY_PLAYED"))
+
+        elif command[0].upper() == "WATCH_TIME":
+            self._player.show_watch_time(
+                *self._optional_count(command, "WATCH_TIME"))
+
+        elif command[0].upper() == "TOP_PLAYED":
+            self._player.show_top_played(
+                *self._optional_count(command, "TOP_PLAYED"))
+
         elif command[0].upper() == "CREATE_PLAYLIST":
             if len(command) != 2:
                 raise CommandException(
@@ -72,6 +86,22 @@ class CommandParser:
                     "playlist name and video_id to remove.")
             self._player.remove_from_playlist(command[1], command[2])
 
+        elif command[0].upper() == "ADD_MANY_TO_PLAYLIST":
+            if len(command) < 3:
+                raise CommandException(
+                    "Please enter ADD_MANY_TO_PLAYLIST command followed by a "
+                    "playlist name and video_ids or @file to add.")
+            self._player.add_many_to_playlist(
+                command[1], self._read_video_ids(command[2:]))
+
+        elif command[0].upper() == "REMOVE_MANY_FROM_PLAYLIST":
+            if len(command) < 3:
+                raise CommandException(
+                    "Please enter REMOVE_MANY_FROM_PLAYLIST command followed "
+                    "by a playlist name and video_ids or @file to remove.")
+            self._player.remove_many_from_playlist(
+                command[1], self._read_video_ids(command[2:]))
+
         elif command[0].upper() == "CLEAR_PLAYLIST":
             if len(command) != 2:
                 raise CommandException(
@@ -93,6 +123,15 @@ class CommandParser:
                     "playlist name.")
             self._player.show_playlist(command[1])
 
+        elif command[0].upper() in ("UNION_PLAYLISTS", "INTERSECT_PLAYLISTS",
+                                    "DIFF_PLAYLISTS"):
+            if len(command) < 4:
+                raise CommandException(
+                    f"Please enter {command[0].upper()} command followed by a "
+                    "new playlist name and two or more playlist names.")
+            self._player.combine_playlists(
+                command[0].upper().split("_")[0], command[1], command[2:])
+
         elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
             self._player.show_all_playlists()
 
@@ -110,6 +149,39 @@ class CommandParser:
                     "video tag.")
             self._player.search_videos_tag(command[1])
 
+        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAGS":
+            if len(command) < 2:
+                raise CommandException(
+                    "Please enter SEARCH_VIDEOS_WITH_TAGS command followed by "
+                    "a tag expression.")
+            self._player.search_videos_tag_query(" ".join(command[1:]))
+
+        elif command[0].upper() == "SEARCH_VIDEOS_MATCHING":
+            if len(command) < 3 or command[1].upper() not in ("REGEX", "GLOB"):
+                raise CommandException(
+                    "Please enter SEARCH_VIDEOS_MATCHING command followed by "
+                    "REGEX or GLOB and a pattern.")
+            self._player.search_videos_matching(
+                " ".join(command[2:]), glob=command[1].upper() == "GLOB")
+
+        elif command[0].upper() == "RELATED":
+            if len(command) not in (2, 3):
+                raise CommandException(
+                    "Please enter RELATED command followed by a video_id and "
+                    "an optional number of videos.")
+            self._player.show_related_videos(
+                command[1], *self._optional_count(command[1:], "RELATED"))
+
+        elif command[0].upper() == "FACETS":
+            self._player.show_facets()
+
+        elif command[0].upper() == "PLAY_RESULT":
+            if len(command) != 2 or not command[1].isdigit():
+                raise CommandException(
+                    "Please enter PLAY_RESULT command followed by the number "
+                    "of a search result.")
+            self._player.play_result(int(command[1]))
+
         elif command[0].upper() == "FLAG_VIDEO":
             if len(command) == 3:
                 self._player.flag_video(command[1], command[2])
@@ -127,6 +199,25 @@ class CommandParser:
                     "video_id.")
             self._player.allow_video(command[1])
 
+        elif command[0].upper() == "MODERATE_VIDEOS":
+            if len(command) != 2:
+                raise CommandException(
+                    "Please enter MODERATE_VIDEOS command followed by the "
+                    "path of a moderation file.")
+            self._player.moderate_videos(self._read_moderation_rows(command[1]))
+
+        elif command[0].upper() == "CACHE_STATS":
+            self._player.search_cache_stats()
+
+        elif command[0].upper() == "MEMORY":
+            if len(command) == 1:
+                self._player.show_memory_report()
+            elif len(command) == 2 and command[1].upper() == "STOP":
+                self._player.stop_memory_tracing()
+            else:
+                raise CommandException(
+                    "Please enter MEMORY command optionally followed by STOP.")
+
         elif command[0].upper() == "HELP":
             self._get_help()
         else:
@@ -134,8 +225,60 @@ class CommandParser:
                 "Please enter a valid command, type HELP for a list of "
                 "available commands.")
 
+    @staticmethod
+    def _optional_count(command, name):
+        """Returns the optional positive count argument of a command as a
+        list of zero or one ints. Raises CommandException if it is invalid.
+        """
+        if len(command) == 1:
+            return []
+        if len(command) == 2 and command[1].isdigit() and int(command[1]) > 0:
+            return [int(command[1])]
+        raise CommandException(
+            f"Please enter {name} command optionally followed by a "
+            "positive number.")
+
+    @staticmethod
+    def _read_video_ids(arguments):
+        """Returns the video ids given as arguments. An argument of the form
+        @path is replaced by the whitespace separated ids in that file.
+        Raises CommandException if a file cannot be read.
+        """
+        video_ids = []
+        for argument in arguments:
+            if argument.startswith("@"):
+                try:
+                    with open(argument[1:]) as id_file:
+                        video_ids.extend(id_file.read().split())
+                except OSError as e:
+                    raise CommandException(
+                        f"Cannot read video ids from {argument[1:]}: "
+                        f"{e.strerror}")
+            else:
+                video_ids.append(argument)
+        return video_ids
+
+    @staticmethod
+    def _read_moderation_rows(path):
+        """Returns the (video_id, action, reason) rows of a moderation file.
+        Raises CommandException if it cannot be read or is malformed.
+        """
+        from .moderation import ModerationException, read_moderation_rows
+
+        try:
+            with open(path) as moderation_file:
+                return read_moderation_rows(moderation_file)
+        except OSError as e:
+            raise CommandException(
+                f"Cannot read moderation file {path}: {e.strerror}")
+        except ModerationException as e:
+            raise CommandException(
+                f"Cannot apply moderation file {path}: {e}")
+
     def _get_help(self):
         """Displays all available commands to the user."""
+        import textwrap  # only needed here, so kept out of startup
+
         help_text = textwrap.dedent("""
         Available commands:
             NUMBER_OF_VIDEOS - Shows how many videos are in the library.
@@ -146,17 +289,34 @@ class CommandParser:
             PAUSE - Pause the current video.
             CONTINUE - Resume the current paused video.
             SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
+            HISTORY [count] - Displays the most recent playback events of this session.
+            RECENTLY_PLAYED [count] - Displays the most recently played videos.
+            TOP_PLAYED [count] - Displays the most played videos.
+            WATCH_TIME [count] - Displays the videos watched for longest, with their play counts.
             CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
             ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
             REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
+            ADD_MANY_TO_PLAYLIST <playlist_name> <video_id|@file>... - Adds many videos to the playlist at once.
+            REMOVE_MANY_FROM_PLAYLIST <playlist_name> <video_id|@file>... - Removes many videos from the playlist at once.
+            UNION_PLAYLISTS <new_playlist_name> <playlist_name>... - Creates a playlist with the videos of any of the playlists.
+            INTERSECT_PLAYLISTS <new_playlist_name> <playlist_name>... - Creates a playlist with the videos in all of the playlists.
+            DIFF_PLAYLISTS <new_playlist_name> <playlist_name>... - Creates a playlist with the videos of the first playlist that are in none of the others.
             CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
             DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
             SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
             SHOW_ALL_PLAYLISTS - Display all the available playlists.
             SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
             SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
+            SEARCH_VIDEOS_WITH_TAGS <expression> - Display all videos whose tags match an expression such as "#cat AND NOT (#dog OR #bird)".
+            SEARCH_VIDEOS_MATCHING <REGEX|GLOB> <pattern> - Display all the videos whose titles match a regex, or a glob such as "*cat*".
+            RELATED <video_id> [count] - Display the videos whose tags are most similar to those of a video.
+            FACETS - Displays how many of the most recent search results carry each tag.
+            PLAY_RESULT <number> - Plays a video from the most recent search results.
             FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
             ALLOW_VIDEO <video_id> - Removes a flag from a video.
+            MODERATE_VIDEOS <file> - Applies a file of "video_id | FLAG or ALLOW | reason" rows as one batch.
+            CACHE_STATS - Displays hit, miss and eviction statistics of the search cache.
+            MEMORY [STOP] - Displays memory used by the library, playlists and session (starts allocation tracing on first use), or stops tracing.
             HELP - Displays help.
             EXIT - Terminates the program execution.
         """)
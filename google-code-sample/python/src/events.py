@@ -0,0 +1,38 @@
+"""Change notifications for libraries and playlists."""
+
+from collections import namedtuple
+
+VIDEO_ADDED = "video_added"
+VIDEO_REMOVED = "video_removed"
+VIDEO_REPLACED = "video_replaced"  # same id, new title, tags or flag
+VIDEO_FLAGGED = "video_flagged"
+VIDEO_UNFLAGGED = "video_unflagged"
+PLAYLIST_VIDEOS_ADDED = "playlist_videos_added"
+PLAYLIST_VIDEOS_REMOVED = "playlist_videos_removed"
+
+# kind: one of the constants above.
+# source: the library or playlist that changed.
+# video_ids: tuple of the ids of the affected videos.
+ChangeEvent = namedtuple("ChangeEvent", "kind source video_ids")
+
+
+class EventBus:
+    """Delivers ChangeEvents synchronously to subscribed callbacks."""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Registers a callable taking a ChangeEvent."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a callable registered with subscribe()."""
+        self._subscribers.remove(callback)
+
+    def publish(self, kind, source, video_ids):
+        """Sends an event to every subscriber, in subscription order."""
+        if self._subscribers:
+            event = ChangeEvent(kind, source, tuple(video_ids))
+            for callback in list(self._subscribers):
+                callback(event)
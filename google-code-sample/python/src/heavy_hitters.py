@@ -0,0 +1,87 @@
+"""A streaming heavy-hitters counter class."""
+
+
+class SpaceSaving:
+    """Approximate most-frequent items of a stream in bounded memory.
+
+    Implements the Space-Saving algorithm (Metwally et al.) with the
+    Stream-Summary layout: at most `capacity` items are monitored, grouped
+    into buckets by count, so every update is O(1). When a new item arrives
+    and all counters are taken, the item with the smallest count is replaced
+    and the newcomer inherits that count plus one.
+
+    Error bounds, with N the total number of updates and m the capacity:
+      * an item's estimated count is never below its true count, and
+        overestimates it by at most its recorded error, which is <= N / m;
+      * every item occurring more than N / m times is monitored, so the
+        top k reported are exact whenever they all occur more than N / m times.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._capacity = capacity
+        self._counts = {}  # item -> estimated count
+        self._errors = {}  # item -> maximum overestimation
+        self._buckets = {}  # count -> set of items with that count
+        self._min_count = 0
+        self._total = 0
+
+    def add(self, item):
+        """Records one occurrence of an item."""
+        self._total += 1
+        count = self._counts.get(item)
+        if count is None:
+            if len(self._counts) < self._capacity:
+                count, error = 0, 0
+            else:
+                count = self._min_count
+                bucket = self._buckets[count]
+                evicted = bucket.pop()
+                if not bucket:
+                    del self._buckets[count]
+                del self._counts[evicted]
+                del self._errors[evicted]
+                error = count
+            self._errors[item] = error
+        else:
+            bucket = self._buckets[count]
+            bucket.discard(item)
+            if not bucket:
+                del self._buckets[count]
+        self._counts[item] = count + 1
+        self._buckets.setdefault(count + 1, set()).add(item)
+        # Counts only grow by one, so the minimum can only become 1 (a fresh
+        # item) or move up by one when its bucket has just emptied
+        if count == 0:
+            self._min_count = 1
+        elif count == self._min_count and count not in self._buckets:
+            self._min_count = count + 1
+
+    def estimate(self, item):
+        """Returns (estimated count, maximum overestimation) of an item;
+        (0, 0) if it is not monitored."""
+        return self._counts.get(item, 0), self._errors.get(item, 0)
+
+    def top(self, k):
+        """Returns up to k (item, estimated count) pairs, most frequent first."""
+        top = []
+        for count in sorted(self._buckets, reverse=True):
+            for item in sorted(self._buckets[count], key=str):
+                if len(top) == k:
+                    return top
+                top.append((item, count))
+        return top
+
+    @property
+    def total(self):
+        """Returns the number of occurrences recorded."""
+        return self._total
+
+    @property
+    def error_bound(self):
+        """Returns the largest possible overestimation of any count (N / m)."""
+        return self._total / self._capacity
+
+    def __len__(self):
+        return len(self._counts)
@@ -0,0 +1,184 @@
+"""A JSON-lines output mode for the video player."""
+
+from .command_parser import CommandException, CommandParser
+from .tag_query import TagQueryException
+from .video_player import VideoPlayer
+import contextlib
+import json
+import re
+import sys
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def video_record(video, **extra):
+    """Returns the JSON-serializable record describing a video."""
+    record = {
+        "type": "video",
+        "video_id": video.video_id,
+        "title": video.title,
+        "tags": list(video.tags),
+        "flag_reason": video.flag_reason,
+    }
+    record.update(extra)
+    return record
+
+
+class _MessageCollector:
+    """A stdout replacement turning each printed line into a message record."""
+
+    def __init__(self, emit):
+        self._emit = emit
+        self._partial = ""
+
+    def write(self, text):
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._emit({"type": "message", "text": line})
+        return len(text)
+
+    def flush(self):
+        if self._partial:
+            self._emit({"type": "message", "text": self._partial})
+            self._partial = ""
+
+
+class JsonLinesVideoPlayer(VideoPlayer):
+    """A video player whose listings produce records instead of text.
+
+    Commands that list data (videos, playlists, search results, the playing
+    video) append structured records to a buffer; JsonLinesCommandParser
+    serializes the buffer once per command. Searches never prompt for a
+    selection in this mode; use PLAY_RESULT instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._records = []
+
+    def emit(self, record):
+        """Appends a record to the buffer."""
+        self._records.append(record)
+
+    def take_records(self):
+        """Returns and clears the records produced since the last call."""
+        records, self._records = self._records, []
+        return records
+
+    def number_of_videos(self):
+        self._records.append({"type": "count", "videos": len(self._video_library)})
+
+    def show_all_videos(self):
+        videos = sorted(self._video_library.videos(), key=lambda v: v.title)
+        self._records.extend(map(video_record, videos))
+
+    def show_playing(self):
+        if self._current_video_id:
+            video = self._video_library.get_video(self._current_video_id)
+            self._records.append(video_record(video, playing=True, paused=self._paused))
+        else:
+            super().show_playing()
+
+    def show_all_playlists(self):
+        self._records.extend(
+            {"type": "playlist", "title": self._playlists[name].title}
+            for name in sorted(self._playlists))
+
+    def show_top_played(self, count=10):
+        self._records.extend(
+            video_record(video, rank=rank, plays=plays)
+            for rank, (video, plays) in enumerate(self.query_top_played(count), 1))
+
+    def show_watch_time(self, count=10):
+        self._records.extend(
+            video_record(video, rank=rank, plays=plays, seconds=seconds)
+            for rank, (video, plays, seconds) in enumerate(self.query_watch_time(count), 1))
+
+    def show_playlist(self, playlist_name):
+        playlist = self._playlists.get(playlist_name.lower())
+        if playlist is None:
+            super().show_playlist(playlist_name)
+            return
+        video_ids = playlist.view()
+        self._records.append({"type": "playlist", "title": playlist.title,
+                              "videos": len(video_ids)})
+        get_video = self._video_library.get_video
+        self._records.extend(
+            video_record(get_video(video_id), playlist=playlist.title)
+            for video_id in video_ids)
+
+    def _add_results(self, results):
+        self._records.append({"type": "results", "query": results.query,
+                              "count": len(results)})
+        self._records.extend(
+            video_record(video, rank=rank) for rank, video in enumerate(results, 1))
+
+    def show_related_videos(self, video_id, count=5):
+        results = self.query_related_videos(video_id, count)
+        if results is None:
+            super().show_related_videos(video_id, count)
+        else:
+            self._add_results(results)
+
+    def show_facets(self):
+        facets = self.query_facets()
+        if facets is None:
+            super().show_facets()
+        else:
+            self._records.extend(
+                {"type": "facet", "tag": tag, "count": count} for tag, count in facets)
+
+    def search_videos(self, search_term):
+        self._add_results(self.query_videos(search_term))
+
+    def search_videos_tag(self, video_tag):
+        self._add_results(self.query_videos_tag(video_tag))
+
+    def search_videos_matching(self, pattern, glob=False):
+        try:
+            results = self.query_videos_matching(pattern, glob)
+        except re.error as e:
+            self._records.append({"type": "error", "message": f"Invalid pattern ({e})"})
+            return
+        self._add_results(results)
+
+    def search_videos_tag_query(self, expression):
+        try:
+            results = self.query_videos_tag_query(expression)
+        except TagQueryException as e:
+            self._records.append({"type": "error", "message": str(e)})
+            return
+        self._add_results(results)
+
+
+class JsonLinesCommandParser(CommandParser):
+    """A command parser writing one JSON object per line for every command.
+
+    Text printed by commands without a structured form becomes
+    {"type": "message"} records, and invalid commands become
+    {"type": "error"} records instead of raising CommandException.
+    """
+
+    def __init__(self, video_player, stream=None):
+        """The JsonLinesCommandParser class is initialized.
+
+        Args:
+            video_player: A JsonLinesVideoPlayer.
+            stream: The stream records are written to (default sys.stdout).
+        """
+        super().__init__(video_player)
+        self._stream = stream
+
+    def execute_command(self, command):
+        collector = _MessageCollector(self._player.emit)
+        with contextlib.redirect_stdout(collector):
+            try:
+                super().execute_command(command)
+            except CommandException as e:
+                self._player.emit({"type": "error", "message": str(e)})
+            collector.flush()
+        records = self._player.take_records()
+        if records:
+            stream = self._stream or sys.stdout
+            stream.write("\n".join(map(_encode, records)) + "\n")
@@ -0,0 +1,168 @@
+"""Memory accounting per player subsystem."""
+
+import os
+import sys
+import tracemalloc
+
+LIBRARY = "library"
+PLAYLISTS = "playlists"
+SESSION = "session"
+SUBSYSTEMS = (LIBRARY, PLAYLISTS, SESSION)
+
+# Allocations are attributed to a subsystem by the source file that made them.
+_SUBSYSTEM_FILES = {
+    LIBRARY: ("video_library.py", "sqlite_video_library.py", "video.py",
+              "tag_dictionary.py", "tag_index.py", "title_index.py",
+              "related_videos.py"),
+    PLAYLISTS: ("video_playlist.py",),
+    SESSION: ("video_player.py", "playback_history.py", "search_cache.py",
+              "search_results.py", "heavy_hitters.py"),
+}
+_FILE_SUBSYSTEMS = {
+    filename: subsystem
+    for subsystem, filenames in _SUBSYSTEM_FILES.items()
+    for filename in filenames}
+
+# Number of videos whose sizes are measured to estimate the whole catalog.
+_SAMPLE_SIZE = 1000
+
+
+def deep_sizeof(obj, seen=None, exclude_types=()):
+    """Returns an estimate in bytes of an object and everything it holds
+    (containers and instance attributes), counting shared objects once.
+
+    Args:
+        obj: The object to measure.
+        seen: Optional set of ids of objects already counted.
+        exclude_types: Types whose instances are owned elsewhere (e.g. Video
+            objects referenced from a cache) and are not counted.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, exclude_types):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            stack.append(vars(current))
+    return size
+
+
+def estimate_library_size(library):
+    """Returns an estimate in bytes of a library and its videos.
+
+    The library's own structures (id maps, tag dictionary, indexes, flag
+    mask) are measured in full. The Video objects are extrapolated from a
+    sample so it stays cheap on large catalogs; what they share with the
+    library, such as their ids and the tag dictionary, is counted once.
+    """
+    from .video import Video
+
+    seen = set()
+    size = deep_sizeof(library, seen, exclude_types=(Video,))
+    count = len(library)
+    if not count:
+        return size
+    sample_size = 0
+    measured = 0
+    for video in library.videos():
+        sample_size += deep_sizeof(video, seen)
+        measured += 1
+        if measured == _SAMPLE_SIZE:
+            break
+    return size + sample_size * count // measured
+
+
+class MemoryReporter:
+    """Attributes traced allocations to subsystems.
+
+    Tracing starts with start() or the first report, so only allocations made
+    after that are attributed; object-size estimates cover what existed
+    before. Each report also shows the growth since the previous one. Call
+    stop() to end tracing and its overhead.
+    """
+
+    def __init__(self):
+        self._previous = None
+        self._largest = dict.fromkeys(SUBSYSTEMS, 0)
+        self._started_tracing = False
+
+    @property
+    def tracing(self):
+        """Returns boolean indicating if this reporter is tracing allocations."""
+        return self._started_tracing
+
+    def start(self):
+        """Starts tracing allocations (one frame each, to keep overhead low).
+
+        Returns:
+            True if tracing was started, False if it was already running.
+        """
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(1)
+        self._started_tracing = True
+        return True
+
+    def stop(self):
+        """Stops tracing if this reporter started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+            self._previous = None
+
+    def _traced_by_subsystem(self, snapshot):
+        traced = dict.fromkeys(SUBSYSTEMS, 0)
+        for statistic in snapshot.statistics("filename"):
+            filename = os.path.basename(statistic.traceback[0].filename)
+            subsystem = _FILE_SUBSYSTEMS.get(filename)
+            if subsystem:
+                traced[subsystem] += statistic.size
+        return traced
+
+    def report(self, estimates):
+        """Takes a snapshot and returns one row per subsystem.
+
+        Args:
+            estimates: {subsystem: estimated bytes} from object sizes.
+
+        Returns:
+            (rows, total_current, total_peak), where each row is a tuple
+            (subsystem, estimated, traced, largest, growth) in bytes.
+            largest is the most traced for the subsystem in any report so
+            far, not a true peak: allocations freed between two reports are
+            never seen. growth is None for the first report. total_peak is
+            tracemalloc's peak, which does cover everything traced.
+        """
+        self.start()
+        snapshot = tracemalloc.take_snapshot()
+        traced = self._traced_by_subsystem(snapshot)
+        rows = []
+        for subsystem in SUBSYSTEMS:
+            self._largest[subsystem] = max(self._largest[subsystem], traced[subsystem])
+            growth = None
+            if self._previous is not None:
+                growth = traced[subsystem] - self._previous[subsystem]
+            rows.append((subsystem, estimates.get(subsystem, 0), traced[subsystem],
+                         self._largest[subsystem], growth))
+        self._previous = traced
+        current, peak = tracemalloc.get_traced_memory()
+        return rows, current, peak
+
+
+def format_bytes(size):
+    """Returns a size in bytes in human readable units."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
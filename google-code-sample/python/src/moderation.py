@@ -0,0 +1,44 @@
+"""A reader for batches of moderation decisions."""
+
+FLAG = "FLAG"
+ALLOW = "ALLOW"
+
+
+class ModerationException(Exception):
+    """A class used to represent a malformed moderation file."""
+    pass
+
+
+def read_moderation_rows(moderation_file):
+    """Parses pipe-delimited moderation decisions ("video_id | action | reason").
+
+    The action is FLAG or ALLOW (case insensitive); the reason is optional.
+    Blank lines are ignored. The whole file is parsed before anything is
+    returned, so a malformed row rejects the batch.
+
+    Args:
+        moderation_file: An open text file (or any iterable of lines).
+
+    Returns:
+        A list of (video_id, action, reason) tuples.
+
+    Raises:
+        ModerationException: If a row is malformed.
+    """
+    rows = []
+    for line_number, line in enumerate(moderation_file, start=1):
+        if not line.strip():
+            continue
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 2:
+            fields.append("")
+        if len(fields) != 3 or not fields[0]:
+            raise ModerationException(
+                f"line {line_number}: expected video_id | action | reason")
+        video_id, action, reason = fields
+        action = action.upper()
+        if action not in (FLAG, ALLOW):
+            raise ModerationException(
+                f"line {line_number}: unknown action {fields[1]!r}")
+        rows.append((video_id, action, reason))
+    return rows
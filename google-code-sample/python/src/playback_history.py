@@ -0,0 +1,78 @@
+"""A playback history class."""
+
+from array import array
+import time
+
+PLAY = 0
+STOP = 1
+PAUSE = 2
+CONTINUE = 3
+
+EVENT_NAMES = ("Played", "Stopped", "Paused", "Continued")
+
+
+class PlaybackHistory:
+    """A fixed-capacity ring buffer of playback events.
+
+    Each event is stored as a compact record spread over three typed arrays
+    (video ordinal, event type, monotonic timestamp), so memory stays the
+    same however long a session runs; once full, the oldest events are
+    overwritten.
+    """
+
+    def __init__(self, capacity=1024, clock=time.monotonic):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._capacity = capacity
+        self._clock = clock
+        self._ordinals = array("q", bytes(8 * capacity))
+        self._events = array("b", bytes(capacity))
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._next = 0  # slot the next event is written to
+        self._size = 0
+
+    def record(self, ordinal, event):
+        """Records a playback event for the video with the given ordinal."""
+        slot = self._next
+        self._ordinals[slot] = ordinal
+        self._events[slot] = event
+        self._timestamps[slot] = self._clock()
+        self._next = (slot + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def recent(self, k):
+        """Yields up to k (ordinal, event, timestamp) records, newest first."""
+        slot = self._next
+        for _ in range(min(k, self._size)):
+            slot = (slot - 1) % self._capacity
+            yield self._ordinals[slot], self._events[slot], self._timestamps[slot]
+
+    def recently_played(self, k):
+        """Returns up to k distinct ordinals of played videos, most recent first.
+
+        The scan stops as soon as k distinct videos are found, so it touches
+        O(k) records unless the same videos were replayed many times.
+        """
+        ordinals = []
+        seen = set()
+        for ordinal, event, _ in self.recent(self._size):
+            if len(ordinals) == k:
+                break
+            if event == PLAY and ordinal not in seen:
+                seen.add(ordinal)
+                ordinals.append(ordinal)
+        return ordinals
+
+    def clear(self):
+        """Forgets every recorded event."""
+        self._next = 0
+        self._size = 0
+
+    @property
+    def capacity(self):
+        """Returns the maximum number of events kept."""
+        return self._capacity
+
+    def __len__(self):
+        return self._size
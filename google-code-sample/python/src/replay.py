@@ -0,0 +1,46 @@
+"""Replays a recorded command transcript against a fresh video player."""
+from .command_parser import CommandParser
+from .transcript import read_transcript, replay_transcript
+from .video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from .video_player import VideoPlayer
+import argparse
+import functools
+import random
+
+
+def _new_parser(catalog, json_output=False):
+    """Returns a command parser over a fresh player, set up like run.py."""
+    library_factory = functools.partial(VideoLibrary, catalog)
+    if json_output:
+        from .json_output import JsonLinesCommandParser, JsonLinesVideoPlayer
+
+        return JsonLinesCommandParser(
+            JsonLinesVideoPlayer(library_factory=library_factory))
+    return CommandParser(VideoPlayer(library_factory=library_factory))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("transcript", help="transcript file recorded by run.py --record")
+    arg_parser.add_argument("--speed", type=float, default=0.0,
+                            help="replay speed relative to the recording "
+                                 "(default: 0, as fast as possible)")
+    arg_parser.add_argument("--repeat", type=int, default=1,
+                            help="number of times to replay the transcript")
+    arg_parser.add_argument("--seed", type=int, default=0,
+                            help="seed for PLAY_RANDOM (default: 0)")
+    arg_parser.add_argument("--catalog", metavar="PATH", default=DEFAULT_VIDEO_FILE,
+                            help="catalog the session was recorded with "
+                                 "(run.py --catalog)")
+    arg_parser.add_argument("--json", action="store_true",
+                            help="replay in JSON-lines mode, for sessions "
+                                 "recorded with run.py --json")
+    args = arg_parser.parse_args()
+
+    with open(args.transcript) as transcript_file:
+        records = read_transcript(transcript_file)
+    # PLAY_RANDOM output can only match a recording by chance
+    random.seed(args.seed)
+    for _ in range(args.repeat):
+        print(replay_transcript(records, _new_parser(args.catalog, args.json),
+                                args.speed))
@@ -1,21 +1,73 @@
 """A youtube terminal simulator."""
+from .video_library import DEFAULT_VIDEO_FILE, VideoLibrary
 from .video_player import VideoPlayer
+from .watch_time import WatchTimeAggregate
 from .command_parser import CommandException
 from .command_parser import CommandParser
+import argparse
+import functools
 
 
 if __name__ == "__main__":
-    print("""Hello and welcome to YouTube, what would you like to do?
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--record", metavar="PATH",
+                            help="record the session to a transcript file "
+                                 "for replay with `python3 -m src.replay`")
+    arg_parser.add_argument("--json", action="store_true",
+                            help="write one JSON record per line instead of text")
+    arg_parser.add_argument("--catalog", metavar="PATH", default=DEFAULT_VIDEO_FILE,
+                            help="video catalog to load, optionally gzip, bz2 "
+                                 "or xz compressed (default: src/videos.txt)")
+    arg_parser.add_argument("--watch-time", metavar="PATH",
+                            help="add play counts and watch time to this file, "
+                                 "creating it if needed")
+    arg_parser.add_argument("--trace-memory", action="store_true",
+                            help="trace allocations from startup so MEMORY "
+                                 "also covers loading the catalog")
+    args = arg_parser.parse_args()
+    try:
+        open(args.catalog, "rb").close()
+    except OSError as e:
+        arg_parser.error(f"cannot read catalog {args.catalog}: {e.strerror}")
+    library_factory = functools.partial(VideoLibrary, args.catalog)
+    watch_time = WatchTimeAggregate(args.watch_time)
+
+    if args.json:
+        from .json_output import JsonLinesCommandParser, JsonLinesVideoPlayer
+
+        video_player = JsonLinesVideoPlayer(load_in_background=True,
+                                            library_factory=library_factory,
+                                            watch_time=watch_time,
+                                            trace_memory=args.trace_memory)
+        parser = JsonLinesCommandParser(video_player)
+        prompt = ""
+    else:
+        print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
-    parser = CommandParser(video_player)
+        # The catalog is parsed in the background so the prompt shows at once
+        video_player = VideoPlayer(load_in_background=True,
+                                   library_factory=library_factory,
+                                   watch_time=watch_time,
+                                   trace_memory=args.trace_memory)
+        parser = CommandParser(video_player)
+        prompt = "YT> "
+    transcript_file = None
+    if args.record:
+        from .transcript import TranscriptRecorder
+
+        transcript_file = open(args.record, "w")
+        parser = TranscriptRecorder(parser, transcript_file)
     while True:
-        command = input("YT> ")
+        command = input(prompt)
         if command.upper() == "EXIT":
             break
         try:
             parser.execute_command(command.split())
         except CommandException as e:
             print(e)
-    print("YouTube has now terminated its execution. "
-          "Thank you and goodbye!")
+    video_player.flush_watch_time()
+    if transcript_file:
+        transcript_file.close()
+    if not args.json:
+        print("YouTube has now terminated its execution. "
+              "Thank you and goodbye!")
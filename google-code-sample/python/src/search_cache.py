@@ -0,0 +1,78 @@
+"""A search result cache class."""
+
+from collections import OrderedDict
+
+
+class SearchCache:
+    """A bounded LRU cache of search results, invalidated by library version.
+
+    Entries are keyed by (search kind, normalized query). Whenever the
+    library's version counter differs from the one the cached entries were
+    computed against, the whole cache is dropped before the lookup.
+    """
+
+    def __init__(self, capacity=128):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query):
+        """Returns the normalized form of a query used as a cache key."""
+        return query.lower()
+
+    def get(self, kind, query, version):
+        """Returns the cached results for a query, or None on a miss.
+
+        Args:
+            kind: The kind of search (e.g. "title" or "tag").
+            query: The raw query string.
+            version: The current version of the video library.
+        """
+        self._check_version(version)
+        key = (kind, self.normalize(query))
+        results = self._entries.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return results
+
+    def put(self, kind, query, version, results):
+        """Stores the results of a query, evicting the least recently used
+        entry if the cache is full."""
+        self._check_version(version)
+        key = (kind, self.normalize(query))
+        self._entries[key] = tuple(results)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drops every cached entry (statistics are kept)."""
+        self._entries.clear()
+
+    def stats(self):
+        """Returns a dictionary of cache statistics."""
+        return {
+            "size": len(self._entries),
+            "capacity": self._capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,32 @@
+"""A search results class."""
+
+from collections.abc import Sequence
+
+
+class SearchResults(Sequence):
+    """An immutable handle on the videos returned by a search.
+
+    Results are indexed from zero like any sequence; the numbers shown to
+    users (and taken by PLAY_RESULT) start at one.
+    """
+
+    def __init__(self, query, videos):
+        self._query = query
+        self._videos = tuple(videos)
+
+    @property
+    def query(self):
+        """Returns the query that produced the results."""
+        return self._query
+
+    def __getitem__(self, index):
+        return self._videos[index]
+
+    def __len__(self):
+        return len(self._videos)
+
+    def __iter__(self):
+        return iter(self._videos)
+
+    def __repr__(self):
+        return f"SearchResults({self._query!r}, {len(self._videos)} videos)"
@@ -0,0 +1,519 @@
+"""A catalog layout that can be shared between processes."""
+
+from . import events
+from .events import EventBus
+from .tag_index import bits_from_ordinals, iter_bits
+from .video import Video
+from multiprocessing import shared_memory
+import os
+import struct
+import sys
+
+# Header: magic, number of videos, then the byte sizes of the id, title and
+# tag blobs. Every section after it starts on an 8 byte boundary.
+_HEADER = struct.Struct("<8sQQQQ")
+_MAGIC = b"VIDCAT01"
+_TAG_SEPARATOR = "\x1f"
+
+
+# Whether SharedMemory registers every block it opens with the resource
+# tracker, with no track=False to opt out (POSIX before Python 3.13).
+_REREGISTER_BEFORE_UNLINK = os.name == "posix" and sys.version_info < (3, 13)
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+def _open_block(name=None, create=False, size=0):
+    """Opens a shared memory block no resource tracker will unlink.
+
+    A tracker unlinks the blocks its processes opened once they exit, so a
+    worker attaching to a catalog and exiting would free it for everyone.
+    The block lives until SharedCatalog.unlink() instead.
+    """
+    if not _REREGISTER_BEFORE_UNLINK:
+        return shared_memory.SharedMemory(name, create, size, track=False) \
+            if os.name == "posix" else shared_memory.SharedMemory(name, create, size)
+    from multiprocessing import resource_tracker
+
+    shm = shared_memory.SharedMemory(name, create, size)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedCatalog:
+    """A read-only video catalog stored as flat buffers in shared memory.
+
+    The block holds the UTF-8 ids, titles and tags of every video in three
+    blobs with (count + 1) uint64 offset arrays into each, an array of
+    ordinals sorted by video id for lookups, and one byte of flag state per
+    video. Worker processes attach by name without parsing or copying
+    anything; only the flag bytes are ever written after creation.
+    """
+
+    def __init__(self, shm, owner):
+        """Maps the sections of an existing block. Use create() or attach()."""
+        self._shm = shm
+        self._owner = owner
+        buffer = shm.buf
+        magic, count, ids_size, titles_size, tags_size = \
+            _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError(f"{shm.name} does not hold a video catalog")
+        self._count = count
+        position = _HEADER.size
+        sections = []
+        for size in (8 * (count + 1),) * 3 + (8 * count,):
+            sections.append(buffer[position:position + size].cast("Q"))
+            position += size
+        self._id_offsets, self._title_offsets, self._tag_offsets, \
+            self._sorted_ordinals = sections
+        self._flags = buffer[position:position + count]
+        position = _aligned(position + count)
+        self._ids = buffer[position:position + ids_size]
+        position = _aligned(position + ids_size)
+        self._titles = buffer[position:position + titles_size]
+        position = _aligned(position + titles_size)
+        self._tags = buffer[position:position + tags_size]
+
+    @classmethod
+    def create(cls, videos, name=None):
+        """Lays out a catalog in a new shared memory block.
+
+        Args:
+            videos: An iterable of Video objects.
+            name: Optional name of the block (a unique one is generated
+                otherwise).
+
+        Returns:
+            A SharedCatalog owning the block; call unlink() once no worker
+            needs it any more.
+        """
+        videos = list(videos)
+        count = len(videos)
+        blobs = []
+        offset_arrays = []
+        for values in ([video.video_id for video in videos],
+                       [video.title for video in videos],
+                       [_TAG_SEPARATOR.join(video.tags) for video in videos]):
+            encoded = [value.encode() for value in values]
+            offsets = [0]
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            blobs.append(b"".join(encoded))
+            offset_arrays.append(offsets)
+        sorted_ordinals = sorted(range(count), key=lambda i: videos[i].video_id.encode())
+        flags = bytes(1 if video.flag_reason else 0 for video in videos)
+
+        parts = [_HEADER.pack(_MAGIC, count, *(len(blob) for blob in blobs))]
+        for offsets in offset_arrays + [sorted_ordinals]:
+            parts.append(struct.pack(f"<{len(offsets)}Q", *offsets))
+        parts.append(flags.ljust(_aligned(count), b"\0"))
+        for blob in blobs:
+            parts.append(blob.ljust(_aligned(len(blob)), b"\0"))
+        layout = b"".join(parts)
+
+        shm = _open_block(name, create=True, size=max(len(layout), 1))
+        shm.buf[:len(layout)] = layout
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attaches to a catalog created by another process."""
+        return cls(_open_block(name), owner=False)
+
+    @property
+    def name(self):
+        """Returns the name workers pass to attach()."""
+        return self._shm.name
+
+    def __len__(self):
+        return self._count
+
+    def _field(self, blob, offsets, ordinal):
+        if not 0 <= ordinal < self._count:
+            raise IndexError("video ordinal out of range")
+        return bytes(blob[offsets[ordinal]:offsets[ordinal + 1]]).decode()
+
+    def video_id(self, ordinal):
+        """Returns the id of the video with the given ordinal."""
+        return self._field(self._ids, self._id_offsets, ordinal)
+
+    def title(self, ordinal):
+        """Returns the title of the video with the given ordinal."""
+        return self._field(self._titles, self._title_offsets, ordinal)
+
+    def tags(self, ordinal):
+        """Returns the tags of the video with the given ordinal."""
+        tags = self._field(self._tags, self._tag_offsets, ordinal)
+        return tuple(tags.split(_TAG_SEPARATOR)) if tags else ()
+
+    def find(self, video_id):
+        """Returns the ordinal of a video by binary search. None if it does
+        not exist."""
+        key = video_id.encode()
+        ids, offsets, ordinals = self._ids, self._id_offsets, self._sorted_ordinals
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            ordinal = ordinals[middle]
+            candidate = bytes(ids[offsets[ordinal]:offsets[ordinal + 1]])
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return ordinal
+        return None
+
+    def is_flagged(self, ordinal):
+        """Returns boolean indicating if the video with the ordinal is flagged."""
+        return bool(self._flags[ordinal])
+
+    def set_flagged(self, ordinal, flagged):
+        """Updates the shared flag of a video; visible to every process."""
+        self._flags[ordinal] = 1 if flagged else 0
+
+    def count_flagged(self):
+        """Returns the number of flagged videos."""
+        return bytes(self._flags).count(1)
+
+    def flags(self):
+        """Returns a copy of the flag bytes, one per ordinal."""
+        return bytes(self._flags)
+
+    def get_video(self, video_id):
+        """Returns a Video object built from the shared buffers.
+
+        Flag reasons are not shared, so a flagged video reports "Flagged".
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        ordinal = self.find(video_id)
+        if ordinal is None:
+            return None
+        video = Video(self.title(ordinal), video_id, self.tags(ordinal))
+        if self.is_flagged(ordinal):
+            video.flag_reason = "Flagged"
+        return video
+
+    def close(self):
+        """Detaches this process from the catalog."""
+        for view in (self._id_offsets, self._title_offsets, self._tag_offsets,
+                     self._sorted_ordinals, self._flags, self._ids,
+                     self._titles, self._tags):
+            view.release()
+        self._shm.close()
+
+    def unlink(self):
+        """Frees the shared block. Only the creating process should call this."""
+        if _REREGISTER_BEFORE_UNLINK:
+            from multiprocessing import resource_tracker
+
+            # unlink() unregisters the block, which _open_block already did
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+
+class SharedCatalogLibrary:
+    """A video library backed by a SharedCatalog.
+
+    It offers the interface VideoPlayer uses, so a worker can serve commands
+    from a catalog another process laid out, for example with
+    library_factory=lambda: SharedCatalogLibrary.attach(name). Videos are
+    built on demand from the shared buffers and cannot be added or removed;
+    change flags with set_flag_reason(), not through their flag_reason.
+    Flagging writes the shared flag byte, so every process sees it; reasons
+    are kept per process, and a video flagged elsewhere reports "Flagged".
+    Tag and related video indexes are built in this process on first use.
+    """
+
+    def __init__(self, catalog):
+        """The SharedCatalogLibrary class is initialized.
+
+        Args:
+            catalog: The SharedCatalog to read; close() detaches from it.
+        """
+        self._catalog = catalog
+        self._flag_reasons = {}  # ordinal -> reason set by this process
+        self._events = EventBus()
+        self._tag_dictionary = None
+        self._tag_index = None  # built on first tag lookup
+        self._related_index = None  # built on first related videos lookup
+
+    @classmethod
+    def attach(cls, name):
+        """Returns a library over the catalog with the given shared memory name."""
+        return cls(SharedCatalog.attach(name))
+
+    def close(self):
+        """Detaches this process from the catalog."""
+        self._catalog.close()
+
+    @property
+    def version(self):
+        """Returns a value that changes whenever a flag changes, including
+        flags set by other processes."""
+        return hash(self._catalog.flags())
+
+    def _video(self, ordinal):
+        catalog = self._catalog
+        video = Video(catalog.title(ordinal), catalog.video_id(ordinal),
+                      catalog.tags(ordinal))
+        if catalog.is_flagged(ordinal):
+            video.flag_reason = self._flag_reasons.get(ordinal, "Flagged")
+        return video
+
+    def _ordinals(self, exclude_flagged):
+        if not exclude_flagged:
+            return range(len(self._catalog))
+        flags = self._catalog.flags()
+        return (ordinal for ordinal, flag in enumerate(flags) if not flag)
+
+    def set_flag_reason(self, video_id, flag_reason):
+        """Updates the flag reason of a video (empty string unflags it).
+
+        Args:
+            video_id: The video url.
+            flag_reason: The new flag reason.
+        """
+        self.set_flag_reasons({video_id: flag_reason})
+
+    def set_flag_reasons(self, flag_reasons):
+        """Updates the shared flags of many videos as one change.
+
+        Args:
+            flag_reasons: {video_id: flag_reason}; an empty reason unflags.
+
+        Raises:
+            KeyError: If a video does not exist; nothing is updated then.
+        """
+        ordinals = []
+        for video_id in flag_reasons:
+            ordinal = self._catalog.find(video_id)
+            if ordinal is None:
+                raise KeyError(video_id)
+            ordinals.append(ordinal)
+        flagged = []
+        unflagged = []
+        for ordinal, (video_id, flag_reason) in zip(ordinals, flag_reasons.items()):
+            self._catalog.set_flagged(ordinal, bool(flag_reason))
+            if flag_reason:
+                self._flag_reasons[ordinal] = flag_reason
+                flagged.append(video_id)
+            else:
+                self._flag_reasons.pop(ordinal, None)
+                unflagged.append(video_id)
+        if flagged:
+            self._events.publish(events.VIDEO_FLAGGED, self, flagged)
+        if unflagged:
+            self._events.publish(events.VIDEO_UNFLAGGED, self, unflagged)
+
+    def subscribe(self, callback):
+        """Registers a callable receiving a ChangeEvent after every change
+        made through this library."""
+        self._events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a callable registered with subscribe()."""
+        self._events.unsubscribe(callback)
+
+    def is_flagged(self, video_id):
+        """Returns boolean indicating if an existing video is flagged."""
+        ordinal = self._catalog.find(video_id)
+        if ordinal is None:
+            raise KeyError(video_id)
+        return self._catalog.is_flagged(ordinal)
+
+    def count_flagged(self):
+        """Returns the number of flagged videos in the library."""
+        return self._catalog.count_flagged()
+
+    def count_available(self):
+        """Returns the number of videos in the library that are not flagged."""
+        return len(self._catalog) - self._catalog.count_flagged()
+
+    @property
+    def flagged_bits(self):
+        """Returns the integer bitset of ordinals of flagged videos."""
+        flags = self._catalog.flags()
+        return bits_from_ordinals(
+            ordinal for ordinal, flag in enumerate(flags) if flag)
+
+    def get_random_available_video(self, rng=None):
+        """Returns a random video that is not flagged.
+
+        Args:
+            rng: The random number generator to draw from (defaults to the
+                random module).
+
+        Returns:
+            The Video object, or None if every video is flagged.
+        """
+        if rng is None:
+            import random
+            rng = random
+        available = [ordinal for ordinal, flag
+                     in enumerate(self._catalog.flags()) if not flag]
+        if not available:
+            return None
+        return self._video(available[rng.randrange(len(available))])
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        return list(self.videos())
+
+    def videos(self):
+        """Returns a read-only view of all videos in the library, built as
+        they are iterated."""
+        return _SharedVideosView(self)
+
+    def __len__(self):
+        return len(self._catalog)
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        ordinal = self._catalog.find(video_id)
+        return None if ordinal is None else self._video(ordinal)
+
+    def get_ordinal(self, video_id):
+        """Returns the dense ordinal of a video. None if it does not exist."""
+        return self._catalog.find(video_id)
+
+    def get_video_by_ordinal(self, ordinal):
+        """Returns the video with a dense ordinal."""
+        return self._video(ordinal)
+
+    def videos_from_bits(self, bits):
+        """Returns the videos whose ordinals are set in an integer bitset."""
+        return [self._video(ordinal) for ordinal in iter_bits(bits)]
+
+    def search_titles(self, search_term, exclude_flagged=False):
+        """Returns the videos whose titles contain a search term.
+
+        Args:
+            search_term: The text to look for (case insensitive).
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        search_term = search_term.lower()
+        title = self._catalog.title
+        return [self._video(ordinal) for ordinal in self._ordinals(exclude_flagged)
+                if search_term in title(ordinal).lower()]
+
+    def search_title_pattern(self, compiled_pattern, exclude_flagged=False):
+        """Returns the videos whose titles contain a match of a pattern.
+
+        Args:
+            compiled_pattern: A pattern from title_index.compile_title_pattern.
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        title = self._catalog.title
+        return [self._video(ordinal) for ordinal in self._ordinals(exclude_flagged)
+                if compiled_pattern.search(title(ordinal).lower())]
+
+    def _build_tag_index(self):
+        if self._tag_index is None:
+            from .tag_dictionary import TagDictionary
+            from .tag_index import TagIndex
+
+            self._tag_dictionary = TagDictionary()
+            self._tag_index = TagIndex(self._tag_dictionary)
+            self._tag_index.add_many(
+                (ordinal, self._tag_dictionary.encode(self._catalog.tags(ordinal)))
+                for ordinal in range(len(self._catalog)))
+        return self._tag_index
+
+    def get_related_videos(self, video_id, count):
+        """Returns the unflagged videos whose tags are most similar to those
+        of a video, found through the MinHash/LSH index.
+
+        Args:
+            video_id: The video url.
+            count: The maximum number of videos to return.
+
+        Returns:
+            (similarity, Video) pairs, most similar first (ties by title).
+        """
+        if self._related_index is None:
+            from .related_videos import RelatedVideosIndex
+
+            self._build_tag_index()
+            self._related_index = RelatedVideosIndex()
+            encode = self._tag_dictionary.encode
+            for ordinal in range(len(self._catalog)):
+                self._related_index.add(ordinal, encode(self._catalog.tags(ordinal)))
+        related = self._related_index.related(
+            self._catalog.find(video_id), exclude=self._catalog.is_flagged)
+        pairs = [(similarity, self._video(ordinal)) for similarity, ordinal in related]
+        pairs.sort(key=lambda pair: (-pair[0], pair[1].title))
+        return pairs[:count]
+
+    def get_tag_facets(self, videos):
+        """Returns how many of the given videos carry each tag.
+
+        Args:
+            videos: Videos of this library, e.g. search results.
+
+        Returns:
+            (tag, count) pairs, most common first (ties by tag).
+        """
+        counts = {}
+        for video in videos:
+            for tag in set(video.tags):
+                counts[tag] = counts.get(tag, 0) + 1
+        return sorted(counts.items(), key=lambda facet: (-facet[1], facet[0]))
+
+    def get_videos_with_tag(self, tag, exclude_flagged=False):
+        """Returns the videos carrying a tag, in ordinal order.
+
+        As in the original player, the lower case form of the tag must equal
+        a video's tag as stored, so "#CAT" finds "#cat" but not "#Cat".
+
+        Args:
+            tag: The tag to look up.
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        bits = self._build_tag_index().spelling_postings(tag.lower())
+        if exclude_flagged:
+            bits &= ~self.flagged_bits
+        return self.videos_from_bits(bits)
+
+    def query_tags(self, tag_query, exclude_flagged=False):
+        """Returns the videos matching a boolean tag query.
+
+        Args:
+            tag_query: A parsed TagQuery.
+            exclude_flagged: Whether to leave out flagged videos.
+
+        Returns:
+            The matching Video objects in ordinal order.
+        """
+        tag_index = self._build_tag_index()
+        bits = tag_query.evaluate(tag_index.postings, tag_index.universe)
+        if exclude_flagged:
+            bits &= ~self.flagged_bits
+        return self.videos_from_bits(bits)
+
+
+class _SharedVideosView:
+    """A sized, iterable view of the videos of a SharedCatalogLibrary."""
+
+    def __init__(self, library):
+        self._library = library
+
+    def __len__(self):
+        return len(self._library)
+
+    def __iter__(self):
+        return map(self._library._video, range(len(self._library)))
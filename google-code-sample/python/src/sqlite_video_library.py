@@ -0,0 +1,676 @@
+"""A SQLite-backed video library class."""
+
+from . import events
+from .catalog_file import open_catalog
+from .events import EventBus
+from .tag_index import bits_from_ordinals, iter_bits
+from .video import Video
+from .video_library import read_video_records
+import sqlite3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    ordinal INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    flag_reason TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS videos_flagged
+    ON videos (ordinal) WHERE flag_reason != '';
+CREATE TABLE IF NOT EXISTS tags (
+    tag_id INTEGER PRIMARY KEY,
+    tag TEXT NOT NULL UNIQUE,
+    folded TEXT NOT NULL  -- lower case tag, for case insensitive lookups
+);
+CREATE INDEX IF NOT EXISTS tags_by_folded ON tags (folded);
+CREATE TABLE IF NOT EXISTS video_tags (
+    tag_id INTEGER NOT NULL REFERENCES tags,
+    ordinal INTEGER NOT NULL REFERENCES videos,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (tag_id, ordinal)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS video_tags_by_video
+    ON video_tags (ordinal, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS video_titles USING fts5 (
+    title, content='videos', content_rowid='ordinal', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS videos_insert AFTER INSERT ON videos BEGIN
+    INSERT INTO video_titles (rowid, title) VALUES (new.ordinal, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_delete AFTER DELETE ON videos BEGIN
+    INSERT INTO video_titles (video_titles, rowid, title)
+        VALUES ('delete', old.ordinal, old.title);
+    DELETE FROM video_tags WHERE ordinal = old.ordinal;
+END;
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS playlist_videos (
+    playlist_id INTEGER NOT NULL REFERENCES playlists ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (playlist_id, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS playlist_videos_by_position
+    ON playlist_videos (playlist_id, position);
+"""
+
+# The trigram tokenizer cannot match terms shorter than three characters.
+_MIN_FTS_TERM = 3
+
+_IMPORT_BATCH_SIZE = 10000
+
+
+def connect(database):
+    """Opens a catalog database, creating the schema if needed.
+
+    Args:
+        database: A path to the database file, or ":memory:".
+    """
+    # The library may be loaded on a background thread and used on another
+    connection = sqlite3.connect(database, check_same_thread=False)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def import_videos(connection, video_file):
+    """Bulk loads a pipe-delimited catalog into a catalog database.
+
+    Videos already in the database with the same id are replaced.
+
+    Args:
+        connection: A connection returned by connect().
+        video_file: An open text file in the videos.txt format.
+
+    Returns:
+        The number of videos imported.
+    """
+    return _import_records(connection, read_video_records(video_file))
+
+
+def _import_records(connection, records):
+    """Inserts (title, video_id, tags) records in batches of executemany calls."""
+    # Every spelling of a tag is stored as written, as VideoLibrary keeps it
+    tag_ids = dict(connection.execute("SELECT tag, tag_id FROM tags"))
+    next_tag_id = max(tag_ids.values(), default=0) + 1
+    next_ordinal = connection.execute(
+        "SELECT COALESCE(MAX(ordinal), -1) + 1 FROM videos").fetchone()[0]
+    count = 0
+    with connection:
+        videos, video_tags, new_tags = [], [], []
+        for title, video_id, tags in records:
+            videos.append((next_ordinal, video_id, title))
+            for position, tag in enumerate(tags):
+                tag_id = tag_ids.get(tag)
+                if tag_id is None:
+                    tag_id = tag_ids[tag] = next_tag_id
+                    next_tag_id += 1
+                    new_tags.append((tag_id, tag, tag.lower()))
+                video_tags.append((tag_id, next_ordinal, position))
+            next_ordinal += 1
+            count += 1
+            if len(videos) == _IMPORT_BATCH_SIZE:
+                _insert_batch(connection, videos, video_tags, new_tags)
+                videos, video_tags, new_tags = [], [], []
+        _insert_batch(connection, videos, video_tags, new_tags)
+    return count
+
+
+def _insert_batch(connection, videos, video_tags, new_tags):
+    # A video id repeated within the batch keeps its last row, as it would
+    # across batches, where the DELETE below replaces the earlier one
+    latest = {video_id: ordinal for ordinal, video_id, _ in videos}
+    if len(latest) < len(videos):
+        kept = set(latest.values())
+        videos = [row for row in videos if row[0] in kept]
+        video_tags = [row for row in video_tags if row[1] in kept]
+    connection.executemany(
+        "DELETE FROM videos WHERE video_id = ?",
+        ((video_id,) for _, video_id, _ in videos))
+    connection.executemany(
+        "INSERT INTO tags (tag_id, tag, folded) VALUES (?, ?, ?)", new_tags)
+    connection.executemany(
+        "INSERT INTO videos (ordinal, video_id, title) VALUES (?, ?, ?)",
+        videos)
+    connection.executemany(
+        "INSERT OR IGNORE INTO video_tags (tag_id, ordinal, position) "
+        "VALUES (?, ?, ?)", video_tags)
+
+
+class SqliteVideoLibrary:
+    """A video library that keeps the catalog in a SQLite database.
+
+    It offers the same interface as VideoLibrary, but builds Video objects
+    on demand, so memory use does not grow with the size of the catalog.
+    Those videos are copies: change flags with set_flag_reason(), not by
+    assigning their flag_reason. Video ordinals are the database row ids.
+    """
+
+    def __init__(self, database=":memory:", video_file=None):
+        """The SqliteVideoLibrary class is initialized.
+
+        Args:
+            database: A path to the database file, or ":memory:".
+            video_file: Optional path of a pipe-delimited catalog to import;
+                it may be gzip, bz2 or xz compressed.
+        """
+        self._connection = connect(database)
+        self._version = 0
+        self._events = EventBus()
+        if video_file is not None:
+            with open_catalog(video_file) as catalog:
+                import_videos(self._connection, catalog)
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+    @property
+    def version(self):
+        """Returns a counter that changes whenever the catalog or a flag changes."""
+        return self._version
+
+    def _query(self, sql, parameters=()):
+        return self._connection.execute(sql, parameters)
+
+    def _build_videos(self, rows):
+        """Returns Video objects for (ordinal, video_id, title, flag_reason)
+        rows, fetching all their tags with one query."""
+        rows = list(rows)
+        if not rows:
+            return []
+        tags = {row[0]: [] for row in rows}
+        ordinals = list(tags)
+        # Stay below SQLite's limit on the number of bound parameters
+        for start in range(0, len(ordinals), 500):
+            chunk = ordinals[start:start + 500]
+            for ordinal, tag in self._query(
+                    "SELECT vt.ordinal, t.tag FROM video_tags vt "
+                    "JOIN tags t USING (tag_id) "
+                    f"WHERE vt.ordinal IN ({','.join('?' * len(chunk))}) "
+                    "ORDER BY vt.ordinal, vt.position", chunk):
+                tags[ordinal].append(tag)
+        videos = []
+        for ordinal, video_id, title, flag_reason in rows:
+            video = Video(title, video_id, tags[ordinal])
+            video.flag_reason = flag_reason
+            videos.append(video)
+        return videos
+
+    def add_video(self, video):
+        """Adds a video to the library, replacing any video with the same id.
+
+        Args:
+            video: The Video object to add.
+        """
+        replaced = self.get_ordinal(video.video_id) is not None
+        with self._connection:
+            _import_records(self._connection,
+                            [(video.title, video.video_id, video.tags)])
+            if video.flag_reason:
+                self._query(
+                    "UPDATE videos SET flag_reason = ? WHERE video_id = ?",
+                    (video.flag_reason, video.video_id))
+        self._version += 1
+        self._events.publish(
+            events.VIDEO_REPLACED if replaced else events.VIDEO_ADDED,
+            self, (video.video_id,))
+
+    def remove_video(self, video_id):
+        """Removes a video from the library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The removed Video object. None if the video does not exist.
+        """
+        video = self.get_video(video_id)
+        if video:
+            with self._connection:
+                self._query("DELETE FROM videos WHERE video_id = ?", (video_id,))
+            self._version += 1
+            self._events.publish(events.VIDEO_REMOVED, self, (video_id,))
+        return video
+
+    def set_flag_reason(self, video_id, flag_reason):
+        """Updates the flag reason of a video (empty string unflags it).
+
+        Args:
+            video_id: The video url.
+            flag_reason: The new flag reason.
+        """
+        self.set_flag_reasons({video_id: flag_reason})
+
+    def set_flag_reasons(self, flag_reasons):
+        """Updates the flag reasons of many videos in one transaction.
+
+        Args:
+            flag_reasons: {video_id: flag_reason}; an empty reason unflags.
+        """
+        if not flag_reasons:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE videos SET flag_reason = ? WHERE video_id = ?",
+                [(flag_reason, video_id)
+                 for video_id, flag_reason in flag_reasons.items()])
+        self._version += 1
+        flagged = [video_id for video_id, flag_reason in flag_reasons.items() if flag_reason]
+        unflagged = [video_id for video_id, flag_reason in flag_reasons.items() if not flag_reason]
+        if flagged:
+            self._events.publish(events.VIDEO_FLAGGED, self, flagged)
+        if unflagged:
+            self._events.publish(events.VIDEO_UNFLAGGED, self, unflagged)
+
+    def subscribe(self, callback):
+        """Registers a callable receiving a ChangeEvent after every change."""
+        self._events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a callable registered with subscribe()."""
+        self._events.unsubscribe(callback)
+
+    def is_flagged(self, video_id):
+        """Returns boolean indicating if an existing video is flagged."""
+        row = self._query("SELECT flag_reason FROM videos WHERE video_id = ?",
+                          (video_id,)).fetchone()
+        return bool(row and row[0])
+
+    def count_flagged(self):
+        """Returns the number of flagged videos in the library."""
+        return self._query(
+            "SELECT COUNT(*) FROM videos WHERE flag_reason != ''").fetchone()[0]
+
+    def count_available(self):
+        """Returns the number of videos in the library that are not flagged."""
+        return self._query(
+            "SELECT COUNT(*) FROM videos WHERE flag_reason = ''").fetchone()[0]
+
+    @property
+    def flagged_bits(self):
+        """Returns the integer bitset of ordinals of flagged videos."""
+        return bits_from_ordinals(ordinal for ordinal, in self._query(
+            "SELECT ordinal FROM videos WHERE flag_reason != ''"))
+
+    def get_random_available_video(self, rng=None):
+        """Returns a random video that is not flagged.
+
+        Args:
+            rng: The random number generator to draw from (defaults to the
+                random module).
+
+        Returns:
+            The Video object, or None if every video is flagged.
+        """
+        if rng is None:
+            import random
+            rng = random
+        available = self.count_available()
+        if not available:
+            return None
+        rows = self._query(
+            "SELECT ordinal, video_id, title, flag_reason FROM videos "
+            "WHERE flag_reason = '' ORDER BY ordinal LIMIT 1 OFFSET ?",
+            (rng.randrange(available),))
+        return self._build_videos(rows)[0]
+
+    def get_ordinal(self, video_id):
+        """Returns the dense ordinal of a video. None if it does not exist."""
+        row = self._query("SELECT ordinal FROM videos WHERE video_id = ?",
+                          (video_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_video_by_ordinal(self, ordinal):
+        """Returns the video with a dense ordinal. None if it was removed."""
+        videos = self._build_videos(self._query(
+            "SELECT ordinal, video_id, title, flag_reason FROM videos "
+            "WHERE ordinal = ?", (ordinal,)))
+        return videos[0] if videos else None
+
+    def videos_from_bits(self, bits):
+        """Returns the videos whose ordinals are set in an integer bitset."""
+        ordinals = list(iter_bits(bits))
+        videos = []
+        for start in range(0, len(ordinals), 500):
+            chunk = ordinals[start:start + 500]
+            videos.extend(self._build_videos(self._query(
+                "SELECT ordinal, video_id, title, flag_reason FROM videos "
+                f"WHERE ordinal IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY ordinal", chunk)))
+        return videos
+
+    def search_titles(self, search_term, exclude_flagged=False):
+        """Returns the videos whose titles contain a search term.
+
+        Args:
+            search_term: The text to look for (case insensitive).
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        flag_filter = " AND v.flag_reason = ''" if exclude_flagged else ""
+        if len(search_term) >= _MIN_FTS_TERM:
+            phrase = '"' + search_term.replace('"', '""') + '"'
+            rows = self._query(
+                "SELECT v.ordinal, v.video_id, v.title, v.flag_reason "
+                "FROM video_titles JOIN videos v "
+                "ON v.ordinal = video_titles.rowid "
+                f"WHERE video_titles MATCH ?{flag_filter} ORDER BY v.ordinal",
+                (phrase,))
+        else:
+            pattern = (search_term.replace("\\", "\\\\").replace("%", "\\%")
+                       .replace("_", "\\_"))
+            rows = self._query(
+                "SELECT v.ordinal, v.video_id, v.title, v.flag_reason "
+                "FROM videos v WHERE v.title LIKE ? ESCAPE '\\'"
+                f"{flag_filter} ORDER BY v.ordinal", (f"%{pattern}%",))
+        return self._build_videos(rows)
+
+    def search_title_pattern(self, compiled_pattern, exclude_flagged=False):
+        """Returns the videos whose titles contain a match of a pattern.
+
+        Args:
+            compiled_pattern: A pattern from title_index.compile_title_pattern.
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        self._connection.create_function(
+            "title_matches", 1,
+            lambda title: compiled_pattern.search(title.lower()) is not None,
+            deterministic=True)
+        flag_filter = " AND flag_reason = ''" if exclude_flagged else ""
+        return self._build_videos(self._query(
+            "SELECT ordinal, video_id, title, flag_reason FROM videos "
+            f"WHERE title_matches(title){flag_filter} ORDER BY ordinal"))
+
+    def get_related_videos(self, video_id, count):
+        """Returns the unflagged videos whose tags are most similar to those
+        of a video, scored by Jaccard similarity over the tag postings.
+
+        Args:
+            video_id: The video url.
+            count: The maximum number of videos to return.
+
+        Returns:
+            (similarity, Video) pairs, most similar first (ties by title).
+        """
+        rows = self._query(
+            "WITH source AS ("
+            "  SELECT vt.tag_id FROM video_tags vt JOIN videos v USING (ordinal)"
+            "  WHERE v.video_id = ?),"
+            " shared AS ("
+            "  SELECT vt.ordinal, COUNT(*) AS shared FROM video_tags vt"
+            "  JOIN source USING (tag_id) GROUP BY vt.ordinal)"
+            " SELECT v.ordinal, v.video_id, v.title, v.flag_reason,"
+            "  shared.shared * 1.0 / ((SELECT COUNT(*) FROM source)"
+            "   + (SELECT COUNT(*) FROM video_tags t WHERE t.ordinal = v.ordinal)"
+            "   - shared.shared) AS similarity"
+            " FROM shared JOIN videos v USING (ordinal)"
+            " WHERE v.video_id != ? AND v.flag_reason = ''"
+            " ORDER BY similarity DESC, v.title LIMIT ?",
+            (video_id, video_id, count)).fetchall()
+        videos = self._build_videos(row[:4] for row in rows)
+        return [(row[4], video) for row, video in zip(rows, videos)]
+
+    def get_tag_facets(self, videos):
+        """Returns how many of the given videos carry each tag.
+
+        Args:
+            videos: Videos of this library, e.g. search results.
+
+        Returns:
+            (tag, count) pairs, most common first (ties by tag).
+        """
+        counts = {}
+        video_ids = [video.video_id for video in videos]
+        for start in range(0, len(video_ids), 500):
+            chunk = video_ids[start:start + 500]
+            for tag, count in self._query(
+                    "SELECT t.tag, COUNT(*) FROM videos v "
+                    "JOIN video_tags vt USING (ordinal) JOIN tags t USING (tag_id) "
+                    f"WHERE v.video_id IN ({','.join('?' * len(chunk))}) "
+                    "GROUP BY t.tag_id", chunk):
+                counts[tag] = counts.get(tag, 0) + count
+        return sorted(counts.items(), key=lambda facet: (-facet[1], facet[0]))
+
+    def _postings(self, tag):
+        return bits_from_ordinals(ordinal for ordinal, in self._query(
+            "SELECT vt.ordinal FROM video_tags vt JOIN tags t USING (tag_id) "
+            "WHERE t.folded = ?", (tag.lower(),)))
+
+    def get_videos_with_tag(self, tag, exclude_flagged=False):
+        """Returns the videos carrying a tag, in ordinal order.
+
+        As in the original player, the lower case form of the tag must equal
+        a video's tag as stored, so "#CAT" finds "#cat" but not "#Cat".
+
+        Args:
+            tag: The tag to look up.
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        flag_filter = " AND v.flag_reason = ''" if exclude_flagged else ""
+        return self._build_videos(self._query(
+            "SELECT v.ordinal, v.video_id, v.title, v.flag_reason "
+            "FROM tags t JOIN video_tags vt USING (tag_id) "
+            "JOIN videos v ON v.ordinal = vt.ordinal "
+            f"WHERE t.tag = ?{flag_filter} ORDER BY v.ordinal", (tag.lower(),)))
+
+    def query_tags(self, tag_query, exclude_flagged=False):
+        """Returns the videos matching a boolean tag query.
+
+        Args:
+            tag_query: A parsed TagQuery.
+            exclude_flagged: Whether to leave out flagged videos.
+
+        Returns:
+            The matching Video objects in ordinal order.
+        """
+        universe = bits_from_ordinals(
+            ordinal for ordinal, in self._query("SELECT ordinal FROM videos"))
+        bits = tag_query.evaluate(self._postings, universe)
+        if exclude_flagged:
+            bits &= ~self.flagged_bits
+        return self.videos_from_bits(bits)
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        return self._build_videos(self._query(
+            "SELECT ordinal, video_id, title, flag_reason FROM videos "
+            "ORDER BY ordinal"))
+
+    def videos(self):
+        """Returns a read-only view of all videos in the library.
+
+        Iterating the view streams videos from the database in chunks instead
+        of building them all up front.
+        """
+        return _VideosView(self)
+
+    def _iter_videos(self, chunk_size=500):
+        last_ordinal = -1
+        while True:
+            videos = self._build_videos(self._query(
+                "SELECT ordinal, video_id, title, flag_reason FROM videos "
+                "WHERE ordinal > ? ORDER BY ordinal LIMIT ?",
+                (last_ordinal, chunk_size)))
+            if not videos:
+                return
+            yield from videos
+            last_ordinal = self.get_ordinal(videos[-1].video_id)
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        videos = self._build_videos(self._query(
+            "SELECT ordinal, video_id, title, flag_reason FROM videos "
+            "WHERE video_id = ?", (video_id,)))
+        return videos[0] if videos else None
+
+    def create_playlist(self, title):
+        """Returns a new, empty playlist stored in the database.
+
+        An existing playlist with the same name (case insensitive) is emptied
+        and reused. Pass this method as VideoPlayer's playlist_factory.
+        """
+        return SqlitePlaylist(self._connection, title)
+
+    def stored_playlists(self):
+        """Returns the playlists already stored in the database, with their
+        videos, sorted by name. VideoPlayer restores them when it starts."""
+        return [SqlitePlaylist(self._connection, name, playlist_id)
+                for playlist_id, name in self._query(
+                    "SELECT playlist_id, name FROM playlists ORDER BY name")]
+
+
+class _VideosView:
+    """A sized, iterable view of the videos of a SqliteVideoLibrary."""
+
+    def __init__(self, library):
+        self._library = library
+
+    def __len__(self):
+        return len(self._library)
+
+    def __iter__(self):
+        return self._library._iter_videos()
+
+
+class SqlitePlaylist:
+    """A playlist whose video ids are kept in a SQLite database.
+
+    It offers the same interface as Playlist.
+    """
+
+    def __init__(self, connection, title, playlist_id=None):
+        """The SqlitePlaylist class is initialized.
+
+        Args:
+            connection: A connection returned by connect().
+            title: The playlist name.
+            playlist_id: The id of a stored playlist to open with its videos.
+                If None, the playlist is created, or emptied if it exists.
+        """
+        self._connection = connection
+        self._title = title
+        self._events = EventBus()
+        self._playlist_id = playlist_id
+        if playlist_id is not None:
+            return
+        with connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO playlists (name) VALUES (?)", (title,))
+            self._playlist_id = connection.execute(
+                "SELECT playlist_id FROM playlists WHERE name = ?",
+                (title,)).fetchone()[0]
+            connection.execute(
+                "DELETE FROM playlist_videos WHERE playlist_id = ?",
+                (self._playlist_id,))
+
+    def add_video(self, video_id):
+        """Adds a video to the playlist."""
+        self.add_videos([video_id])
+
+    def add_videos(self, video_ids):
+        """Adds several videos to the playlist, skipping ones already in it.
+
+        Returns:
+            The list of video ids that were added.
+        """
+        added = []
+        with self._connection:
+            position = self._connection.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM playlist_videos "
+                "WHERE playlist_id = ?", (self._playlist_id,)).fetchone()[0]
+            for video_id in video_ids:
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO playlist_videos "
+                    "(playlist_id, position, video_id) VALUES (?, ?, ?)",
+                    (self._playlist_id, position, video_id))
+                if cursor.rowcount:
+                    added.append(video_id)
+                    position += 1
+        if added:
+            self._events.publish(events.PLAYLIST_VIDEOS_ADDED, self, added)
+        return added
+
+    def contains_video(self, video_id):
+        """Returns boolean indicating if video is in playlist."""
+        return self._connection.execute(
+            "SELECT 1 FROM playlist_videos WHERE playlist_id = ? "
+            "AND video_id = ?", (self._playlist_id, video_id)).fetchone() is not None
+
+    def empty(self):
+        """Returns a boolean indicating if playlist is empty."""
+        return not self._connection.execute(
+            "SELECT 1 FROM playlist_videos WHERE playlist_id = ? LIMIT 1",
+            (self._playlist_id,)).fetchone()
+
+    def remove(self, video_id):
+        """Removes a video from the playlist.
+
+        Args:
+            video_id: The video_id to be removed.
+        """
+        self.remove_videos([video_id])
+
+    def remove_videos(self, video_ids):
+        """Removes several videos from the playlist in a single transaction.
+
+        Returns:
+            The set of video ids that were removed.
+        """
+        removed = set()
+        with self._connection:
+            for video_id in set(video_ids):
+                cursor = self._connection.execute(
+                    "DELETE FROM playlist_videos WHERE playlist_id = ? "
+                    "AND video_id = ?", (self._playlist_id, video_id))
+                if cursor.rowcount:
+                    removed.add(video_id)
+        if removed:
+            self._events.publish(events.PLAYLIST_VIDEOS_REMOVED, self, removed)
+        return removed
+
+    def delete(self):
+        """Deletes the playlist and its videos from the database."""
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM playlists WHERE playlist_id = ?", (self._playlist_id,))
+
+    def clear(self):
+        """Clears the playlist."""
+        self.remove_videos(self.videos)
+
+    def subscribe(self, callback):
+        """Registers a callable receiving a ChangeEvent after every change."""
+        self._events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a callable registered with subscribe()."""
+        self._events.unsubscribe(callback)
+
+    @property
+    def videos(self):
+        """Returns the ids of videos in a playlist."""
+        return [video_id for video_id, in self._connection.execute(
+            "SELECT video_id FROM playlist_videos WHERE playlist_id = ? "
+            "ORDER BY position", (self._playlist_id,))]
+
+    def view(self):
+        """Returns the ids of videos in a playlist (read from the database)."""
+        return self.videos
+
+    @property
+    def title(self):
+        """Returns the title of a playlist."""
+        return self._title
@@ -0,0 +1,54 @@
+"""A tag dictionary class."""
+
+from array import array
+
+
+class TagDictionary:
+    """Maps each distinct tag string to a small integer id.
+
+    Videos store their tags as compact arrays of these ids, so a tag repeated
+    across many videos is kept as a single string.
+    """
+
+    def __init__(self):
+        self._ids = {}  # tag -> id
+        self._tags = []  # id -> tag
+        self._folded = {}  # lower case tag -> ids of its spellings
+
+    def intern(self, tag):
+        """Returns the id of a tag, assigning a new one if it is unseen."""
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            tag_id = self._ids[tag] = len(self._tags)
+            self._tags.append(tag)
+            folded = tag.lower()
+            self._folded[folded] = self._folded.get(folded, ()) + (tag_id,)
+        return tag_id
+
+    def encode(self, tags):
+        """Returns an array of ids for a sequence of tags."""
+        return array("I", map(self.intern, tags))
+
+    def decode(self, tag_ids):
+        """Returns the tuple of tags for a sequence of ids."""
+        tags = self._tags
+        return tuple(tags[tag_id] for tag_id in tag_ids)
+
+    def tag(self, tag_id):
+        """Returns the tag with the given id."""
+        return self._tags[tag_id]
+
+    def get_id(self, tag):
+        """Returns the id of exactly this spelling of a tag. None if unseen."""
+        return self._ids.get(tag)
+
+    def get_ids(self, tag):
+        """Returns the ids of every spelling of a tag (case insensitive)."""
+        return self._folded.get(tag.lower(), ())
+
+    def __len__(self):
+        return len(self._tags)
+
+
+# Used by videos created without an explicit dictionary.
+DEFAULT_TAG_DICTIONARY = TagDictionary()
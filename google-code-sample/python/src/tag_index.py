@@ -0,0 +1,128 @@
+"""A tag index class."""
+
+
+# The positions of the set bits of every byte value, lowest first.
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1)
+                   for value in range(256))
+
+
+def iter_bits(bits):
+    """Yields the positions of the set bits of an integer bitset, lowest first.
+
+    The integer is converted to bytes once and walked a byte at a time, so
+    decoding is linear in its size; clearing the lowest bit over and over
+    would copy the whole integer for every set bit.
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    byte_bits = _BYTE_BITS
+    for index, value in enumerate(data):
+        if value:
+            base = index << 3
+            for bit in byte_bits[value]:
+                yield base + bit
+
+
+def popcount(bits):
+    """Returns the number of set bits of a non-negative integer bitset."""
+    return bits.bit_count() if hasattr(bits, "bit_count") else bin(bits).count("1")
+
+
+def bits_from_ordinals(ordinals):
+    """Returns the integer bitset with the given ordinals set."""
+    buffer = bytearray()
+    for ordinal in ordinals:
+        byte = ordinal >> 3
+        if byte >= len(buffer):
+            buffer.extend(bytes(byte + 1 - len(buffer)))
+        buffer[byte] |= 1 << (ordinal & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class TagIndex:
+    """An inverted index from tags to integer bitsets of video ordinals.
+
+    Each video in the library has a dense ordinal; bit N of a posting is set
+    when the video with ordinal N carries the tag. Multi-tag queries then
+    reduce to bitwise and/or/and-not over Python integers. Postings are keyed
+    by the integer ids of a TagDictionary.
+    """
+
+    def __init__(self, tag_dictionary):
+        self._tag_dictionary = tag_dictionary
+        self._postings = {}
+        self._universe = 0
+
+    def add(self, ordinal, tag_ids):
+        """Indexes the tag ids of the video with the given ordinal."""
+        bit = 1 << ordinal
+        self._universe |= bit
+        for tag_id in tag_ids:
+            self._postings[tag_id] = self._postings.get(tag_id, 0) | bit
+
+    def add_many(self, entries):
+        """Indexes many videos at once.
+
+        Setting one bit at a time copies the whole posting integer for every
+        video, which is quadratic over a catalog; this collects the ordinals
+        of each tag first and builds every posting once.
+
+        Args:
+            entries: Iterable of (ordinal, tag ids) pairs.
+        """
+        ordinals = []
+        ordinals_by_tag = {}
+        for ordinal, tag_ids in entries:
+            ordinals.append(ordinal)
+            for tag_id in tag_ids:
+                tag_ordinals = ordinals_by_tag.get(tag_id)
+                if tag_ordinals is None:
+                    ordinals_by_tag[tag_id] = [ordinal]
+                else:
+                    tag_ordinals.append(ordinal)
+        self._universe |= bits_from_ordinals(ordinals)
+        for tag_id, tag_ordinals in ordinals_by_tag.items():
+            self._postings[tag_id] = \
+                self._postings.get(tag_id, 0) | bits_from_ordinals(tag_ordinals)
+
+    def remove(self, ordinal, tag_ids):
+        """Removes the video with the given ordinal from the index."""
+        bit = 1 << ordinal
+        self._universe &= ~bit
+        for tag_id in tag_ids:
+            remaining = self._postings.get(tag_id, 0) & ~bit
+            if remaining:
+                self._postings[tag_id] = remaining
+            else:
+                self._postings.pop(tag_id, None)
+
+    def postings(self, tag):
+        """Returns the bitset of ordinals of videos carrying the tag
+        (case insensitive)."""
+        bits = 0
+        for tag_id in self._tag_dictionary.get_ids(tag):
+            bits |= self._postings.get(tag_id, 0)
+        return bits
+
+    def spelling_postings(self, tag):
+        """Returns the bitset of ordinals of videos carrying exactly this
+        spelling of the tag."""
+        return self._postings.get(self._tag_dictionary.get_id(tag), 0)
+
+    @property
+    def universe(self):
+        """Returns the bitset of ordinals of all indexed videos."""
+        return self._universe
+
+    def facet_counts(self, bits):
+        """Returns {tag id: number of videos in bits carrying the tag} for
+        every tag carried by at least one of them."""
+        counts = {}
+        for tag_id, postings in self._postings.items():
+            count = popcount(postings & bits)
+            if count:
+                counts[tag_id] = count
+        return counts
+
+    def tag_ids(self):
+        """Returns the ids of the distinct tags in the index."""
+        return self._postings.keys()
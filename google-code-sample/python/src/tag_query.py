@@ -0,0 +1,103 @@
+"""A boolean tag query parser."""
+
+class TagQueryException(Exception):
+    """A class used to represent a malformed tag query."""
+    pass
+
+
+class TagQuery:
+    """A parsed boolean tag expression such as ``#cat AND NOT (#dog OR #bird)``.
+
+    Operators are AND, OR and NOT (case insensitive) with the usual
+    precedence NOT > AND > OR; parentheses group sub-expressions.
+    """
+
+    def __init__(self, expression):
+        """Parses the expression. Raises TagQueryException if it is malformed."""
+        self._expression = expression
+        self._tokens = expression.replace("(", " ( ").replace(")", " ) ").split()
+        self._pos = 0
+        if not self._tokens:
+            raise TagQueryException("Query is empty")
+        self._tree = self._parse_or()
+        if self._pos != len(self._tokens):
+            raise TagQueryException(
+                f"Unexpected token: {self._tokens[self._pos]}")
+        del self._tokens
+
+    def __str__(self):
+        return self._expression
+
+    def evaluate(self, postings, universe):
+        """Evaluates the query against bitset postings.
+
+        Args:
+            postings: Callable mapping a tag to the bitset of videos carrying it.
+            universe: The bitset of all videos, used to complement NOT terms.
+
+        Returns:
+            The bitset of videos matching the query.
+        """
+        return self._evaluate(self._tree, postings, universe)
+
+    def _evaluate(self, node, postings, universe):
+        op = node[0]
+        if op == "TAG":
+            return postings(node[1])
+        if op == "NOT":
+            return universe & ~self._evaluate(node[1], postings, universe)
+        left = self._evaluate(node[1], postings, universe)
+        if op == "AND":
+            if not left:
+                return 0
+            right_node = node[2]
+            # "a AND NOT b" is a plain subtraction, no complement needed
+            if right_node[0] == "NOT":
+                return left & ~self._evaluate(right_node[1], postings, universe)
+            return left & self._evaluate(right_node, postings, universe)
+        return left | self._evaluate(node[2], postings, universe)
+
+    def _peek(self):
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise TagQueryException("Unexpected end of query")
+        self._pos += 1
+        return token
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while (self._peek() or "").upper() == "OR":
+            self._pos += 1
+            node = ("OR", node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while (self._peek() or "").upper() == "AND":
+            self._pos += 1
+            node = ("AND", node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if (self._peek() or "").upper() == "NOT":
+            self._pos += 1
+            return ("NOT", self._parse_not())
+        return self._parse_atom()
+
+    def _parse_atom(self):
+        token = self._next()
+        if token == "(":
+            node = self._parse_or()
+            if self._next() != ")":
+                raise TagQueryException("Missing closing parenthesis")
+            return node
+        if token == ")" or token.upper() in ("AND", "OR", "NOT"):
+            raise TagQueryException(f"Unexpected token: {token}")
+        if not token.startswith("#"):
+            raise TagQueryException(f"Tags must start with '#': {token}")
+        return ("TAG", token.lower())
@@ -0,0 +1,108 @@
+"""A title pattern index class."""
+
+from array import array
+from bisect import bisect_right
+
+# Constructs that look at the string outside the current title: searching the
+# joined buffer would give them different answers than one title at a time.
+# A negative lookahead such as "s(?!\s)" even misses titles, since the buffer
+# puts a newline where a title ends, so any lookaround is matched per title.
+_BOUNDARY_SENSITIVE = ("\\A", "\\Z", "(?=", "(?!", "(?<")
+
+
+def _glob_to_regex(pattern):
+    """Translates a shell-style glob into a regex matching one whole line."""
+    import re
+
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+        if char == "*":
+            parts.append("[^\\n]*")
+        elif char == "?":
+            parts.append("[^\\n]")
+        elif char == "[":
+            end = pattern.find("]", i + 1 if pattern[i:i + 1] in ("!", "]") else i)
+            if end == -1:
+                parts.append("\\[")
+                continue
+            members = pattern[i:end].replace("\\", "\\\\")
+            i = end + 1
+            if members.startswith("!"):
+                members = "^\\n" + members[1:]
+            elif members.startswith("^"):
+                members = "\\" + members
+            parts.append(f"[{members}]")
+        else:
+            parts.append(re.escape(char))
+    return "^" + "".join(parts) + "$"
+
+
+def compile_title_pattern(pattern, glob=False):
+    """Compiles a regex, or a shell-style glob matching whole titles.
+
+    Matching is case insensitive. Raises re.error if the pattern is invalid.
+    """
+    import re  # costs several milliseconds, so only paid by pattern searches
+
+    if glob:
+        pattern = _glob_to_regex(pattern)
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+
+class TitleIndex:
+    """All video titles kept as one newline-joined, lower-cased buffer.
+
+    A compiled pattern scans the whole buffer in a single call per match,
+    instead of once per Video object; match offsets are mapped back to
+    videos through the sorted array of title start offsets. Every candidate
+    is confirmed against its own title, and patterns using \\A, \\Z or
+    lookarounds are matched title by title, so results are the same as
+    calling compiled_pattern.search() on each title.
+    """
+
+    def __init__(self, videos):
+        """Builds the buffer from an iterable of videos."""
+        self._videos = list(videos)
+        self._starts = array("q")
+        offset = 0
+        titles = []
+        for video in self._videos:
+            self._starts.append(offset)
+            title = video.title.lower()
+            titles.append(title)
+            offset += len(title) + 1
+        self._buffer = "\n".join(titles)
+
+    def search(self, compiled_pattern):
+        """Returns the videos whose titles contain a match of the pattern,
+        in the order the index was built with."""
+        buffer = self._buffer
+        starts = self._starts
+        if any(construct in compiled_pattern.pattern
+               for construct in _BOUNDARY_SENSITIVE):
+            return [video for index, video in enumerate(self._videos)
+                    if compiled_pattern.search(buffer[starts[index]:self._end(index)])]
+        matches = []
+        pos = 0
+        while True:
+            match = compiled_pattern.search(buffer, pos)
+            if match is None:
+                return matches
+            index = bisect_right(starts, match.start()) - 1
+            line_end = self._end(index)
+            # The match may run past its title (e.g. through "\s") or peek
+            # into the next one with a lookahead, so the title is re-checked
+            # alone; endpos hides the rest of the buffer from the pattern
+            if compiled_pattern.search(buffer, starts[index], line_end):
+                matches.append(self._videos[index])
+            pos = line_end + 1
+            if pos > len(buffer):
+                return matches
+
+    def _end(self, index):
+        """Returns the buffer offset just past the title at index."""
+        starts = self._starts
+        return starts[index + 1] - 1 if index + 1 < len(starts) else len(self._buffer)
@@ -0,0 +1,187 @@
+"""Command transcript recording and replay."""
+
+from .command_parser import CommandException
+import builtins
+import contextlib
+import io
+import json
+import sys
+import time
+
+
+class _Tee(io.StringIO):
+    """A string buffer that also echoes everything written to another stream,
+    so search prompts stay visible while their output is being captured."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self._stream = stream
+
+    def write(self, text):
+        self._stream.write(text)
+        return super().write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+
+def _run_command(parser, command, echo=False):
+    """Executes a command as run.py does, returning what it printed.
+
+    Args:
+        parser: The CommandParser to execute the command with.
+        command: The command words.
+        echo: Whether to also pass the output through to sys.stdout.
+    """
+    output = _Tee(sys.stdout) if echo else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            parser.execute_command(command)
+        except CommandException as e:
+            print(e)
+    return output.getvalue()
+
+
+@contextlib.contextmanager
+def _patched_input(replacement):
+    """Temporarily replaces builtins.input, which search prompts read from."""
+    original = builtins.input
+    builtins.input = replacement
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+class TranscriptRecorder:
+    """Wraps a CommandParser and records every command it executes.
+
+    Each command becomes one JSON line holding the seconds elapsed since
+    recording started ("t"), the command words ("cmd"), any answers typed at
+    search prompts ("in") and the printed output ("out").
+    """
+
+    def __init__(self, parser, transcript_file, clock=time.monotonic):
+        """The TranscriptRecorder class is initialized.
+
+        Args:
+            parser: The CommandParser to execute commands with.
+            transcript_file: An open text file the transcript is written to.
+            clock: Monotonic clock used to timestamp commands.
+        """
+        self._parser = parser
+        self._file = transcript_file
+        self._clock = clock
+        self._start = clock()
+
+    def execute_command(self, command):
+        """Executes a command, echoing and recording its output.
+
+        CommandExceptions are printed rather than raised, as in run.py.
+        """
+        elapsed = self._clock() - self._start
+        answers = []
+
+        def recording_input(*args):
+            answer = builtins_input(*args)
+            answers.append(answer)
+            return answer
+
+        builtins_input = builtins.input
+        with _patched_input(recording_input):
+            output = _run_command(self._parser, command, echo=True)
+        record = {"t": round(elapsed, 6), "cmd": list(command), "out": output}
+        if answers:
+            record["in"] = answers
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+
+def read_transcript(transcript_file):
+    """Returns the records of a transcript as a list of dictionaries."""
+    return [json.loads(line) for line in transcript_file if line.strip()]
+
+
+def _percentile(sorted_values, fraction):
+    """Returns the nearest-rank percentile of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1,
+                       round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class ReplayReport:
+    """Throughput, latency and divergence figures from a transcript replay."""
+
+    def __init__(self, latencies, wall_time, divergences):
+        self.latencies = latencies
+        self.wall_time = wall_time
+        self.divergences = divergences  # (record index, expected, actual)
+
+    @property
+    def commands(self):
+        """Returns the number of commands replayed."""
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        """Returns the number of commands replayed per second."""
+        return self.commands / self.wall_time if self.wall_time else 0.0
+
+    def percentile(self, fraction):
+        """Returns a per-command latency percentile in seconds.
+
+        Args:
+            fraction: The percentile as a fraction, e.g. 0.99.
+        """
+        return _percentile(sorted(self.latencies), fraction)
+
+    def __str__(self):
+        ordered = sorted(self.latencies)
+        lines = [
+            f"Replayed {self.commands} commands in {self.wall_time:.3f}s "
+            f"({self.throughput:.0f} commands/s)",
+            "Latency (ms): " + ", ".join(
+                f"p{round(fraction * 100)} "
+                f"{_percentile(ordered, fraction) * 1000:.3f}"
+                for fraction in (0.5, 0.9, 0.99, 1.0)),
+            f"{len(self.divergences)} commands produced different output",
+        ]
+        for index, expected, actual in self.divergences[:5]:
+            lines.append(f"\tcommand {index + 1}: expected {expected!r}, "
+                         f"got {actual!r}")
+        return "\n".join(lines)
+
+
+def replay_transcript(records, parser, speed=0.0, clock=time.perf_counter,
+                      sleep=time.sleep):
+    """Re-runs recorded commands and compares their output.
+
+    Args:
+        records: Transcript records, as returned by read_transcript().
+        parser: A CommandParser around a fresh VideoPlayer.
+        speed: 0 replays as fast as possible; otherwise the recorded gaps
+            between commands are divided by this factor (1.0 is real time).
+        clock: High resolution clock used for latencies.
+        sleep: Function used to wait between commands.
+
+    Returns:
+        A ReplayReport.
+    """
+    latencies = []
+    divergences = []
+    start = clock()
+    for index, record in enumerate(records):
+        if speed:
+            delay = record["t"] / speed - (clock() - start)
+            if delay > 0:
+                sleep(delay)
+        answers = iter(record.get("in", ()))
+        with _patched_input(lambda *args: next(answers, "")):
+            began = clock()
+            output = _run_command(parser, record["cmd"])
+            latencies.append(clock() - began)
+        if output != record["out"]:
+            divergences.append((index, record["out"], output))
+    return ReplayReport(latencies, clock() - start, divergences)
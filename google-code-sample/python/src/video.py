@@ -1,31 +1,44 @@
 """A video class."""
 
-from typing import Sequence
+from .tag_dictionary import DEFAULT_TAG_DICTIONARY
+from collections.abc import Iterable, Sequence
 
 
 class Video:
     """A class used to represent a Video."""
 
-    def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
+    def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str],
+                 tag_dictionary=DEFAULT_TAG_DICTIONARY):
         """Video constructor."""
         self._title = video_title
         self._video_id = video_id
 
-        # Turn the tags into a tuple here so it's unmodifiable,
-        # in case the caller changes the 'video_tags' they passed to us
-        self._tags = tuple(video_tags)
+        # Tags are stored as an array of ids from a shared dictionary, which
+        # also copies them in case the caller changes 'video_tags' later
+        self._tag_dictionary = tag_dictionary
+        self._tag_ids = tag_dictionary.encode(video_tags)
 
         # If the video is flagged this will contain the reason for it being flagged.
         # The empty string indicates the video is not flagged.
         self._flag_reason = ""
 
+        # Cached result of __str__, built on first use and reset whenever
+        # the flag reason changes (the only mutable part of a video).
+        self._description = None
+
+        # The VideoLibrary holding this video, which keeps its own flag state
+        # in sync with the flag reason. None while the video is not in one.
+        self._library = None
+
     def __str__(self):
         """Returns a string that neatly presents video details."""
-        formatted_tags = " ".join(self._tags)
-        description = f"{self._title} ({self._video_id}) [{formatted_tags}]"
-        if self._flag_reason:
-            description += f" - FLAGGED (reason: {self._flag_reason})"
-        return description
+        if self._description is None:
+            formatted_tags = " ".join(self.tags)
+            description = f"{self._title} ({self._video_id}) [{formatted_tags}]"
+            if self._flag_reason:
+                description += f" - FLAGGED (reason: {self._flag_reason})"
+            self._description = description
+        return self._description
 
     @property
     def title(self) -> str:
@@ -40,7 +53,17 @@ class Video:
     @property
     def tags(self) -> Sequence[str]:
         """Returns the list of tags of a video."""
-        return self._tags
+        return self._tag_dictionary.decode(self._tag_ids)
+
+    @property
+    def tag_ids(self) -> Sequence[int]:
+        """Returns the ids of the tags of a video in its tag dictionary."""
+        return self._tag_ids
+
+    @property
+    def tag_dictionary(self):
+        """Returns the tag dictionary the tag ids of a video refer to."""
+        return self._tag_dictionary
 
     @property
     def flag_reason(self) -> str:
@@ -51,7 +74,35 @@ class Video:
     def flag_reason(self, value):
         """Updates the _flag_reason atribute.
 
+        A video held by a VideoLibrary is updated through the library's
+        set_flag_reason(), so its flag mask, version, caches and subscribers
+        see the change.
+
         Args:
             value: The reason the video is being flagged (empty string indicates it's unflagged).
         """
-        self._flag_reason = value
+        if self._library is not None:
+            self._library.set_flag_reason(self._video_id, value)
+        else:
+            self._set_flag_reason(value)
+
+    def _set_flag_reason(self, value):
+        """Stores a new flag reason; used by the owning library."""
+        if value != self._flag_reason:
+            self._flag_reason = value
+            self._description = None
+
+
+def render_videos(videos: Iterable[Video], numbered: bool = False) -> str:
+    """Renders a listing of videos as a single tab-indented block of lines.
+
+    Args:
+        videos: The videos to render, in display order.
+        numbered: Whether to prefix each line with its 1-based position.
+
+    Returns:
+        The listing joined into one string, ready to be printed in one call.
+    """
+    if numbered:
+        return "\n".join(f"\t{i}) {video}" for i, video in enumerate(videos, 1))
+    return "\n".join(f"\t{video}" for video in videos)
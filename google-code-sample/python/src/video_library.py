@@ -1,8 +1,30 @@
 """A video library class."""
 
+from . import events
+from .catalog_file import open_catalog
+from .events import EventBus
+from .tag_dictionary import TagDictionary
+from .tag_index import TagIndex, bits_from_ordinals, iter_bits
 from .video import Video
-from pathlib import Path
-import csv
+import os
+
+
+# States stored per ordinal in the flag mask.
+_AVAILABLE = 0
+_FLAGGED = 1
+_REMOVED = 2
+
+# Maps flag mask bytes to the digits of a base 2 literal (removed counts as 0).
+_MASK_TO_BINARY = bytes.maketrans(b"\x00\x01\x02", b"010")
+
+# Counting facets through bitsets ANDs every tag's posting, a catalog wide
+# integer, with the results; walking the results costs about as much as
+# ANDing this many bits of postings per result.
+_FACET_BITS_PER_RESULT = 4096
+
+
+# The catalog shipped next to this module.
+DEFAULT_VIDEO_FILE = os.path.join(os.path.dirname(__file__), "videos.txt")
 
 
 # Helper Wrapper around CSV reader to strip whitespace from around
@@ -11,27 +33,248 @@ def _csv_reader_with_strip(reader):
     yield from ((item.strip() for item in line) for line in reader)
 
 
+def read_video_records(video_file):
+    """Parses a pipe-delimited catalog ("title | video_id | tag, tag").
+
+    Args:
+        video_file: An open text file (or any iterable of lines).
+
+    Yields:
+        (title, video_id, tags) tuples, where tags is a list of strings.
+    """
+    import csv  # pulls in re, so only imported once a catalog is loaded
+
+    reader = _csv_reader_with_strip(csv.reader(video_file, delimiter="|"))
+    for video_info in reader:
+        title, url, tags = video_info
+        yield title, url, [tag.strip() for tag in tags.split(",")] if tags else []
+
+
 class VideoLibrary:
     """A class used to represent a Video Library."""
 
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
+    def __init__(self, video_file=DEFAULT_VIDEO_FILE):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            video_file: Path of the pipe-delimited catalog to load; it may be
+                gzip, bz2 or xz compressed.
+        """
         self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+        self._version = 0
+        # Every video gets a dense ordinal (its slot in _videos_by_ordinal)
+        # which indexes the bitsets kept by the tag index.
+        self._ordinals = {}
+        self._videos_by_ordinal = []
+        self._tag_dictionary = TagDictionary()
+        self._tag_index = TagIndex(self._tag_dictionary)
+        self._related_index = None  # built on first related videos lookup
+        # One byte per ordinal holding _AVAILABLE, _FLAGGED or _REMOVED, so
+        # flag updates are O(1) and counts run in C via bytearray.count().
+        self._flag_mask = bytearray()
+        self._flagged_bits = 0
+        self._title_index = None  # built on first pattern search
+        self._events = EventBus()
+        with open_catalog(video_file) as catalog:
+            for title, url, tags in read_video_records(catalog):
+                self._index_video(Video(title, url, tags, self._tag_dictionary),
+                                  index_tags=False)
+        self._tag_index.add_many(
+            (ordinal, video.tag_ids)
+            for ordinal, video in enumerate(self._videos_by_ordinal)
+            if video is not None)
+
+    def _index_video(self, video, index_tags=True):
+        """Stores a video and indexes it under a dense ordinal.
+
+        With index_tags False the tag index is left for the caller to fill
+        in bulk.
+        """
+        self._unindex_video(video.video_id)
+        ordinal = len(self._videos_by_ordinal)
+        self._title_index = None
+        self._videos[video.video_id] = video
+        video._library = self
+        self._ordinals[video.video_id] = ordinal
+        self._videos_by_ordinal.append(video)
+        if index_tags:
+            tag_ids = self._own_tag_ids(video)
+            self._tag_index.add(ordinal, tag_ids)
+            if self._related_index is not None:
+                self._related_index.add(ordinal, tag_ids)
+        if video.flag_reason:
+            self._flag_mask.append(_FLAGGED)
+            self._flagged_bits = None
+        else:
+            self._flag_mask.append(_AVAILABLE)
+
+    def _own_tag_ids(self, video):
+        """Returns a video's tag ids in this library's tag dictionary."""
+        if video.tag_dictionary is self._tag_dictionary:
+            return video.tag_ids
+        return self._tag_dictionary.encode(video.tags)
+
+    @property
+    def tag_dictionary(self):
+        """Returns the dictionary encoding the tags of this library's videos."""
+        return self._tag_dictionary
+
+    def _unindex_video(self, video_id):
+        """Removes a video and its ordinal from the indexes, if present."""
+        video = self._videos.pop(video_id, None)
+        if video:
+            video._library = None
+            ordinal = self._ordinals.pop(video_id)
+            self._title_index = None
+            self._videos_by_ordinal[ordinal] = None
+            self._tag_index.remove(ordinal, self._own_tag_ids(video))
+            if self._related_index is not None:
+                self._related_index.remove(ordinal)
+            if self._flag_mask[ordinal] == _FLAGGED:
+                self._flagged_bits = None
+            self._flag_mask[ordinal] = _REMOVED
+        return video
+
+    @property
+    def version(self):
+        """Returns a counter that changes whenever the catalog or a flag changes."""
+        return self._version
+
+    def add_video(self, video):
+        """Adds a video to the library, replacing any video with the same id.
+
+        Args:
+            video: The Video object to add.
+        """
+        replaced = video.video_id in self._videos
+        self._index_video(video)
+        self._version += 1
+        self._events.publish(
+            events.VIDEO_REPLACED if replaced else events.VIDEO_ADDED,
+            self, (video.video_id,))
+
+    def remove_video(self, video_id):
+        """Removes a video from the library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The removed Video object. None if the video does not exist.
+        """
+        video = self._unindex_video(video_id)
+        if video:
+            self._version += 1
+            self._events.publish(events.VIDEO_REMOVED, self, (video_id,))
+        return video
+
+    def set_flag_reason(self, video_id, flag_reason):
+        """Updates the flag reason of a video (empty string unflags it).
+
+        Args:
+            video_id: The video url.
+            flag_reason: The new flag reason.
+        """
+        self.set_flag_reasons({video_id: flag_reason})
+
+    def set_flag_reasons(self, flag_reasons):
+        """Updates the flag reasons of many videos as one change: the version
+        moves once and at most one flagged and one unflagged event is sent.
+
+        Args:
+            flag_reasons: {video_id: flag_reason}; an empty reason unflags.
+
+        Raises:
+            KeyError: If a video does not exist; nothing is updated then.
+        """
+        ordinals = [self._ordinals[video_id] for video_id in flag_reasons]
+        flagged = []
+        unflagged = []
+        for ordinal, (video_id, flag_reason) in zip(ordinals, flag_reasons.items()):
+            self._videos[video_id]._set_flag_reason(flag_reason)
+            self._flag_mask[ordinal] = _FLAGGED if flag_reason else _AVAILABLE
+            (flagged if flag_reason else unflagged).append(video_id)
+        if not ordinals:
+            return
+        self._flagged_bits = None
+        self._version += 1
+        if flagged:
+            self._events.publish(events.VIDEO_FLAGGED, self, flagged)
+        if unflagged:
+            self._events.publish(events.VIDEO_UNFLAGGED, self, unflagged)
+
+    def subscribe(self, callback):
+        """Registers a callable receiving a ChangeEvent after every change."""
+        self._events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a callable registered with subscribe()."""
+        self._events.unsubscribe(callback)
+
+    def is_flagged(self, video_id):
+        """Returns boolean indicating if an existing video is flagged."""
+        return self._flag_mask[self._ordinals[video_id]] == _FLAGGED
+
+    def count_flagged(self):
+        """Returns the number of flagged videos in the library."""
+        return self._flag_mask.count(_FLAGGED)
+
+    def count_available(self):
+        """Returns the number of videos in the library that are not flagged."""
+        return self._flag_mask.count(_AVAILABLE)
+
+    @property
+    def flagged_bits(self):
+        """Returns the integer bitset of ordinals of flagged videos."""
+        if self._flagged_bits is None:
+            # The last ordinal becomes the most significant binary digit
+            binary = bytes(reversed(self._flag_mask)).translate(_MASK_TO_BINARY)
+            self._flagged_bits = int(binary, 2) if binary else 0
+        return self._flagged_bits
+
+    def get_random_available_video(self, rng=None):
+        """Returns a random video that is not flagged.
+
+        Args:
+            rng: The random number generator to draw from (defaults to the
+                random module).
+
+        Returns:
+            The Video object, or None if every video is flagged.
+        """
+        if rng is None:
+            import random
+            rng = random
+        mask = self._flag_mask
+        available = mask.count(_AVAILABLE)
+        if not available:
+            return None
+        # Rejection sampling needs few draws unless most videos are unavailable
+        if available * 4 >= len(mask):
+            while True:
+                ordinal = rng.randrange(len(mask))
+                if mask[ordinal] == _AVAILABLE:
+                    return self._videos_by_ordinal[ordinal]
+        nth = rng.randrange(available)
+        ordinal = -1
+        for _ in range(nth + 1):
+            ordinal = mask.index(_AVAILABLE, ordinal + 1)
+        return self._videos_by_ordinal[ordinal]
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
         return list(self._videos.values())
 
+    def videos(self):
+        """Returns a live, read-only view of all videos in the library.
+
+        Unlike get_all_videos() this does not copy the catalog.
+        """
+        return self._videos.values()
+
+    def __len__(self):
+        return len(self._videos)
+
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
 
@@ -43,3 +286,132 @@ class VideoLibrary:
             does not exist.
         """
         return self._videos.get(video_id, None)
+
+    def get_ordinal(self, video_id):
+        """Returns the dense ordinal of a video. None if it does not exist."""
+        return self._ordinals.get(video_id)
+
+    def get_video_by_ordinal(self, ordinal):
+        """Returns the video with a dense ordinal. None if it was removed."""
+        return self._videos_by_ordinal[ordinal]
+
+    def videos_from_bits(self, bits):
+        """Returns the videos whose ordinals are set in an integer bitset."""
+        return [self._videos_by_ordinal[ordinal] for ordinal in iter_bits(bits)]
+
+    def search_titles(self, search_term, exclude_flagged=False):
+        """Returns the videos whose titles contain a search term.
+
+        Args:
+            search_term: The text to look for (case insensitive).
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        search_term = search_term.lower()
+        return [
+            video for video in self._videos.values()
+            if search_term in video.title.lower()
+            and not (exclude_flagged and video.flag_reason)]
+
+    def search_title_pattern(self, compiled_pattern, exclude_flagged=False):
+        """Returns the videos whose titles contain a match of a pattern.
+
+        Args:
+            compiled_pattern: A pattern from title_index.compile_title_pattern.
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        if self._title_index is None:
+            from .title_index import TitleIndex
+
+            # Removed ordinals are skipped, so the buffer holds live titles only
+            self._title_index = TitleIndex(
+                video for video in self._videos_by_ordinal if video)
+        videos = self._title_index.search(compiled_pattern)
+        if exclude_flagged:
+            videos = [video for video in videos if not video.flag_reason]
+        return videos
+
+    def get_related_videos(self, video_id, count):
+        """Returns the unflagged videos whose tags are most similar to those
+        of a video, found through the MinHash/LSH index.
+
+        Args:
+            video_id: The video url.
+            count: The maximum number of videos to return.
+
+        Returns:
+            (similarity, Video) pairs, most similar first (ties by title).
+        """
+        if self._related_index is None:
+            from .related_videos import RelatedVideosIndex
+
+            self._related_index = RelatedVideosIndex()
+            for ordinal, video in enumerate(self._videos_by_ordinal):
+                if video is not None:
+                    self._related_index.add(ordinal, self._own_tag_ids(video))
+        mask = self._flag_mask
+        related = self._related_index.related(
+            self._ordinals[video_id],
+            exclude=lambda ordinal: mask[ordinal] != _AVAILABLE)
+        pairs = [(similarity, self._videos_by_ordinal[ordinal])
+                 for similarity, ordinal in related]
+        pairs.sort(key=lambda pair: (-pair[0], pair[1].title))
+        return pairs[:count]
+
+    def get_tag_facets(self, videos):
+        """Returns how many of the given videos carry each tag.
+
+        Result sets that are large next to the number of tags times the
+        catalog size are counted by intersecting their bitset with each
+        tag's postings; others by walking their own tag ids.
+
+        Args:
+            videos: Videos of this library, e.g. search results.
+
+        Returns:
+            (tag, count) pairs, most common first (ties by tag).
+        """
+        videos = list(videos)
+        posting_bits = len(self._tag_dictionary) * len(self._flag_mask)
+        if posting_bits > len(videos) * _FACET_BITS_PER_RESULT:
+            counts = {}
+            for video in videos:
+                for tag_id in set(self._own_tag_ids(video)):
+                    counts[tag_id] = counts.get(tag_id, 0) + 1
+        else:
+            counts = self._tag_index.facet_counts(bits_from_ordinals(
+                self._ordinals[video.video_id] for video in videos))
+        tag = self._tag_dictionary.tag
+        facets = [(tag(tag_id), count) for tag_id, count in counts.items()]
+        facets.sort(key=lambda facet: (-facet[1], facet[0]))
+        return facets
+
+    def get_videos_with_tag(self, tag, exclude_flagged=False):
+        """Returns the videos carrying a tag, in ordinal order.
+
+        As in the original player, the lower case form of the tag must equal
+        a video's tag as stored, so "#CAT" finds "#cat" but not "#Cat".
+
+        Args:
+            tag: The tag to look up.
+            exclude_flagged: Whether to leave out flagged videos.
+        """
+        bits = self._tag_index.spelling_postings(tag.lower())
+        if exclude_flagged:
+            bits &= ~self.flagged_bits
+        return self.videos_from_bits(bits)
+
+    def query_tags(self, tag_query, exclude_flagged=False):
+        """Returns the videos matching a boolean tag query.
+
+        Args:
+            tag_query: A parsed TagQuery.
+            exclude_flagged: Whether to leave out flagged videos.
+
+        Returns:
+            The matching Video objects in ordinal order.
+        """
+        bits = tag_query.evaluate(
+            self._tag_index.postings, self._tag_index.universe)
+        if exclude_flagged:
+            bits &= ~self.flagged_bits
+        return self.videos_from_bits(bits)
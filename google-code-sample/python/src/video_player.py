@@ -1,28 +1,119 @@
 """A video player class."""
 
+from . import events
+from .command_parser import CommandException
+from .video import render_videos
+from . import playback_history
+from .playback_history import PlaybackHistory
+from .heavy_hitters import SpaceSaving
+from .search_cache import SearchCache
+from .search_results import SearchResults
+from .tag_query import TagQuery, TagQueryException
 from .video_library import VideoLibrary
 from .video_playlist import Playlist
-import random
+from .watch_time import WatchTimeAggregate, WatchTimeRecorder
+import sys
+import threading
 
 class VideoPlayer:
     """A class used to represent a Video Player."""
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
+    def __init__(self, load_in_background=False, library_factory=VideoLibrary,
+                 playlist_factory=Playlist, play_counter=None, watch_time=None,
+                 trace_memory=False):
+        """The VideoPlayer class is initialized.
+
+        Args:
+            load_in_background: Whether to load the video library on a
+                background thread. Commands that need the library then wait
+                for it to finish loading.
+            library_factory: Callable returning the video library backend.
+            playlist_factory: Callable taking a title and returning a new
+                playlist.
+            play_counter: SpaceSaving sketch counting plays for TOP_PLAYED;
+                pass the same one to several players to count across
+                sessions. Each player gets its own by default.
+            watch_time: WatchTimeAggregate receiving this session's play
+                counts and watch time; share one to add up several sessions.
+                Each player gets its own, kept in memory only, by default.
+            trace_memory: Whether to trace allocations from startup, so the
+                MEMORY report covers loading the library. Otherwise tracing
+                starts with the first MEMORY command.
+        """
+        self._memory_reporter = None
+        if trace_memory:
+            from .memory_report import MemoryReporter
+
+            self._memory_reporter = MemoryReporter()
+            self._memory_reporter.start()
+        self._play_counter = play_counter if play_counter is not None else SpaceSaving()
+        self._watch_time = WatchTimeRecorder(
+            watch_time if watch_time is not None else WatchTimeAggregate())
+        self._library_factory = library_factory
+        self._playlist_factory = playlist_factory
+        self._library = None
+        self._library_error = None
+        self._library_ready = threading.Event()
+        self._playlists = {}
+        if load_in_background:
+            threading.Thread(target=self._load_library, daemon=True).start()
+        else:
+            self._load_library()
         self._current_video_id = ""
         self._paused = False
-        self._playlists = {}
+        self._search_cache = SearchCache()
+        self._history = PlaybackHistory()
+        self._last_results = None
+
+    def _load_library(self):
+        """Loads the video library and signals that it is ready."""
+        try:
+            self._library = self._library_factory()
+            self._library.subscribe(self._on_library_change)
+            # Backends that persist playlists hand back the ones they stored
+            stored_playlists = getattr(self._library, "stored_playlists", None)
+            if stored_playlists:
+                for playlist in stored_playlists():
+                    self._playlists.setdefault(playlist.title.lower(), playlist)
+        except Exception as e:
+            self._library_error = e
+        finally:
+            self._library_ready.set()
+
+    def _on_library_change(self, event):
+        """Drops videos removed from the library from every playlist."""
+        if event.kind == events.VIDEO_REMOVED:
+            for playlist in self._playlists.values():
+                playlist.remove_videos(event.video_ids)
+
+    @property
+    def library_ready(self):
+        """Returns boolean indicating if the video library has finished loading."""
+        return self._library_ready.is_set()
+
+    @property
+    def _video_library(self):
+        """Returns the video library, waiting for it to load if necessary.
+        Raises CommandException if the library failed to load."""
+        if not self._library_ready.is_set():
+            print("Loading video library, please wait...", file=sys.stderr)
+            self._library_ready.wait()
+        if self._library_error is not None:
+            raise CommandException(
+                f"Cannot load video library: {self._library_error}"
+            ) from self._library_error
+        return self._library
 
     def number_of_videos(self):
-        num_videos = len(self._video_library.get_all_videos())
+        num_videos = len(self._video_library)
         print(f"{num_videos} videos in the library")
 
     def show_all_videos(self):
         """Shows all videos."""
         print("Here's a list of all available videos:")
-        videos = sorted(self._video_library.get_all_videos(), key=lambda v: v.title)
-        for video in videos:
-            print(f"\t{video}")  ## utilises str dunder method of video object
+        videos = sorted(self._video_library.videos(), key=lambda v: v.title)
+        if videos:
+            print(render_videos(videos))  ## utilises str dunder method of video object
         
     def play_video(self, video_id):
         """Plays the respective video.
@@ -37,6 +128,8 @@ class VideoPlayer:
             else:
                 self.stop_current_video()
                 self._current_video_id = video.video_id
+                self._record_event(video_id, playback_history.PLAY)
+                self._play_counter.add(video_id)
                 print(f"Playing video: {video.title}")
         else :
             print("Cannot play video: Video does not exist")       
@@ -52,18 +145,19 @@ class VideoPlayer:
         """Helper function for self.stop_video(), created to avoid repetition of code in other areas"""
         if self._current_video_id:
             video_to_stop = self._video_library.get_video(self._current_video_id)
+            self._record_event(self._current_video_id, playback_history.STOP)
             print(f"Stopping video: {video_to_stop.title}")
             self._current_video_id = ""
             self._paused = False
             
     def play_random_video(self):
         """Plays a random video from the video library."""
-        all_videos = self._video_library.get_all_videos()
-        all_videos = list(filter(lambda v: not v.flag_reason, all_videos))  # only get videos that aren't flagged
-        if all_videos:
+        video = self._video_library.get_random_available_video()  # only videos that aren't flagged
+        if video:
             self.stop_current_video()
-            video = all_videos[random.randint(0, len(all_videos) - 1)]
             self._current_video_id = video.video_id
+            self._record_event(video.video_id, playback_history.PLAY)
+            self._play_counter.add(video.video_id)
             print(f"Playing video: {video.title}")
         else:
             print("No videos available")
@@ -75,6 +169,7 @@ class VideoPlayer:
             print(f"Video already paused: {video.title}")
         elif self._current_video_id:
             self._paused = True
+            self._record_event(self._current_video_id, playback_history.PAUSE)
             video = self._video_library.get_video(self._current_video_id)
             print(f"Pausing video: {video.title}")          
         else:
@@ -84,6 +179,7 @@ class VideoPlayer:
         """Resumes playing the current video."""
         if self._paused:
            self._paused = False
+           self._record_event(self._current_video_id, playback_history.CONTINUE)
            video = self._video_library.get_video(self._current_video_id)
            print(f"Continuing video: {video.title}")
         elif self._current_video_id:
@@ -100,6 +196,151 @@ class VideoPlayer:
         else:
             print("No video is currently playing")
 
+    def _record_event(self, video_id, event):
+        """Appends a playback event for a video to the session history and
+        accounts for its watch time."""
+        self._history.record(self._video_library.get_ordinal(video_id), event)
+        self._watch_time.record(video_id, event)
+
+    def show_history(self, count=10):
+        """Displays the most recent playback events, newest first.
+
+        Args:
+            count: The maximum number of events to show.
+        """
+        records = list(self._history.recent(count))
+        if records:
+            print("Playback history:")
+            for ordinal, event, _ in records:
+                video = self._video_library.get_video_by_ordinal(ordinal)
+                title = video.title if video else "(removed video)"
+                print(f"\t{playback_history.EVENT_NAMES[event]}: {title}")
+        else:
+            print("No playback history yet")
+
+    def show_recently_played(self, count=5):
+        """Displays the most recently played distinct videos, newest first.
+
+        Args:
+            count: The maximum number of videos to show.
+        """
+        videos = [
+            self._video_library.get_video_by_ordinal(ordinal)
+            for ordinal in self._history.recently_played(count)]
+        videos = [video for video in videos if video]
+        if videos:
+            print("Recently played videos:")
+            print(render_videos(videos, numbered=True))
+        else:
+            print("No videos have been played yet")
+
+    def query_top_played(self, count=10):
+        """Returns up to count (Video, estimated plays) pairs of the most
+        played videos that are still in the library, most played first.
+
+        Estimates come from the play counter and may exceed the true number
+        of plays by at most its error_bound.
+        """
+        top = []
+        for video_id, plays in self._play_counter.top(len(self._play_counter)):
+            if len(top) == count:
+                break
+            video = self._video_library.get_video(video_id)
+            if video:
+                top.append((video, plays))
+        return top
+
+    def show_top_played(self, count=10):
+        """Displays the most played videos.
+
+        Args:
+            count: The maximum number of videos to show.
+        """
+        top = self.query_top_played(count)
+        if top:
+            print("Top played videos:")
+            for i, (video, plays) in enumerate(top, 1):
+                print(f"\t{i}) {video} - {plays} plays")
+        else:
+            print("No videos have been played yet")
+
+    def flush_watch_time(self):
+        """Merges this session's buffered watch time into the shared aggregate."""
+        self._watch_time.flush()
+
+    def query_watch_time(self, count=10):
+        """Returns up to count (Video, plays, seconds watched) tuples of the
+        longest watched videos that are still in the library, including this
+        session's unflushed time."""
+        self.flush_watch_time()
+        aggregate = self._watch_time.aggregate
+        top = []
+        for video_id, plays, seconds in aggregate.top(len(aggregate)):
+            if len(top) == count:
+                break
+            video = self._video_library.get_video(video_id)
+            if video:
+                top.append((video, plays, seconds))
+        return top
+
+    def show_watch_time(self, count=10):
+        """Displays the videos watched for longest.
+
+        Args:
+            count: The maximum number of videos to show.
+        """
+        from .watch_time import format_duration
+
+        top = self.query_watch_time(count)
+        if top:
+            print("Most watched videos:")
+            for i, (video, plays, seconds) in enumerate(top, 1):
+                print(f"\t{i}) {video} - {format_duration(seconds)} over {plays} plays")
+        else:
+            print("No videos have been played yet")
+
+    def memory_estimates(self):
+        """Returns {subsystem: estimated bytes} for the video library, the
+        playlists and the rest of this session's state."""
+        from . import memory_report
+        from .video import Video
+
+        session_state = (self._history, self._search_cache, self._play_counter,
+                         self._watch_time, self._last_results)
+        return {
+            memory_report.LIBRARY: memory_report.estimate_library_size(self._video_library),
+            memory_report.PLAYLISTS: memory_report.deep_sizeof(
+                self._playlists, exclude_types=(Video,)),
+            memory_report.SESSION: memory_report.deep_sizeof(
+                session_state, exclude_types=(Video,)),
+        }
+
+    def show_memory_report(self):
+        """Displays estimated and traced memory use per subsystem."""
+        from .memory_report import MemoryReporter, format_bytes
+
+        if self._memory_reporter is None:
+            self._memory_reporter = MemoryReporter()
+        if self._memory_reporter.start():
+            print("Started tracing allocations; earlier ones, such as loading "
+                  "the library, are not traced. Use MEMORY STOP to stop.")
+        rows, current, peak = self._memory_reporter.report(self.memory_estimates())
+        print(f"Memory report (traced: {format_bytes(current)} current, "
+              f"{format_bytes(peak)} peak):")
+        for subsystem, estimated, traced, largest, growth in rows:
+            growth_text = "" if growth is None else f", {growth:+,} B since last report"
+            print(f"\t{subsystem}: ~{format_bytes(estimated)} in objects, "
+                  f"{format_bytes(traced)} traced (largest seen {format_bytes(largest)})"
+                  f"{growth_text}")
+
+    def stop_memory_tracing(self):
+        """Stops the allocation tracing started for MEMORY reports."""
+        if self._memory_reporter is None or not self._memory_reporter.tracing:
+            print("Memory tracing is not running")
+            return
+        self._memory_reporter.stop()
+        print("Stopped tracing allocations")
+
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
 
@@ -115,7 +356,7 @@ class VideoPlayer:
             else:
                 # the _playlist dictionary uses the lower case version of the playlist name...
                 # ... as the key, however the Playlist object stores the original name
-                self._playlists[playlist_name.lower()] = Playlist(playlist_name)
+                self._playlists[playlist_name.lower()] = self._playlist_factory(playlist_name)
                 print(f"Successfully created new playlist: {playlist_name}")
 
     def add_to_playlist(self, playlist_name, video_id):
@@ -128,7 +369,7 @@ class VideoPlayer:
         if playlist_name.lower() in set(self._playlists.keys()):
             video = self._video_library.get_video(video_id)
             if video:
-                if not video.flag_reason:
+                if not self._video_library.is_flagged(video_id):
                     playlist = self._playlists[playlist_name.lower()]
                     if playlist.contains_video(video_id):
                         print(f"Cannot add video to {playlist_name}: Video already added")
@@ -142,6 +383,116 @@ class VideoPlayer:
         else:
             print(f"Cannot add video to {playlist_name}: Playlist does not exist")
 
+    def add_many_to_playlist(self, playlist_name, video_ids):
+        """Adds several videos to a playlist and prints a one line summary.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be added.
+        """
+        playlist = self._playlists.get(playlist_name.lower())
+        if playlist is None:
+            print(f"Cannot add videos to {playlist_name}: Playlist does not exist")
+            return
+        library = self._video_library
+        valid_ids = []
+        flagged = missing = 0
+        for video_id in video_ids:
+            if library.get_video(video_id) is None:
+                missing += 1
+            elif library.is_flagged(video_id):
+                flagged += 1
+            else:
+                valid_ids.append(video_id)
+        added = playlist.add_videos(valid_ids)
+        already_added = len(valid_ids) - len(added)
+        print(f"Added {len(added)} videos to {playlist_name} "
+              f"({already_added} already added, {flagged} flagged, "
+              f"{missing} do not exist)")
+
+    def remove_many_from_playlist(self, playlist_name, video_ids):
+        """Removes several videos from a playlist and prints a one line summary.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be removed.
+        """
+        playlist = self._playlists.get(playlist_name.lower())
+        if playlist is None:
+            print(f"Cannot remove videos from {playlist_name}: Playlist does not exist")
+            return
+        video_ids = list(video_ids)
+        removed = playlist.remove_videos(video_ids)
+        missing = not_in_playlist = 0
+        for video_id in video_ids:
+            if video_id in removed:
+                continue
+            if self._video_library.get_video(video_id) is None:
+                missing += 1
+            else:
+                not_in_playlist += 1
+        print(f"Removed {len(removed)} videos from {playlist_name} "
+              f"({not_in_playlist} not in playlist, {missing} do not exist)")
+
+    def combine_playlists(self, operation, new_playlist_name, playlist_names):
+        """Creates a playlist from the union, intersection or difference of
+        existing playlists.
+
+        Runs in one pass over the inputs using hash sets. Videos keep the
+        order of the first playlist (then of the following ones, for a
+        union) and flagged videos are left out.
+
+        Args:
+            operation: UNION, INTERSECT or DIFF. DIFF keeps the videos of the
+                first playlist that are in none of the others.
+            new_playlist_name: The name of the playlist to create.
+            playlist_names: The names of two or more existing playlists.
+        """
+        error = f"Cannot create playlist {new_playlist_name}"
+        if " " in new_playlist_name:
+            print(f"{error}: Playlist name cannot contain spaces")
+            return
+        if new_playlist_name.lower() in self._playlists:
+            print(f"{error}: A playlist with the same name already exists")
+            return
+        playlists = []
+        for name in playlist_names:
+            playlist = self._playlists.get(name.lower())
+            if playlist is None:
+                print(f"{error}: Playlist {name} does not exist")
+                return
+            playlists.append(playlist.view())
+
+        first, others = playlists[0], playlists[1:]
+        if operation == "UNION":
+            candidates = [video_id for playlist in playlists for video_id in playlist]
+        elif operation == "INTERSECT":
+            other_sets = [set(playlist) for playlist in others]
+            candidates = [video_id for video_id in first
+                          if all(video_id in other for other in other_sets)]
+        else:
+            excluded = set().union(*others)
+            candidates = [video_id for video_id in first if video_id not in excluded]
+
+        library = self._video_library
+        seen = set()
+        video_ids = []
+        flagged = 0
+        for video_id in candidates:
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+            if library.is_flagged(video_id):
+                flagged += 1
+            else:
+                video_ids.append(video_id)
+        playlist = self._playlist_factory(new_playlist_name)
+        playlist.add_videos(video_ids)
+        self._playlists[new_playlist_name.lower()] = playlist
+        print(f"Created playlist {new_playlist_name} with {len(video_ids)} videos "
+              f"({operation.lower()} of {', '.join(playlist_names)}; "
+              f"{flagged} flagged skipped)")
+
     def show_all_playlists(self):
         """Display all playlists."""
         if self._playlists:
@@ -164,9 +515,8 @@ class VideoPlayer:
             print(f"Showing playlist: {playlist_name}")
             playlist = self._playlists[playlist_name.lower()]
             if not playlist.empty():
-                for video_id in playlist.videos:
-                    video = self._video_library.get_video(video_id)
-                    print(f"\t{video}")
+                videos = map(self._video_library.get_video, playlist.view())
+                print(render_videos(videos))
             else:
                 print("\tNo videos here yet")
         else:
@@ -181,7 +531,7 @@ class VideoPlayer:
         """
         if playlist_name.lower() in self._playlists:
             playlist = self._playlists[playlist_name.lower()]
-            if video_id in playlist._videos:
+            if playlist.contains_video(video_id):
                 video_title = self._video_library.get_video(video_id).title
                 playlist.remove(video_id)
                 print(f"Removed video from {playlist_name}: {video_title}")
@@ -212,39 +562,198 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
         if playlist_name.lower() in self._playlists:
-            self._playlists.pop(playlist_name.lower())
+            self._playlists.pop(playlist_name.lower()).delete()
             print(f"Deleted playlist: {playlist_name}")
         else:
             print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
             
-    def search_videos(self, search_term):
-        """Display all the videos whose titles contain the search_term.
+    def _find_videos(self, search_term):
+        """Returns the unflagged videos whose titles contain the search_term,
+        sorted by title. Results are served from the search cache when possible."""
+        version = self._video_library.version
+        filtered_videos = self._search_cache.get("title", search_term, version)
+        if filtered_videos is None:
+            filtered_videos = self._video_library.search_titles(search_term, exclude_flagged=True)
+            filtered_videos.sort(key=lambda v: v.title)
+            self._search_cache.put("title", search_term, version, filtered_videos)
+        return filtered_videos
+
+    def _find_videos_tag(self, video_tag):
+        """Returns the unflagged videos tagged with video_tag, sorted by title.
+        Results are served from the search cache when possible."""
+        version = self._video_library.version
+        filtered_videos = self._search_cache.get("tag", video_tag, version)
+        if filtered_videos is None:
+            filtered_videos = self._video_library.get_videos_with_tag(video_tag, exclude_flagged=True)
+            filtered_videos.sort(key=lambda v: v.title)
+            self._search_cache.put("tag", video_tag, version, filtered_videos)
+        return filtered_videos
+
+    def search_cache_stats(self):
+        """Displays hit, miss and eviction statistics of the search cache."""
+        stats = self._search_cache.stats()
+        print(f"Search cache: {stats['size']}/{stats['capacity']} entries, "
+              f"{stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions")
+
+    def query_videos(self, search_term):
+        """Returns the unflagged videos whose titles contain the search_term.
+
+        Prints nothing and does not wait for input; the result set also
+        becomes the one PLAY_RESULT plays from.
 
         Args:
             search_term: The query to be used in search.
+
+        Returns:
+            A SearchResults handle, sorted by title.
         """
-        videos = self._video_library.get_all_videos()
-        filtered_videos = list(filter(lambda video: search_term.lower() in video.title.lower(), videos))
-        filtered_videos = list(filter(lambda video: not video.flag_reason, filtered_videos))
+        self._last_results = SearchResults(search_term, self._find_videos(search_term))
+        return self._last_results
+
+    def query_videos_tag(self, video_tag):
+        """Returns the unflagged videos whose tags contain the provided tag.
+
+        Args:
+            video_tag: The video tag to be used in search.
+
+        Returns:
+            A SearchResults handle, sorted by title.
+        """
+        self._last_results = SearchResults(video_tag, self._find_videos_tag(video_tag))
+        return self._last_results
+
+    def query_videos_tag_query(self, expression):
+        """Returns the unflagged videos whose tags satisfy a boolean expression.
+        Raises TagQueryException if the expression is malformed.
+
+        Args:
+            expression: A query such as "#cat AND #animal AND NOT #dog".
+
+        Returns:
+            A SearchResults handle, sorted by title.
+        """
+        filtered_videos = self._video_library.query_tags(TagQuery(expression), exclude_flagged=True)
         filtered_videos.sort(key=lambda v: v.title)
-        if filtered_videos:
-            print(f"Here are the results for {search_term}:")
-            for i in range(len(filtered_videos)):
-                print(f"\t{i+1}) {filtered_videos[i]}")
+        self._last_results = SearchResults(expression, filtered_videos)
+        return self._last_results
+
+    def query_videos_matching(self, pattern, glob=False):
+        """Returns the unflagged videos whose titles match a pattern.
+        Raises re.error if the pattern is not a valid regex.
+
+        Args:
+            pattern: A regex found anywhere in the title, or with glob=True a
+                shell-style glob matching the whole title (case insensitive).
+            glob: Whether the pattern is a glob.
+
+        Returns:
+            A SearchResults handle, sorted by title.
+        """
+        from .title_index import compile_title_pattern
+
+        compiled_pattern = compile_title_pattern(pattern, glob)
+        filtered_videos = self._video_library.search_title_pattern(compiled_pattern, exclude_flagged=True)
+        filtered_videos.sort(key=lambda v: v.title)
+        self._last_results = SearchResults(pattern, filtered_videos)
+        return self._last_results
+
+    def query_related_videos(self, video_id, count=5):
+        """Returns the unflagged videos whose tags are most similar to those
+        of a video, or None if the video does not exist.
+
+        Args:
+            video_id: The video_id to find related videos for.
+            count: The maximum number of videos to return.
+
+        Returns:
+            A SearchResults handle, most similar first.
+        """
+        video = self._video_library.get_video(video_id)
+        if video is None:
+            return None
+        related = self._video_library.get_related_videos(video_id, count)
+        self._last_results = SearchResults(video.title, [video for _, video in related])
+        return self._last_results
+
+    def show_related_videos(self, video_id, count=5):
+        """Displays the videos whose tags are most similar to those of a video.
+
+        Args:
+            video_id: The video_id to find related videos for.
+            count: The maximum number of videos to show.
+        """
+        results = self.query_related_videos(video_id, count)
+        if results is None:
+            print("Cannot show related videos: Video does not exist")
+        elif results:
+            print(f"Videos related to {results.query}:")
+            print(render_videos(results, numbered=True))
+        else:
+            print(f"No related videos for {results.query}")
+
+    def query_facets(self):
+        """Returns (tag, count) pairs for the most recent search results, most
+        common first, or None if no search has been made yet."""
+        if self._last_results is None:
+            return None
+        return self._video_library.get_tag_facets(self._last_results)
+
+    def show_facets(self):
+        """Displays how many of the most recent search results carry each tag."""
+        facets = self.query_facets()
+        if facets is None:
+            print("Cannot show tag counts: No search has been made yet")
+        elif facets:
+            formatted_facets = ", ".join(f"{tag} ({count})" for tag, count in facets)
+            print(f"Tags in the results for {self._last_results.query}: {formatted_facets}")
+        else:
+            print(f"No tags in the results for {self._last_results.query}")
+
+    def play_result(self, result_number):
+        """Plays a video from the most recent search results.
+
+        Args:
+            result_number: The 1-based position of the video in the results.
+        """
+        if self._last_results is None:
+            print("Cannot play result: No search has been made yet")
+        elif 0 < result_number <= len(self._last_results):
+            self.play_video(self._last_results[result_number - 1].video_id)
+        else:
+            print(f"Cannot play result: No result number {result_number}")
+
+    def _display_search_results(self, results):
+        """Lists search results and plays the one the user selects, if any.
+
+        Args:
+            results: The SearchResults to list.
+        """
+        if results:
+            print(f"Here are the results for {results.query}:")
+            print(render_videos(results, numbered=True))
             print("Would you like to play any of the above? If yes, specify the number of the video.")
             print("If your answer is not a valid number, we will assume it's a no.")
 
             try:
                 answer = int(input())
-                if answer > 0 and answer <= len(filtered_videos):
-                    self.play_video(filtered_videos[answer - 1].video_id)
+                if answer > 0 and answer <= len(results):
+                    self.play_video(results[answer - 1].video_id)
                 else:
                     raise ValueError
             except ValueError:
                 pass  # didn't select valid video index
 
         else:
-            print(f"No search results for {search_term}")
+            print(f"No search results for {results.query}")
+
+    def search_videos(self, search_term):
+        """Display all the videos whose titles contain the search_term.
+
+        Args:
+            search_term: The query to be used in search.
+        """
+        self._display_search_results(self.query_videos(search_term))
 
     def search_videos_tag(self, video_tag):
         """Display all videos whose tags contains the provided tag.
@@ -252,28 +761,37 @@ class VideoPlayer:
         Args:
             video_tag: The video tag to be used in search.
         """
-        videos = self._video_library.get_all_videos()
-        filtered_videos = list(filter(lambda video: video_tag.lower() in video.tags, videos))
-        filtered_videos = list(filter(lambda video: not video.flag_reason, filtered_videos))
-        filtered_videos.sort(key=lambda v: v.title)
-        if filtered_videos:
-            print(f"Here are the results for {video_tag}:")
-            for i in range(len(filtered_videos)):
-                print(f"\t{i+1}) {filtered_videos[i]}")
-            print("Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
+        self._display_search_results(self.query_videos_tag(video_tag))
 
-            try:
-                answer = int(input())
-                if answer > 0 and answer <= len(filtered_videos):
-                    self.play_video(filtered_videos[answer - 1].video_id)
-                else:
-                    raise ValueError
-            except ValueError:
-                pass  # didn't select valid video index
+    def search_videos_tag_query(self, expression):
+        """Display all videos whose tags satisfy a boolean tag expression.
+
+        Args:
+            expression: A query such as "#cat AND #animal AND NOT #dog".
+        """
+        try:
+            results = self.query_videos_tag_query(expression)
+        except TagQueryException as e:
+            print(f"Cannot search videos: {e}")
+            return
+        self._display_search_results(results)
+
+    def search_videos_matching(self, pattern, glob=False):
+        """Display all videos whose titles match a regex or glob pattern.
+
+        Args:
+            pattern: The regex or glob to match titles against.
+            glob: Whether the pattern is a glob.
+        """
+        import re
+
+        try:
+            results = self.query_videos_matching(pattern, glob)
+        except re.error as e:
+            print(f"Cannot search videos: Invalid pattern ({e})")
+            return
+        self._display_search_results(results)
 
-        else:
-            print(f"No search results for {video_tag}")
     def flag_video(self, video_id, flag_reason=""):
         """Mark a video as flagged.
 
@@ -285,15 +803,14 @@ class VideoPlayer:
         if video:
             if not video.flag_reason:
                 
-                if flag_reason:
-                    video.flag_reason = flag_reason
-                else:
-                    video.flag_reason = "Not supplied"
+                if not flag_reason:
+                    flag_reason = "Not supplied"
+                self._video_library.set_flag_reason(video_id, flag_reason)
                     
                 if video_id == self._current_video_id:
                     self.stop_video()
                 
-                print(f"Successfully flagged video: {video.title} (reason: {video.flag_reason})")
+                print(f"Successfully flagged video: {video.title} (reason: {flag_reason})")
             else:
                 print("Cannot flag video: Video is already flagged")
         else:
@@ -308,9 +825,55 @@ class VideoPlayer:
         video = self._video_library.get_video(video_id)
         if video:
             if video.flag_reason:
-                video.flag_reason = ""
+                self._video_library.set_flag_reason(video_id, "")
                 print(f"Successfully removed flag from video: {video.title}")
             else:
                 print("Cannot remove flag from video: Video is not flagged")
         else:
             print("Cannot remove flag from video: Video does not exist")
+
+    def moderate_videos(self, rows):
+        """Applies a batch of flag decisions as one library change and prints
+        a summary instead of one line per video.
+
+        Rows are applied in order, so a later row for the same video sees the
+        effect of earlier ones. Rows that would not change anything (flagging a
+        flagged video or allowing one that is not flagged) are skipped.
+
+        Args:
+            rows: (video_id, action, reason) tuples, where action is
+                moderation.FLAG or moderation.ALLOW.
+        """
+        from .moderation import FLAG
+
+        library = self._video_library
+        original = {}
+        pending = {}  # video_id -> flag reason after the rows seen so far
+        flagged = allowed = skipped = 0
+        unknown = []
+        for video_id, action, reason in rows:
+            if video_id not in pending:
+                video = library.get_video(video_id)
+                if video is None:
+                    unknown.append(video_id)
+                    continue
+                original[video_id] = pending[video_id] = video.flag_reason
+            if action == FLAG and not pending[video_id]:
+                pending[video_id] = reason or "Not supplied"
+                flagged += 1
+            elif action != FLAG and pending[video_id]:
+                pending[video_id] = ""
+                allowed += 1
+            else:
+                skipped += 1
+        library.set_flag_reasons({
+            video_id: reason for video_id, reason in pending.items()
+            if reason != original[video_id]})
+        if pending.get(self._current_video_id):
+            self.stop_current_video()
+        print(f"Moderation batch applied: {flagged} flagged, {allowed} allowed, "
+              f"{skipped} skipped, {len(unknown)} unknown")
+        if unknown:
+            shown = ", ".join(unknown[:10])
+            more = f" and {len(unknown) - 10} more" if len(unknown) > 10 else ""
+            print(f"Unknown video ids: {shown}{more}")
@@ -1,20 +1,63 @@
 """A video playlist class."""
 
+from . import events
+from .events import EventBus
+from collections.abc import Sequence
+
+
+class PlaylistView(Sequence):
+    """A live, read-only sequence of the video ids in a playlist."""
+
+    def __init__(self, video_ids):
+        self._video_ids = video_ids
+
+    def __getitem__(self, index):
+        return self._video_ids[index]
+
+    def __len__(self):
+        return len(self._video_ids)
+
+    def __iter__(self):
+        return iter(self._video_ids)
+
+    def __contains__(self, video_id):
+        return video_id in self._video_ids
+
 
 class Playlist:
     """A class used to represent a Playlist."""
     def __init__(self, title):
         self._title = title
         self._videos = []  # ids of videos in playlist
+        self._video_set = set()  # same ids, for O(1) membership checks
+        self._events = EventBus()
 
     def add_video(self, video_id):
         """Adds a video to the playlist."""
-        if video_id not in self._videos:
+        if video_id not in self._video_set:
             self._videos.append(video_id)
+            self._video_set.add(video_id)
+            self._events.publish(events.PLAYLIST_VIDEOS_ADDED, self, (video_id,))
+
+    def add_videos(self, video_ids):
+        """Adds several videos to the playlist, skipping ones already in it.
+
+        Returns:
+            The list of video ids that were added.
+        """
+        added = []
+        for video_id in video_ids:
+            if video_id not in self._video_set:
+                self._video_set.add(video_id)
+                added.append(video_id)
+        self._videos.extend(added)
+        if added:
+            self._events.publish(events.PLAYLIST_VIDEOS_ADDED, self, added)
+        return added
 
     def contains_video(self, video_id):
         """Returns boolean indicating if video is in playlist."""
-        return video_id in self._videos
+        return video_id in self._video_set
 
     def empty(self):
         """Returns a boolean indicating if playlist is empty."""
@@ -27,15 +70,55 @@ class Playlist:
             video_id: The video_id to be removed.
         """
         self._videos.remove(video_id)
+        self._video_set.remove(video_id)
+        self._events.publish(events.PLAYLIST_VIDEOS_REMOVED, self, (video_id,))
+
+    def remove_videos(self, video_ids):
+        """Removes several videos from the playlist in a single pass.
+
+        Returns:
+            The set of video ids that were removed.
+        """
+        removed = self._video_set.intersection(video_ids)
+        if removed:
+            self._videos[:] = [
+                video_id for video_id in self._videos if video_id not in removed]
+            self._video_set -= removed
+            self._events.publish(events.PLAYLIST_VIDEOS_REMOVED, self, removed)
+        return removed
+
+    def delete(self):
+        """Releases the playlist when the player deletes it. In-memory
+        playlists hold nothing else, so there is nothing to do."""
 
     def clear(self):
         """Clears the playlist."""
+        removed = tuple(self._videos)
         self._videos.clear()
+        self._video_set.clear()
+        if removed:
+            self._events.publish(events.PLAYLIST_VIDEOS_REMOVED, self, removed)
+
+    def subscribe(self, callback):
+        """Registers a callable receiving a ChangeEvent after every change."""
+        self._events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a callable registered with subscribe()."""
+        self._events.unsubscribe(callback)
 
     @property
     def videos(self):
         """Returns the ids of videos in a playlist."""
         return self._videos.copy()
+
+    def view(self):
+        """Returns a read-only view of the ids of videos in a playlist.
+
+        Unlike the videos property this does not copy the list; the view
+        reflects later changes to the playlist.
+        """
+        return PlaylistView(self._videos)
     
     
     @property
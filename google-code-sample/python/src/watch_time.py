@@ -0,0 +1,170 @@
+"""Watch time accounting classes."""
+
+from . import playback_history
+import os
+import threading
+import time
+
+
+class WatchTimeAggregate:
+    """Cumulative play counts and watch time per video, shared by sessions.
+
+    Sessions merge their buffered counters in with merge(), which is safe to
+    call from several threads. If a path is given, the totals are loaded
+    from it and every merge appends the counters it added, one
+    "video_id | plays | seconds" line per video, so the cost of a merge
+    depends on the batch rather than on every video ever watched. Lines for
+    the same video add up; the log is compacted to one line per video when
+    it is loaded or by compact(). Only one process should write a given file.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._plays = {}
+        self._seconds = {}
+        if path is not None and os.path.exists(path):
+            if self._load():
+                self._save()
+
+    def _load(self):
+        """Adds up the lines of the file. A last line without a newline (an
+        interrupted append) is skipped.
+
+        Returns:
+            True if the file should be compacted: it repeats videos or ends
+            with an interrupted line the next append would run into.
+        """
+        lines = 0
+        with open(self._path) as totals_file:
+            for line in totals_file:
+                if not line.endswith("\n"):
+                    return True
+                video_id, plays, seconds = (field.strip() for field in line.split("|"))
+                self._plays[video_id] = self._plays.get(video_id, 0) + int(plays)
+                self._seconds[video_id] = \
+                    self._seconds.get(video_id, 0.0) + float(seconds)
+                lines += 1
+        return lines > len(self._plays.keys() | self._seconds.keys())
+
+    def merge(self, plays, seconds):
+        """Adds a batch of counters to the totals.
+
+        Args:
+            plays: {video_id: number of plays}.
+            seconds: {video_id: seconds watched}.
+        """
+        with self._lock:
+            for video_id, count in plays.items():
+                self._plays[video_id] = self._plays.get(video_id, 0) + count
+            for video_id, duration in seconds.items():
+                self._seconds[video_id] = self._seconds.get(video_id, 0.0) + duration
+            if self._path is not None:
+                with open(self._path, "a") as totals_file:
+                    totals_file.write(_format_lines(plays, seconds))
+
+    def compact(self):
+        """Rewrites the file with one line per video."""
+        if self._path is not None:
+            with self._lock:
+                self._save()
+
+    def _save(self):
+        """Writes the totals to a temporary file and renames it over the
+        previous one, so readers never see a partial file."""
+        temporary_path = f"{self._path}.tmp"
+        with open(temporary_path, "w") as totals_file:
+            totals_file.write(_format_lines(self._plays, self._seconds))
+        os.replace(temporary_path, self._path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._plays.keys() | self._seconds.keys())
+
+    def get(self, video_id):
+        """Returns (plays, seconds watched) of a video."""
+        with self._lock:
+            return self._plays.get(video_id, 0), self._seconds.get(video_id, 0.0)
+
+    def top(self, count):
+        """Returns up to count (video_id, plays, seconds) tuples, longest
+        watched first (ties broken by video id)."""
+        with self._lock:
+            video_ids = self._plays.keys() | self._seconds.keys()
+            ranked = sorted(video_ids,
+                            key=lambda video_id: (-self._seconds.get(video_id, 0.0), video_id))
+            return [(video_id, self._plays.get(video_id, 0), self._seconds.get(video_id, 0.0))
+                    for video_id in ranked[:count]]
+
+
+class WatchTimeRecorder:
+    """Turns one session's playback events into watch time.
+
+    The time between a PLAY or CONTINUE and the next PAUSE or STOP is
+    measured with a monotonic clock and added to a local buffer, which costs
+    a clock read and a couple of dict updates per event. Every batch_size
+    events the buffer is merged into the shared aggregate in one call.
+    """
+
+    def __init__(self, aggregate, batch_size=256, clock=time.monotonic):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._aggregate = aggregate
+        self._batch_size = batch_size
+        self._clock = clock
+        self._plays = {}
+        self._seconds = {}
+        self._events = 0  # since the last flush
+        self._video_id = None  # video being watched
+        self._since = None  # when the current unpaused stretch started
+
+    @property
+    def aggregate(self):
+        """Returns the WatchTimeAggregate the recorder flushes to."""
+        return self._aggregate
+
+    def record(self, video_id, event):
+        """Accounts for a playback event (a playback_history event type)."""
+        now = self._clock()
+        if self._since is not None:
+            watched = self._video_id
+            self._seconds[watched] = self._seconds.get(watched, 0.0) + now - self._since
+            self._since = None
+        if event == playback_history.PLAY:
+            self._plays[video_id] = self._plays.get(video_id, 0) + 1
+            self._video_id = video_id
+            self._since = now
+        elif event == playback_history.CONTINUE:
+            self._video_id = video_id
+            self._since = now
+        self._events += 1
+        if self._events >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """Merges the buffered counters, including the time watched so far of
+        a video that is still playing, into the aggregate."""
+        if self._since is not None:
+            now = self._clock()
+            watched = self._video_id
+            self._seconds[watched] = self._seconds.get(watched, 0.0) + now - self._since
+            self._since = now
+        if self._plays or self._seconds:
+            self._aggregate.merge(self._plays, self._seconds)
+            self._plays = {}
+            self._seconds = {}
+        self._events = 0
+
+
+def _format_lines(plays, seconds):
+    """Returns the "video_id | plays | seconds" lines of a set of counters."""
+    return "".join(
+        f"{video_id} | {plays.get(video_id, 0)} | {seconds.get(video_id, 0.0):.3f}\n"
+        for video_id in plays.keys() | seconds.keys())
+
+
+def format_duration(seconds):
+    """Returns a duration as h:mm:ss."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
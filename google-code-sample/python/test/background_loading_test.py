@@ -0,0 +1,16 @@
+from src.video_player import VideoPlayer
+
+
+def test_background_loading(capfd):
+    player = VideoPlayer(load_in_background=True)
+    player.create_playlist("my_playlist")
+    player.number_of_videos()
+    assert player.library_ready
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Successfully created new playlist: my_playlist" in lines[0]
+    assert "5 videos in the library" in lines[-1]
+
+
+def test_foreground_loading_is_ready_immediately():
+    assert VideoPlayer().library_ready
@@ -0,0 +1,53 @@
+from src.command_parser import CommandParser
+from src.video_playlist import Playlist
+from src.video_player import VideoPlayer
+
+
+def test_add_many_to_playlist(capfd):
+    player = VideoPlayer()
+    player.flag_video("funny_dogs_video_id")
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_many_to_playlist("MY_playlist", [
+        "amazing_cats_video_id", "another_cat_video_id", "funny_dogs_video_id",
+        "nothing_video_id", "does_not_exist", "another_cat_video_id"])
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Added 2 videos to MY_playlist (2 already added, 1 flagged, " \
+           "1 do not exist)" in lines[3]
+    assert lines[5:] == [
+        "\tAmazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "\tAnother Cat Video (another_cat_video_id) [#cat #animal]",
+        "\tVideo about nothing (nothing_video_id) []"]
+
+
+def test_bulk_commands_read_ids_from_file(capfd, tmp_path):
+    id_file = tmp_path / "ids.txt"
+    id_file.write_text("amazing_cats_video_id\nfunny_dogs_video_id\n")
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["CREATE_PLAYLIST", "my_playlist"])
+    parser.execute_command(
+        ["ADD_MANY_TO_PLAYLIST", "my_playlist", f"@{id_file}"])
+    parser.execute_command(
+        ["REMOVE_MANY_FROM_PLAYLIST", "my_playlist", f"@{id_file}",
+         "nothing_video_id", "does_not_exist"])
+    parser.execute_command(["ADD_MANY_TO_PLAYLIST", "other", "x"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[1:] == [
+        "Added 2 videos to my_playlist (0 already added, 0 flagged, "
+        "0 do not exist)",
+        "Removed 2 videos from my_playlist (1 not in playlist, "
+        "1 do not exist)",
+        "Cannot add videos to other: Playlist does not exist"]
+
+
+def test_playlist_view_is_live_and_read_only():
+    playlist = Playlist("my_playlist")
+    view = playlist.view()
+    playlist.add_videos(["a", "b", "c"])
+    playlist.remove_videos(["b"])
+    assert list(view) == ["a", "c"]
+    assert len(view) == 2 and view[-1] == "c" and "a" in view
+    assert not hasattr(view, "append")
@@ -0,0 +1,74 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from src import catalog_file
+from src.catalog_file import detect_compression, open_catalog
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.command_parser import CommandException, CommandParser
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_player import VideoPlayer
+
+_OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "lzma": lzma.open}
+
+
+@pytest.fixture(params=sorted(_OPENERS))
+def compressed_catalog(request, tmp_path):
+    path = tmp_path / "catalog.data"  # detection must not rely on the name
+    with open(DEFAULT_VIDEO_FILE, "rb") as plain, \
+            _OPENERS[request.param](path, "wb") as compressed:
+        compressed.write(plain.read())
+    return request.param, path
+
+
+def test_detects_and_streams_compressed_catalog(compressed_catalog):
+    compression, path = compressed_catalog
+    assert detect_compression(path) == compression
+    assert detect_compression(DEFAULT_VIDEO_FILE) is None
+    with open_catalog(path) as catalog, open(DEFAULT_VIDEO_FILE) as plain:
+        assert list(catalog) == list(plain)
+
+
+def test_libraries_load_compressed_catalog(compressed_catalog):
+    compression, path = compressed_catalog
+    library = VideoLibrary(path)
+    assert len(library) == 5
+    assert library.get_video("amazing_cats_video_id").tags == ("#cat", "#animal")
+    sqlite_library = SqliteVideoLibrary(video_file=path)
+    assert len(sqlite_library) == 5
+    sqlite_library.close()
+
+
+def test_streams_in_bounded_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_file, "_CHUNK_SIZE", 64)
+    monkeypatch.setattr(catalog_file, "_MAX_CHUNKS", 2)
+    path = tmp_path / "big.gz"
+    lines = [f"Video {number} | video_{number}_id | #tag{number % 7}\n"
+             for number in range(5000)]
+    with gzip.open(path, "wt") as compressed:
+        compressed.writelines(lines)
+    assert len(VideoLibrary(path)) == 5000
+    # Closing early stops the decompression thread even with a full queue
+    catalog = open_catalog(path)
+    assert catalog.readline() == lines[0]
+    catalog.close()
+
+
+def test_corrupt_compressed_catalog_raises(tmp_path):
+    path = tmp_path / "broken.gz"
+    path.write_bytes(gzip.compress(b"a | b | c\n" * 100)[:-5])
+    with pytest.raises(EOFError):
+        with open_catalog(path) as catalog:
+            catalog.read()
+
+
+def test_unreadable_catalog_fails_commands_not_the_session(tmp_path):
+    missing = tmp_path / "missing.txt"
+    player = VideoPlayer(load_in_background=True,
+                         library_factory=lambda: VideoLibrary(missing))
+    parser = CommandParser(player)
+    with pytest.raises(CommandException, match="Cannot load video library: "
+                                               ".*No such file"):
+        parser.execute_command(["NUMBER_OF_VIDEOS"])
@@ -0,0 +1,44 @@
+import random
+
+from fuzz.differential_fuzzer import (ENGINES, find_divergence, fuzz,
+                                      generate_commands, make_catalog,
+                                      memory_engine)
+from src.video_player import VideoPlayer
+import pytest
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_engines_match_reference_model(engine):
+    assert fuzz(ENGINES[engine], runs=5, length=150, catalog_size=12) is None
+
+
+def test_generated_commands_are_reproducible():
+    records = make_catalog(random.Random(3), 10)
+    assert records == make_catalog(random.Random(3), 10)
+    steps = generate_commands(random.Random(3), records, 50)
+    assert steps == generate_commands(random.Random(3), records, 50)
+    assert all(answer is not None for command, answer in steps
+               if command[0].startswith("SEARCH"))
+
+
+class _MiscountingPlayer(VideoPlayer):
+    """Counts only available videos, unlike the reference model."""
+
+    def number_of_videos(self):
+        print(f"{self._video_library.count_available()} videos in the library")
+
+
+def _miscounting_engine(records):
+    player = memory_engine(records)
+    player.__class__ = _MiscountingPlayer
+    return player
+
+
+def test_shrinks_failing_sequence():
+    failure = fuzz(_miscounting_engine, runs=5, length=200, catalog_size=10)
+    records, steps, (index, expected, actual) = failure
+    assert [command[0] for command, _ in steps] == ["FLAG_VIDEO", "NUMBER_OF_VIDEOS"]
+    assert index == 1
+    assert expected == ["10 videos in the library"]
+    assert actual == ["9 videos in the library"]
+    assert find_divergence(_miscounting_engine, records, steps[1:]) is None
@@ -0,0 +1,76 @@
+from src import events
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.video import Video
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_player import VideoPlayer
+from src.video_playlist import Playlist
+
+
+def _kinds(received):
+    return [(event.kind, event.video_ids) for event in received]
+
+
+def test_library_events():
+    for library in (VideoLibrary(),
+                    SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)):
+        received = []
+        library.subscribe(received.append)
+        library.set_flag_reason("funny_dogs_video_id", "reason")
+        library.set_flag_reason("funny_dogs_video_id", "")
+        library.add_video(Video("Cat Facts", "cat_facts_id", ["#cat"]))
+        library.add_video(Video("Cat Facts 2", "cat_facts_id", ["#cat"]))
+        library.remove_video("cat_facts_id")
+        library.remove_video("does_not_exist")
+        library.unsubscribe(received.append)
+        library.remove_video("nothing_video_id")
+        assert _kinds(received) == [
+            (events.VIDEO_FLAGGED, ("funny_dogs_video_id",)),
+            (events.VIDEO_UNFLAGGED, ("funny_dogs_video_id",)),
+            (events.VIDEO_ADDED, ("cat_facts_id",)),
+            (events.VIDEO_REPLACED, ("cat_facts_id",)),
+            (events.VIDEO_REMOVED, ("cat_facts_id",))]
+        assert all(event.source is library for event in received)
+
+
+def test_playlist_events():
+    playlist = Playlist("my_playlist")
+    received = []
+    playlist.subscribe(received.append)
+    playlist.add_video("a")
+    playlist.add_video("a")
+    playlist.add_videos(["b", "c"])
+    playlist.remove("a")
+    playlist.remove_videos(["b", "x"])
+    playlist.clear()
+    playlist.clear()
+    assert _kinds(received) == [
+        (events.PLAYLIST_VIDEOS_ADDED, ("a",)),
+        (events.PLAYLIST_VIDEOS_ADDED, ("b", "c")),
+        (events.PLAYLIST_VIDEOS_REMOVED, ("a",)),
+        (events.PLAYLIST_VIDEOS_REMOVED, ("b",)),
+        (events.PLAYLIST_VIDEOS_REMOVED, ("c",))]
+
+
+def test_removed_videos_leave_playlists(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "nothing_video_id")
+    player._video_library.remove_video("nothing_video_id")
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    assert out.splitlines()[-1] == "\tNo videos here yet"
+
+
+def test_replaced_videos_stay_in_playlists(capfd):
+    for library in (VideoLibrary(),
+                    SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)):
+        player = VideoPlayer(library_factory=lambda: library)
+        player.create_playlist("mix")
+        player.add_to_playlist("mix", "amazing_cats_video_id")
+        library.add_video(Video("Amazing Cats 2", "amazing_cats_video_id", ["#cat"]))
+        capfd.readouterr()
+        player.show_playlist("mix")
+        out, err = capfd.readouterr()
+        assert out.splitlines() == [
+            "Showing playlist: mix",
+            "\tAmazing Cats 2 (amazing_cats_video_id) [#cat]"]
@@ -0,0 +1,44 @@
+from src.command_parser import CommandParser
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.video import Video
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_small_and_large_result_sets_agree():
+    library = VideoLibrary()
+    for i in range(40):
+        library.add_video(Video(f"Cat {i}", f"cat_{i}", ["#cat", f"#n{i % 3}"]))
+    few = library.get_videos_with_tag("#n0")[:2]
+    many = library.get_videos_with_tag("#cat")
+    assert library.get_tag_facets(few) == [("#cat", 2), ("#n0", 2)]
+    assert library.get_tag_facets(many) == [
+        ("#cat", 42), ("#n0", 14), ("#n1", 13), ("#n2", 13), ("#animal", 2)]
+    # Many rare tags: small result sets walk their tags, large ones AND postings
+    for i in range(300):
+        library.add_video(Video(f"Rare {i}", f"rare_{i}", ["#rare", f"#r{i}"]))
+    for count in (2, 300):
+        videos = library.get_videos_with_tag("#rare")[:count]
+        assert library.get_tag_facets(videos) == sorted(
+            [("#rare", count)] + [(f"#r{i}", 1) for i in range(count)],
+            key=lambda facet: (-facet[1], facet[0]))
+    sqlite_library = SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)
+    assert sqlite_library.get_tag_facets(
+        sqlite_library.get_videos_with_tag("#animal")) == [
+            ("#animal", 3), ("#cat", 2), ("#dog", 1)]
+    sqlite_library.close()
+
+
+def test_facets_command(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["FACETS"])
+    player.query_videos_tag("#animal")
+    parser.execute_command(["FACETS"])
+    player.query_videos("nothing")
+    parser.execute_command(["FACETS"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Cannot show tag counts: No search has been made yet",
+        "Tags in the results for #animal: #animal (3), #cat (2), #dog (1)",
+        "No tags in the results for nothing"]
@@ -0,0 +1,50 @@
+import collections
+import random
+
+from src.command_parser import CommandParser
+from src.heavy_hitters import SpaceSaving
+from src.video_player import VideoPlayer
+
+
+def test_counts_are_exact_below_capacity():
+    counter = SpaceSaving(capacity=10)
+    for item in "abacabad":
+        counter.add(item)
+    assert counter.top(3) == [("a", 4), ("b", 2), ("c", 1)]
+    assert counter.estimate("a") == (4, 0)
+    assert counter.estimate("z") == (0, 0)
+
+
+def test_error_bounds_hold_when_evicting():
+    rng = random.Random(1)
+    counter = SpaceSaving(capacity=20)
+    true_counts = collections.Counter()
+    for _ in range(20000):
+        item = int(rng.paretovariate(1.2))
+        counter.add(item)
+        true_counts[item] += 1
+    assert len(counter) == 20 and counter.total == 20000
+    for item, count in true_counts.items():
+        estimate, error = counter.estimate(item)
+        if count > counter.error_bound:
+            assert count <= estimate <= count + error
+        assert error <= counter.error_bound
+    assert [item for item, _ in counter.top(3)] == [
+        item for item, _ in true_counts.most_common(3)]
+
+
+def test_top_played_across_sessions(capfd):
+    shared_counter = SpaceSaving()
+    first = VideoPlayer(play_counter=shared_counter)
+    second = VideoPlayer(play_counter=shared_counter)
+    parser = CommandParser(second)
+    parser.execute_command(["TOP_PLAYED"])
+    first.play_video("funny_dogs_video_id")
+    second.play_video("funny_dogs_video_id")
+    second.play_video("nothing_video_id")
+    capfd.readouterr()
+    parser.execute_command(["TOP_PLAYED", "1"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Top played videos:",
+        "\t1) Funny Dogs (funny_dogs_video_id) [#dog #animal] - 2 plays"]
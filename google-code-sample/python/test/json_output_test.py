@@ -0,0 +1,37 @@
+import io
+import json
+
+from src.json_output import JsonLinesCommandParser, JsonLinesVideoPlayer
+
+
+def _run(*commands):
+    stream = io.StringIO()
+    parser = JsonLinesCommandParser(JsonLinesVideoPlayer(), stream)
+    for command in commands:
+        parser.execute_command(command.split())
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_listings_are_structured():
+    records = _run("FLAG_VIDEO funny_dogs_video_id bad", "SHOW_ALL_VIDEOS",
+                   "NUMBER_OF_VIDEOS")
+    assert records[0] == {"type": "message", "text": (
+        "Successfully flagged video: Funny Dogs (reason: bad)")}
+    assert len(records) == 7
+    assert records[3] == {"type": "video", "video_id": "funny_dogs_video_id",
+                          "title": "Funny Dogs", "tags": ["#dog", "#animal"],
+                          "flag_reason": "bad"}
+    assert records[6] == {"type": "count", "videos": 5}
+
+
+def test_search_does_not_prompt_and_errors_are_records():
+    records = _run("SEARCH_VIDEOS_WITH_TAG #dog", "PLAY_RESULT 1", "PLAY",
+                   "SEARCH_VIDEOS_WITH_TAGS #dog AND", "SHOW_ALL_PLAYLISTS")
+    assert records[0] == {"type": "results", "query": "#dog", "count": 1}
+    assert records[1]["rank"] == 1
+    assert records[2] == {"type": "message",
+                          "text": "Playing video: Funny Dogs"}
+    assert records[3]["type"] == "error"
+    assert records[4] == {"type": "error",
+                          "message": "Unexpected end of query"}
+    assert len(records) == 5
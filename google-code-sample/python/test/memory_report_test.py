@@ -0,0 +1,97 @@
+import sys
+import tracemalloc
+
+import pytest
+
+from src.memory_report import (LIBRARY, PLAYLISTS, SESSION, MemoryReporter,
+                               deep_sizeof, estimate_library_size, format_bytes)
+from src.command_parser import CommandException, CommandParser
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def player():
+    player = VideoPlayer()
+    yield player
+    if player._memory_reporter:
+        player._memory_reporter.stop()
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    items = [object()] * 10
+    assert deep_sizeof(items) < deep_sizeof([object() for _ in range(10)])
+    video = Video("A", "a_id", [])
+    assert deep_sizeof([video], exclude_types=(Video,)) == sys.getsizeof([video])
+
+
+def test_report_attributes_growth(player):
+    reporter = MemoryReporter()
+    player._memory_reporter = reporter
+    rows, current, peak = reporter.report(player.memory_estimates())
+    assert [row[0] for row in rows] == [LIBRARY, PLAYLISTS, SESSION]
+    assert all(row[4] is None for row in rows)
+    assert rows[0][1] > 0
+    player.create_playlist("my_playlist")
+    player.add_many_to_playlist("my_playlist", [f"id_{i}" for i in range(100)])
+    playlist = player._playlists["my_playlist"]
+    playlist.add_videos([f"new_{i}" for i in range(100)])
+    rows, current, peak = reporter.report(player.memory_estimates())
+    assert rows[1][4] > 0
+    assert peak >= current
+
+
+def test_memory_command(capfd, player):
+    player.show_memory_report()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[0].startswith("Started tracing allocations;")
+    assert lines[1].startswith("Memory report (traced:")
+    assert [line.split(":")[0] for line in lines[2:]] == [
+        "\tlibrary", "\tplaylists", "\tsession"]
+    assert "largest seen" in lines[2]
+
+
+def test_memory_stop_ends_tracing(capfd, player):
+    parser = CommandParser(player)
+    parser.execute_command(["MEMORY"])
+    assert tracemalloc.is_tracing()
+    parser.execute_command(["MEMORY", "stop"])
+    assert not tracemalloc.is_tracing()
+    parser.execute_command(["MEMORY", "STOP"])
+    out, err = capfd.readouterr()
+    assert out.splitlines()[-2:] == [
+        "Stopped tracing allocations", "Memory tracing is not running"]
+    with pytest.raises(CommandException):
+        parser.execute_command(["MEMORY", "NOW"])
+
+
+def test_trace_memory_covers_library_load(capfd):
+    player = VideoPlayer(trace_memory=True)
+    try:
+        rows, current, peak = player._memory_reporter.report(
+            player.memory_estimates())
+        assert rows[0][2] > 0
+        player.show_memory_report()
+        out, err = capfd.readouterr()
+        assert out.startswith("Memory report (traced:")
+    finally:
+        player._memory_reporter.stop()
+
+
+def test_format_bytes():
+    assert format_bytes(12) == "12 B"
+    assert format_bytes(2048) == "2.0 KiB"
+    assert format_bytes(3 * 1024 ** 3) == "3.0 GiB"
+
+
+def test_library_estimate_counts_shared_structures_once():
+    library = VideoLibrary()
+    assert estimate_library_size(library) == deep_sizeof(library)
+    for number in range(3000):
+        library.add_video(Video(f"Video {number}", f"video_{number}_id",
+                                [f"#tag{number % 700}", "#common"],
+                                library.tag_dictionary))
+    actual = deep_sizeof(library)
+    assert 0.9 * actual < estimate_library_size(library) < 1.1 * actual
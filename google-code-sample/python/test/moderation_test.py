@@ -0,0 +1,83 @@
+from unittest import mock
+
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.moderation import (ALLOW, FLAG, ModerationException,
+                            read_moderation_rows)
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.video_library import DEFAULT_VIDEO_FILE
+from src.video_player import VideoPlayer
+
+
+def test_read_moderation_rows():
+    rows = read_moderation_rows([
+        "amazing_cats_video_id | flag | spam\n",
+        "\n",
+        "funny_dogs_video_id|ALLOW\n",
+    ])
+    assert rows == [("amazing_cats_video_id", FLAG, "spam"),
+                    ("funny_dogs_video_id", ALLOW, "")]
+    with pytest.raises(ModerationException, match="line 2: unknown action 'BAN'"):
+        read_moderation_rows(["a | FLAG | x", "b | BAN | y"])
+    with pytest.raises(ModerationException, match="line 1"):
+        read_moderation_rows(["a | FLAG | x | y"])
+
+
+def test_moderate_videos_applies_one_change(capfd):
+    player = VideoPlayer()
+    player.flag_video("funny_dogs_video_id", "old")
+    player.play_video("amazing_cats_video_id")
+    library = player._video_library
+    version = library.version
+    events = []
+    library.subscribe(events.append)
+    capfd.readouterr()
+    player.moderate_videos([
+        ("amazing_cats_video_id", FLAG, "spam"),
+        ("amazing_cats_video_id", FLAG, "again"),
+        ("funny_dogs_video_id", ALLOW, ""),
+        ("nothing_video_id", ALLOW, ""),
+        ("life_at_google_video_id", FLAG, ""),
+        ("life_at_google_video_id", ALLOW, ""),
+        ("does_not_exist", FLAG, "x"),
+    ])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Stopping video: Amazing Cats",
+        "Moderation batch applied: 2 flagged, 2 allowed, 2 skipped, 1 unknown",
+        "Unknown video ids: does_not_exist",
+    ]
+    assert library.version == version + 1
+    assert [(event.kind, set(event.video_ids)) for event in events] == [
+        ("video_flagged", {"amazing_cats_video_id"}),
+        ("video_unflagged", {"funny_dogs_video_id"}),
+    ]
+    assert library.get_video("amazing_cats_video_id").flag_reason == "spam"
+    assert not library.is_flagged("funny_dogs_video_id")
+    assert not library.is_flagged("life_at_google_video_id")
+    assert library.count_flagged() == 1
+
+
+def test_moderate_videos_command(capfd, tmp_path):
+    library = SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)
+    parser = CommandParser(VideoPlayer(library_factory=lambda: library))
+    moderation_file = tmp_path / "moderation.txt"
+    moderation_file.write_text(
+        "amazing_cats_video_id | FLAG |\nfunny_dogs_video_id | FLAG | dogs\n")
+    parser.execute_command(["MODERATE_VIDEOS", str(moderation_file)])
+    with mock.patch('builtins.input', lambda: "no"):
+        parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#dog"])
+    out, err = capfd.readouterr()
+    assert out.splitlines()[0] == \
+        "Moderation batch applied: 2 flagged, 0 allowed, 0 skipped, 0 unknown"
+    assert "No search results for #dog" in out
+    assert library.get_video("amazing_cats_video_id").flag_reason == "Not supplied"
+
+    moderation_file.write_text("amazing_cats_video_id | ALLOW |\nx | UNBAN |\n")
+    with pytest.raises(CommandException, match="line 2"):
+        parser.execute_command(["MODERATE_VIDEOS", str(moderation_file)])
+    assert library.is_flagged("amazing_cats_video_id")
+    with pytest.raises(CommandException, match="Cannot read moderation file"):
+        parser.execute_command(["MODERATE_VIDEOS", str(tmp_path / "missing")])
+    library.close()
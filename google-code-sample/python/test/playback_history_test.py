@@ -0,0 +1,56 @@
+import pytest
+
+from src import playback_history
+from src.command_parser import CommandException, CommandParser
+from src.playback_history import PlaybackHistory
+from src.video_player import VideoPlayer
+
+
+def test_history_is_bounded():
+    history = PlaybackHistory(capacity=3, clock=iter(range(10)).__next__)
+    for ordinal in range(5):
+        history.record(ordinal, playback_history.PLAY)
+    assert len(history) == 3
+    assert list(history.recent(10)) == [
+        (4, playback_history.PLAY, 4.0),
+        (3, playback_history.PLAY, 3.0),
+        (2, playback_history.PLAY, 2.0)]
+    assert list(history.recent(1)) == [(4, playback_history.PLAY, 4.0)]
+
+
+def test_recently_played_is_distinct():
+    history = PlaybackHistory()
+    for ordinal in (1, 2, 1, 3):
+        history.record(ordinal, playback_history.PLAY)
+        history.record(ordinal, playback_history.STOP)
+    assert history.recently_played(2) == [3, 1]
+    assert history.recently_played(5) == [3, 1, 2]
+
+
+def test_history_commands(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["HISTORY"])
+    player.play_video("amazing_cats_video_id")
+    player.pause_video()
+    player.play_video("funny_dogs_video_id")
+    player.play_video("amazing_cats_video_id")
+    parser.execute_command(["HISTORY", "3"])
+    parser.execute_command(["RECENTLY_PLAYED"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "No playback history yet" in lines[0]
+    assert lines[7:11] == [
+        "Playback history:",
+        "\tPlayed: Amazing Cats",
+        "\tStopped: Funny Dogs",
+        "\tPlayed: Funny Dogs"]
+    assert lines[11:] == [
+        "Recently played videos:",
+        "\t1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "\t2) Funny Dogs (funny_dogs_video_id) [#dog #animal]"]
+
+
+def test_history_rejects_bad_count():
+    with pytest.raises(CommandException):
+        CommandParser(VideoPlayer()).execute_command(["HISTORY", "zero"])
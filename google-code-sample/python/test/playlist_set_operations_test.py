@@ -0,0 +1,59 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def parser(capfd):
+    parser = CommandParser(VideoPlayer())
+    for command in (
+            ["CREATE_PLAYLIST", "a"],
+            ["CREATE_PLAYLIST", "B"],
+            ["ADD_MANY_TO_PLAYLIST", "a", "funny_dogs_video_id",
+             "amazing_cats_video_id", "nothing_video_id"],
+            ["ADD_MANY_TO_PLAYLIST", "B", "life_at_google_video_id",
+             "nothing_video_id", "another_cat_video_id"],
+            ["FLAG_VIDEO", "another_cat_video_id"]):
+        parser.execute_command(command)
+    capfd.readouterr()
+    return parser
+
+
+def _playlist_ids(parser, name):
+    return list(parser._player._playlists[name.lower()].view())
+
+
+def test_union_keeps_first_seen_order_and_skips_flagged(capfd, parser):
+    parser.execute_command(["UNION_PLAYLISTS", "both", "a", "b"])
+    out, err = capfd.readouterr()
+    assert out == ("Created playlist both with 4 videos "
+                   "(union of a, b; 1 flagged skipped)\n")
+    assert _playlist_ids(parser, "both") == [
+        "funny_dogs_video_id", "amazing_cats_video_id", "nothing_video_id",
+        "life_at_google_video_id"]
+
+
+def test_intersect_and_diff(capfd, parser):
+    parser.execute_command(["INTERSECT_PLAYLISTS", "common", "B", "a"])
+    parser.execute_command(["DIFF_PLAYLISTS", "only_a", "a", "B"])
+    parser.execute_command(["DIFF_PLAYLISTS", "only_b", "B", "a", "only_a"])
+    assert _playlist_ids(parser, "common") == ["nothing_video_id"]
+    assert _playlist_ids(parser, "only_a") == [
+        "funny_dogs_video_id", "amazing_cats_video_id"]
+    assert _playlist_ids(parser, "only_b") == ["life_at_google_video_id"]
+    out, err = capfd.readouterr()
+    assert out.splitlines()[2] == ("Created playlist only_b with 1 videos "
+                                   "(diff of B, a, only_a; 1 flagged skipped)")
+
+
+def test_combine_errors(capfd, parser):
+    parser.execute_command(["UNION_PLAYLISTS", "A", "a", "b"])
+    parser.execute_command(["UNION_PLAYLISTS", "new", "a", "missing"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Cannot create playlist A: A playlist with the same name already exists",
+        "Cannot create playlist new: Playlist missing does not exist"]
+    assert "new" not in parser._player._playlists
+    with pytest.raises(CommandException):
+        parser.execute_command(["DIFF_PLAYLISTS", "new", "a"])
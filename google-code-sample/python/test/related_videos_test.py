@@ -0,0 +1,78 @@
+from src.command_parser import CommandParser
+from src.related_videos import RelatedVideosIndex, jaccard
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.video import Video
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_similar_tag_sets_share_buckets():
+    index = RelatedVideosIndex()
+    index.add(0, [1, 2, 3, 4])
+    index.add(1, [1, 2, 3, 4])
+    index.add(2, [1, 2, 3, 5])
+    index.add(3, [7, 8, 9])
+    index.add(4, [])
+    related = index.related(0)
+    assert related[0] == (1.0, 1)
+    assert 3 not in index.candidates(0)
+    assert index.related(4) == []
+    assert index.related(0, exclude=lambda ordinal: ordinal == 1)[0][1] != 1
+
+    index.remove(1)
+    assert 1 not in index.candidates(0)
+
+
+def test_signatures_are_shared_by_equal_tag_sets():
+    index = RelatedVideosIndex()
+    index.add(0, [3, 1, 2])
+    index.add(1, [1, 2, 3])
+    index.add(2, [2])
+    assert index._band_keys[0] is index._band_keys[1]
+    assert len(index._tag_hashes) == 3
+    assert index._signature(frozenset([2])) == index._hashes(2)
+
+
+def test_library_builds_index_on_first_lookup():
+    library = VideoLibrary()
+    assert library._related_index is None
+    first = library.get_related_videos("amazing_cats_video_id", 5)
+    assert library._related_index is not None
+    library.add_video(Video("More Cats", "more_cats_video_id", ["#cat", "#animal"],
+                            library.tag_dictionary))
+    library.remove_video("another_cat_video_id")
+    related = library.get_related_videos("amazing_cats_video_id", 5)
+    assert related[0][1].video_id == "more_cats_video_id"
+    assert "another_cat_video_id" not in [video.video_id for _, video in related]
+    assert len(related) == len(first)
+
+
+def test_jaccard():
+    assert jaccard({1, 2}, {2, 3}) == 1 / 3
+    assert jaccard(set(), set()) == 0.0
+
+
+def test_related_command(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    player.flag_video("another_cat_video_id")
+    parser.execute_command(["RELATED", "amazing_cats_video_id"])
+    parser.execute_command(["RELATED", "nothing_video_id"])
+    parser.execute_command(["RELATED", "does_not_exist"])
+    parser.execute_command(["PLAY_RESULT", "1"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[1:] == [
+        "Videos related to Amazing Cats:",
+        "\t1) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "No related videos for Video about nothing",
+        "Cannot show related videos: Video does not exist",
+        "Cannot play result: No result number 1"]
+
+
+def test_sqlite_backend_related_videos():
+    library = SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)
+    related = library.get_related_videos("amazing_cats_video_id", 5)
+    assert [(similarity, video.video_id) for similarity, video in related] == [
+        (1.0, "another_cat_video_id"), (1 / 3, "funny_dogs_video_id")]
+    library.close()
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from src.search_cache import SearchCache
+from src.video_player import VideoPlayer
+
+
+def test_cache_hits_misses_and_evictions():
+    cache = SearchCache(capacity=2)
+    assert cache.get("title", "cat", 0) is None
+    cache.put("title", "cat", 0, ["a"])
+    assert cache.get("title", "CAT", 0) == ("a",)
+    cache.put("title", "dog", 0, ["b"])
+    cache.get("title", "cat", 0)
+    cache.put("tag", "#cat", 0, ["c"])  # evicts "dog", the least recently used
+    assert cache.get("title", "dog", 0) is None
+    assert cache.get("title", "cat", 0) == ("a",)
+    assert cache.stats() == {"size": 2, "capacity": 2, "hits": 3,
+                             "misses": 2, "evictions": 1}
+
+
+def test_cache_invalidated_by_version_change():
+    cache = SearchCache()
+    cache.put("title", "cat", 0, ["a"])
+    assert cache.get("title", "cat", 1) is None
+    assert len(cache) == 0
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_flagging_invalidates_cached_search(capfd):
+    player = VideoPlayer()
+    player.search_videos("cat")
+    player.search_videos("cat")
+    player.flag_video("amazing_cats_video_id")
+    player.search_videos("cat")
+    player.search_cache_stats()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" \
+        in lines[-4]
+    assert "Search cache: 1/128 entries, 1 hits, 2 misses, 0 evictions" \
+        in lines[-1]
@@ -0,0 +1,39 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.tag_query import TagQueryException
+from src.video_player import VideoPlayer
+
+
+def test_query_api_prints_nothing(capfd):
+    player = VideoPlayer()
+    results = player.query_videos("cat")
+    tag_results = player.query_videos_tag("#animal")
+    query_results = player.query_videos_tag_query("#animal AND NOT #cat")
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert results.query == "cat"
+    assert [video.title for video in results] == [
+        "Amazing Cats", "Another Cat Video"]
+    assert len(tag_results) == 3
+    assert [video.video_id for video in query_results] == [
+        "funny_dogs_video_id"]
+    with pytest.raises(TagQueryException):
+        player.query_videos_tag_query("#cat AND")
+
+
+def test_play_result(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["PLAY_RESULT", "1"])
+    player.query_videos("cat")
+    parser.execute_command(["PLAY_RESULT", "2"])
+    parser.execute_command(["PLAY_RESULT", "3"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Cannot play result: No search has been made yet",
+        "Playing video: Another Cat Video",
+        "Cannot play result: No result number 3"]
+    with pytest.raises(CommandException):
+        parser.execute_command(["PLAY_RESULT", "first"])
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+
+from src.command_parser import CommandParser
+from src.shared_catalog import SharedCatalog, SharedCatalogLibrary
+from src.tag_query import TagQuery
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _flagged_library():
+    library = VideoLibrary()
+    library.set_flag_reason("funny_dogs_video_id", "Flagged")
+    return library
+
+
+@pytest.fixture
+def catalog():
+    catalog = SharedCatalog.create(_flagged_library().videos())
+    yield catalog
+    catalog.close()
+    catalog.unlink()
+
+
+def test_attached_catalog_reads_shared_buffers(catalog):
+    worker = SharedCatalog.attach(catalog.name)
+    assert len(worker) == 5
+    video = worker.get_video("amazing_cats_video_id")
+    assert video.title == "Amazing Cats"
+    assert video.tags == ("#cat", "#animal")
+    assert worker.get_video("nothing_video_id").tags == ()
+    assert worker.get_video("does_not_exist") is None
+    assert worker.get_video("funny_dogs_video_id").flag_reason
+    assert worker.count_flagged() == 1
+    worker.close()
+
+
+def _flag_in_worker(name, video_id):
+    worker = SharedCatalog.attach(name)
+    worker.set_flagged(worker.find(video_id), True)
+    worker.close()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                    reason="needs the fork start method")
+def test_flags_are_shared_across_processes(catalog):
+    process = multiprocessing.get_context("fork").Process(
+        target=_flag_in_worker, args=(catalog.name, "nothing_video_id"))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert catalog.is_flagged(catalog.find("nothing_video_id"))
+    assert catalog.count_flagged() == 2
+
+
+_COMMANDS = (
+    ["NUMBER_OF_VIDEOS"],
+    ["SHOW_ALL_VIDEOS"],
+    ["FLAG_VIDEO", "amazing_cats_video_id", "dont_like_cats"],
+    ["SEARCH_VIDEOS_WITH_TAG", "#CAT"],
+    ["SEARCH_VIDEOS", "video"],
+    ["SEARCH_VIDEOS_WITH_TAG", "#dog"],
+    ["PLAY", "amazing_cats_video_id"],
+    ["PLAY", "life_at_google_video_id"],
+    ["SHOW_PLAYING"],
+    ["ALLOW_VIDEO", "amazing_cats_video_id"],
+    ["SEARCH_VIDEOS_WITH_TAG", "#cat"],
+    ["CREATE_PLAYLIST", "mix"],
+    ["ADD_TO_PLAYLIST", "mix", "funny_dogs_video_id"],
+    ["SHOW_PLAYLIST", "mix"],
+    ["SHOW_ALL_VIDEOS"],
+)
+
+
+def _outputs(capfd, player):
+    parser = CommandParser(player)
+    outputs = []
+    for command in _COMMANDS:
+        with mock.patch("builtins.input", return_value="no"):
+            parser.execute_command(command)
+        outputs.append(capfd.readouterr().out)
+    return outputs
+
+
+def test_library_adapter_matches_video_library(capfd, catalog):
+    expected = _outputs(capfd, VideoPlayer(library_factory=_flagged_library))
+    library = SharedCatalogLibrary.attach(catalog.name)
+    actual = _outputs(capfd, VideoPlayer(library_factory=lambda: library))
+    library.close()
+    assert actual == expected
+
+
+def test_library_adapter_tag_queries_and_related(catalog):
+    library = SharedCatalogLibrary(catalog)
+    reference = _flagged_library()
+    query = TagQuery("#animal AND NOT #dog")
+    assert [video.video_id for video in library.query_tags(query)] == \
+        [video.video_id for video in reference.query_tags(query)]
+    assert [(similarity, video.video_id) for similarity, video
+            in library.get_related_videos("amazing_cats_video_id", 3)] == \
+        [(similarity, video.video_id) for similarity, video
+         in reference.get_related_videos("amazing_cats_video_id", 3)]
+    videos = library.search_titles("video")
+    assert library.get_tag_facets(videos) == reference.get_tag_facets(videos)
+
+
+def test_library_adapter_sees_flags_of_other_processes(catalog):
+    library = SharedCatalogLibrary(catalog)
+    version = library.version
+    assert len(library.search_titles("nothing", exclude_flagged=True)) == 1
+    worker = SharedCatalog.attach(catalog.name)
+    worker.set_flagged(worker.find("nothing_video_id"), True)
+    worker.close()
+    assert library.version != version
+    assert library.search_titles("nothing", exclude_flagged=True) == []
+    assert library.get_video("nothing_video_id").flag_reason == "Flagged"
+
+
+_WORKER = """
+import sys
+from src.shared_catalog import SharedCatalog
+
+worker = SharedCatalog.attach(sys.argv[1])
+worker.set_flagged(worker.find(sys.argv[2]), True)
+worker.close()
+"""
+
+
+def test_catalog_outlives_independent_workers(catalog):
+    for video_id in ("nothing_video_id", "life_at_google_video_id"):
+        finished = subprocess.run(
+            [sys.executable, "-c", _WORKER, catalog.name, video_id],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True)
+        assert finished.returncode == 0, finished.stderr
+        assert finished.stderr == ""
+    assert catalog.count_flagged() == 3
+    reader = SharedCatalog.attach(catalog.name)
+    assert reader.count_flagged() == 3
+    reader.close()
@@ -0,0 +1,140 @@
+from unittest import mock
+
+import pytest
+
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.video import Video
+from src.tag_query import TagQuery
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def library():
+    library = SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)
+    yield library
+    library.close()
+
+
+def test_imports_catalog(library):
+    assert len(library.get_all_videos()) == 5
+    video = library.get_video("amazing_cats_video_id")
+    assert video.title == "Amazing Cats"
+    assert video.tags == ("#cat", "#animal")
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("does_not_exist") is None
+
+
+def test_import_keeps_last_row_of_repeated_id(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text("A | x | #a\nB | x | #b\nC | y |\n")
+    library = SqliteVideoLibrary(video_file=catalog)
+    assert len(library) == 2
+    video = library.get_video("x")
+    assert (video.title, video.tags) == ("B", ("#b",))
+    assert library.get_videos_with_tag("#a") == []
+    library.close()
+
+
+def test_tag_spellings_match_the_memory_backend(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text("A | a | #Cat\nB | b | #cat\nC | c | #CAT, #dog\n")
+    library = SqliteVideoLibrary(video_file=catalog)
+    memory_library = VideoLibrary(catalog)
+    for video_id in "abc":
+        assert library.get_video(video_id).tags == \
+            memory_library.get_video(video_id).tags
+    for tag in ("#cat", "#CAT", "#Cat"):
+        assert [video.video_id for video in library.get_videos_with_tag(tag)] == \
+            [video.video_id for video in memory_library.get_videos_with_tag(tag)] \
+            == ["b"]
+    query = TagQuery("#CAT AND NOT #dog")
+    assert [video.video_id for video in library.query_tags(query)] == ["a", "b"]
+    assert library.get_tag_facets(library.get_all_videos()) == \
+        memory_library.get_tag_facets(memory_library.get_all_videos())
+    library.close()
+
+
+def test_searches_and_flags(library):
+    library.set_flag_reason("another_cat_video_id", "dont_like_cats")
+    assert library.count_flagged() == 1
+    assert library.is_flagged("another_cat_video_id")
+    titles = [video.title for video in library.search_titles("CAT")]
+    assert titles == ["Amazing Cats", "Another Cat Video"]
+    titles = [video.title for video in
+              library.search_titles("at", exclude_flagged=True)]
+    assert titles == ["Amazing Cats", "Life at Google"]
+    ids = [video.video_id for video in
+           library.get_videos_with_tag("#Cat", exclude_flagged=True)]
+    assert ids == ["amazing_cats_video_id"]
+
+
+def test_add_and_remove_video(library):
+    library.add_video(Video("Cat Facts", "cat_facts_id", ["#cat", "#facts"]))
+    assert [video.video_id for video in library.get_videos_with_tag("#facts")] \
+        == ["cat_facts_id"]
+    assert library.remove_video("cat_facts_id").title == "Cat Facts"
+    assert library.search_titles("facts") == []
+    assert library.get_videos_with_tag("#facts") == []
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_player_with_sqlite_backend(capfd, library):
+    player = VideoPlayer(library_factory=lambda: library,
+                         playlist_factory=library.create_playlist)
+    player.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.show_playlist("my_playlist")
+    player.search_videos_tag_query("#animal AND NOT #cat")
+    player.play_random_video()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[:6] == [
+        "Successfully flagged video: Funny Dogs (reason: dont_like_dogs)",
+        "Successfully created new playlist: my_playlist",
+        "Added video to my_playlist: Amazing Cats",
+        "Cannot add video to my_playlist: Video is currently flagged "
+        "(reason: dont_like_dogs)",
+        "Showing playlist: my_playlist",
+        "\tAmazing Cats (amazing_cats_video_id) [#cat #animal]"]
+    assert "No search results for #animal AND NOT #cat" in lines[6]
+    assert "Playing video: Funny Dogs" not in lines[7]
+
+
+def test_videos_view(library):
+    videos = library.videos()
+    assert len(library) == len(videos) == 5
+    assert [video.video_id for video in videos] == [
+        video.video_id for video in library.get_all_videos()]
+
+
+def test_playlists_survive_restart(capfd, tmp_path):
+    database = str(tmp_path / "catalog.db")
+    library = SqliteVideoLibrary(database, video_file=DEFAULT_VIDEO_FILE)
+    player = VideoPlayer(library_factory=lambda: library,
+                         playlist_factory=library.create_playlist)
+    player.create_playlist("My_Mix")
+    player.add_to_playlist("my_mix", "funny_dogs_video_id")
+    player.add_to_playlist("my_mix", "amazing_cats_video_id")
+    player.create_playlist("gone")
+    player.delete_playlist("gone")
+    library.close()
+
+    library = SqliteVideoLibrary(database)
+    player = VideoPlayer(library_factory=lambda: library,
+                         playlist_factory=library.create_playlist)
+    capfd.readouterr()
+    player.show_all_playlists()
+    player.show_playlist("my_mix")
+    player.create_playlist("MY_MIX")
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Showing all playlists:",
+        "\tMy_Mix",
+        "Showing playlist: my_mix",
+        "\tFunny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "\tAmazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Cannot create playlist: A playlist with the same name already exists"]
+    library.close()
@@ -0,0 +1,29 @@
+from src.tag_dictionary import TagDictionary
+from src.video import Video
+from src.video_library import VideoLibrary
+
+
+def test_encode_and_decode():
+    tags = TagDictionary()
+    ids = tags.encode(["#cat", "#animal", "#cat", "#Cat"])
+    assert list(ids) == [0, 1, 0, 2]
+    assert tags.decode(ids) == ("#cat", "#animal", "#cat", "#Cat")
+    assert tags.get_ids("#CAT") == (0, 2)
+    assert tags.get_ids("#dog") == ()
+    assert len(tags) == 3
+
+
+def test_library_shares_tag_ids():
+    library = VideoLibrary()
+    cats = library.get_video("amazing_cats_video_id")
+    other_cats = library.get_video("another_cat_video_id")
+    assert cats.tag_ids == other_cats.tag_ids
+    assert cats.tag_dictionary is library.tag_dictionary
+    assert len(library.tag_dictionary) == 5
+
+
+def test_video_from_other_dictionary_is_reindexed():
+    library = VideoLibrary()
+    library.add_video(Video("Cat Facts", "cat_facts_id", ["#cat", "#facts"]))
+    ids = {video.video_id for video in library.get_videos_with_tag("#cat")}
+    assert "cat_facts_id" in ids
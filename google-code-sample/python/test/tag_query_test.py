@@ -0,0 +1,88 @@
+from unittest import mock
+
+import pytest
+
+from src.tag_dictionary import TagDictionary
+from src.tag_index import TagIndex, bits_from_ordinals, iter_bits
+from src.tag_query import TagQuery, TagQueryException
+from src.video_player import VideoPlayer
+
+
+def _evaluate(expression, index):
+    return set(iter_bits(TagQuery(expression).evaluate(index.postings,
+                                                       index.universe)))
+
+
+def test_tag_query_operators():
+    tags = TagDictionary()
+    index = TagIndex(tags)
+    index.add(0, tags.encode(["#cat", "#animal"]))
+    index.add(1, tags.encode(["#dog", "#animal"]))
+    index.add(2, tags.encode(["#cat", "#dog"]))
+    index.add(3, [])
+    assert _evaluate("#cat", index) == {0, 2}
+    assert _evaluate("#cat AND #animal", index) == {0}
+    assert _evaluate("#animal and not #dog", index) == {0}
+    assert _evaluate("#cat OR #dog AND #animal", index) == {0, 1, 2}
+    assert _evaluate("(#cat OR #dog) AND NOT #animal", index) == {2}
+    assert _evaluate("NOT #cat", index) == {1, 3}
+    assert _evaluate("#bird", index) == set()
+
+
+def test_tag_index_remove():
+    tags = TagDictionary()
+    index = TagIndex(tags)
+    index.add(0, tags.encode(["#cat"]))
+    index.add(1, tags.encode(["#cat"]))
+    index.remove(0, tags.encode(["#cat"]))
+    assert list(iter_bits(index.postings("#cat"))) == [1]
+    assert list(iter_bits(index.universe)) == [1]
+
+
+def test_tag_index_add_many_matches_single_adds():
+    tags = TagDictionary()
+    entries = [(ordinal, tags.encode(["#cat", "#dog", "#bird"][:ordinal % 4]))
+               for ordinal in range(0, 200, 3)]
+    single = TagIndex(tags)
+    for ordinal, tag_ids in entries:
+        single.add(ordinal, tag_ids)
+    bulk = TagIndex(tags)
+    bulk.add(1, tags.encode(["#cat"]))
+    bulk.add_many(entries)
+    assert bulk.universe == single.universe | 2
+    assert bulk.postings("#cat") == single.postings("#cat") | 2
+    assert bulk.postings("#dog") == single.postings("#dog")
+    assert bulk.facet_counts(bulk.universe) == {
+        tag_id: count + (tag_id == tags.get_ids("#cat")[0])
+        for tag_id, count in single.facet_counts(single.universe).items()}
+
+
+@pytest.mark.parametrize("expression", [
+    "", "#cat AND", "cat", "(#cat", "#cat #dog", "AND #cat", "#cat)"])
+def test_malformed_tag_query(expression):
+    with pytest.raises(TagQueryException):
+        TagQuery(expression)
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_search_videos_with_tags(capfd):
+    player = VideoPlayer()
+    player.flag_video("another_cat_video_id")
+    player.search_videos_tag_query("#animal AND NOT #dog")
+    player.search_videos_tag_query("#cat AND #dog")
+    player.search_videos_tag_query("#cat AND")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 7
+    assert "Here are the results for #animal AND NOT #dog:" in lines[1]
+    assert "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[2]
+    assert "No search results for #cat AND #dog" in lines[5]
+    assert "Cannot search videos: Unexpected end of query" in lines[6]
+
+
+def test_iter_bits_decodes_large_bitsets():
+    ordinals = list(range(0, 320_000, 2)) + [320_001, 400_000]
+    bits = bits_from_ordinals(ordinals)
+    assert list(iter_bits(bits)) == ordinals
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b1011)) == [0, 1, 3]
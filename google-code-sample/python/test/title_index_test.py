@@ -0,0 +1,71 @@
+from unittest import mock
+
+from src.sqlite_video_library import SqliteVideoLibrary
+from src.title_index import TitleIndex, compile_title_pattern
+from src.video import Video
+from src.video_library import DEFAULT_VIDEO_FILE
+from src.video_player import VideoPlayer
+
+
+def _titles(index, pattern, glob=False):
+    return [video.title for video in
+            index.search(compile_title_pattern(pattern, glob))]
+
+
+def test_regex_and_glob_search():
+    index = TitleIndex([Video("Amazing Cats", "a", []),
+                        Video("Funny Dogs", "b", []),
+                        Video("Cat Facts", "c", [])])
+    assert _titles(index, "cats?") == ["Amazing Cats", "Cat Facts"]
+    assert _titles(index, "^cat") == ["Cat Facts"]
+    assert _titles(index, "s$") == ["Amazing Cats", "Funny Dogs", "Cat Facts"]
+    assert _titles(index, "*cat*", glob=True) == ["Amazing Cats", "Cat Facts"]
+    assert _titles(index, "cat", glob=True) == []
+    assert _titles(index, "[!a]*", glob=True) == ["Funny Dogs", "Cat Facts"]
+    assert _titles(index, "?unny dogs", glob=True) == ["Funny Dogs"]
+
+
+def test_matches_never_span_titles():
+    index = TitleIndex([Video("Amazing Cats", "a", []),
+                        Video("Funny Dogs", "b", [])])
+    assert _titles(index, r"cats\sfunny") == []
+    assert _titles(index, r"cats\s*") == ["Amazing Cats"]
+
+
+def test_boundary_sensitive_patterns_match_each_title():
+    index = TitleIndex([Video("Amazing Cats", "a", []),
+                        Video("Another Cat", "b", []),
+                        Video("Funny Dogs", "c", [])])
+    assert _titles(index, r"\Aan") == ["Another Cat"]
+    assert _titles(index, r"s\Z") == ["Amazing Cats", "Funny Dogs"]
+    assert _titles(index, r"(?<!\w)funny") == ["Funny Dogs"]
+    assert _titles(index, r"cats(?=\s)") == []
+    assert _titles(index, r"s(?!\s)") == ["Amazing Cats", "Funny Dogs"]
+
+
+def test_backends_agree():
+    sqlite_library = SqliteVideoLibrary(video_file=DEFAULT_VIDEO_FILE)
+    player = VideoPlayer()
+    for pattern in ("^[a-l]", r"\Aanother", r"video\Z", r"(?<=a)t", r"s(?!\s)"):
+        sqlite_titles = [video.title for video in
+                         sqlite_library.search_title_pattern(
+                             compile_title_pattern(pattern))]
+        assert sorted(sqlite_titles) == [
+            video.title for video in player.query_videos_matching(pattern)]
+    assert [video.title for video in player.query_videos_matching(r"\Aanother")] \
+        == ["Another Cat Video"]
+    sqlite_library.close()
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_search_videos_matching(capfd):
+    player = VideoPlayer()
+    player.search_videos_matching("*o*", glob=True)
+    player.search_videos_matching("(")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Here are the results for *o*:" in lines[0]
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" \
+        in lines[1]
+    assert len(lines) == 8
+    assert lines[7].startswith("Cannot search videos: Invalid pattern")
@@ -0,0 +1,68 @@
+import io
+from unittest import mock
+
+from src.command_parser import CommandParser
+from src.transcript import (TranscriptRecorder, read_transcript,
+                            replay_transcript)
+from src.json_output import JsonLinesCommandParser, JsonLinesVideoPlayer
+from src.replay import _new_parser
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@mock.patch('builtins.input', lambda *args: '1')
+def test_record_and_replay(capfd):
+    transcript = io.StringIO()
+    recorder = TranscriptRecorder(CommandParser(VideoPlayer()), transcript,
+                                  clock=iter(range(10)).__next__)
+    recorder.execute_command(["SEARCH_VIDEOS", "cat"])
+    recorder.execute_command(["PLAY"])
+    recorder.execute_command(["SHOW_PLAYING"])
+    out, err = capfd.readouterr()
+    assert "Playing video: Amazing Cats" in out
+    assert "Please enter PLAY command followed by video_id." in out
+
+    transcript.seek(0)
+    records = read_transcript(transcript)
+    assert [record["t"] for record in records] == [1, 2, 3]
+    assert records[0]["in"] == ["1"]
+    assert records[2]["out"] == ("Currently playing: Amazing Cats "
+                                 "(amazing_cats_video_id) [#cat #animal]\n")
+
+    report = replay_transcript(records, CommandParser(VideoPlayer()))
+    assert report.commands == 3
+    assert report.divergences == []
+    assert report.percentile(1.0) == max(report.latencies)
+
+    records[1]["out"] = "something else\n"
+    report = replay_transcript(records, CommandParser(VideoPlayer()))
+    assert [index for index, _, _ in report.divergences] == [1]
+    assert "1 commands produced different output" in str(report)
+
+
+def test_replay_at_scaled_speed():
+    records = [{"t": 0, "cmd": ["STOP"], "out": ""},
+               {"t": 4, "cmd": ["STOP"], "out": ""}]
+    clock = iter([0, 0, 0, 0, 1, 2, 2, 2]).__next__
+    delays = []
+    replay_transcript(records, CommandParser(VideoPlayer()), speed=2.0,
+                      clock=clock, sleep=delays.append)
+    assert delays == [1.0]
+
+
+def test_replay_with_recorded_catalog_and_mode(tmp_path):
+    catalog = tmp_path / "catalog.txt"
+    catalog.write_text("Cat Facts | cat_facts_id | #cat\n")
+    transcript = io.StringIO()
+    player = JsonLinesVideoPlayer(library_factory=lambda: VideoLibrary(catalog))
+    recorder = TranscriptRecorder(JsonLinesCommandParser(player), transcript)
+    recorder.execute_command(["SHOW_ALL_VIDEOS"])
+    recorder.execute_command(["PLAY", "cat_facts_id"])
+    transcript.seek(0)
+    records = read_transcript(transcript)
+    assert '"video_id":"cat_facts_id"' in records[0]["out"]
+
+    report = replay_transcript(records, _new_parser(catalog, json_output=True))
+    assert report.divergences == []
+    report = replay_transcript(records, _new_parser(catalog))
+    assert len(report.divergences) == 2
@@ -0,0 +1,43 @@
+from src import events
+from src.video import Video, render_videos
+from src.video_library import VideoLibrary
+
+
+def test_str_is_cached_until_flag_changes():
+    video = Video("Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"])
+    first = str(video)
+    assert first == "Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+    assert str(video) is first
+
+    video.flag_reason = "dont_like_cats"
+    assert str(video) == ("Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+                          " - FLAGGED (reason: dont_like_cats)")
+
+    video.flag_reason = ""
+    assert str(video) == first
+
+
+def test_render_videos():
+    videos = [Video("A", "a_id", ["#x"]), Video("B", "b_id", [])]
+    assert render_videos(videos) == "\tA (a_id) [#x]\n\tB (b_id) []"
+    assert render_videos(videos, numbered=True) == \
+        "\t1) A (a_id) [#x]\n\t2) B (b_id) []"
+    assert render_videos([]) == ""
+
+
+def test_flag_reason_of_library_video_goes_through_the_library():
+    library = VideoLibrary()
+    changes = []
+    library.subscribe(changes.append)
+    version = library.version
+    video = library.get_video("amazing_cats_video_id")
+    video.flag_reason = "dont_like_cats"
+    assert library.is_flagged("amazing_cats_video_id")
+    assert library.version != version
+    assert [change.kind for change in changes] == [events.VIDEO_FLAGGED]
+    assert video not in library.search_titles("cats", exclude_flagged=True)
+
+    removed = library.remove_video("amazing_cats_video_id")
+    removed.flag_reason = ""
+    assert removed.flag_reason == ""
+    assert len(changes) == 2
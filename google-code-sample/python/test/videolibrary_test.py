@@ -1,3 +1,4 @@
+from src.video import Video
 from src.video_library import VideoLibrary
 
 
@@ -24,3 +25,49 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_flag_mask_tracks_flag_changes():
+    library = VideoLibrary()
+    library.set_flag_reason("amazing_cats_video_id", "dont_like_cats")
+    library.set_flag_reason("funny_dogs_video_id", "dont_like_dogs")
+    library.set_flag_reason("funny_dogs_video_id", "")
+
+    assert library.is_flagged("amazing_cats_video_id")
+    assert not library.is_flagged("funny_dogs_video_id")
+    assert library.count_flagged() == 1
+    assert library.count_available() == 4
+    assert library.flagged_bits == \
+        1 << library.get_ordinal("amazing_cats_video_id")
+    cat_videos = library.get_videos_with_tag("#CAT", exclude_flagged=True)
+    assert [video.video_id for video in cat_videos] == ["another_cat_video_id"]
+
+
+def test_random_available_video_skips_flagged_and_removed():
+    library = VideoLibrary()
+    for video in library.get_all_videos():
+        if video.video_id != "nothing_video_id":
+            library.set_flag_reason(video.video_id, "reason")
+    assert library.get_random_available_video().video_id == "nothing_video_id"
+
+    library.remove_video("nothing_video_id")
+    assert library.get_random_available_video() is None
+    assert library.count_flagged() == 4
+
+
+def test_videos_view_is_live():
+    library = VideoLibrary()
+    videos = library.videos()
+    assert len(library) == len(videos) == 5
+    library.remove_video("nothing_video_id")
+    assert len(library) == len(videos) == 4
+    assert "nothing_video_id" not in {video.video_id for video in videos}
+
+
+def test_tag_search_matches_the_lower_case_spelling_only():
+    library = VideoLibrary()
+    library.add_video(Video("Upper Cat", "upper_cat_id", ["#Cat"],
+                            library.tag_dictionary))
+    cat_ids = [video.video_id for video in library.get_videos_with_tag("#CAT")]
+    assert cat_ids == ["amazing_cats_video_id", "another_cat_video_id"]
+    assert library.get_videos_with_tag("#Cat") == library.get_videos_with_tag("#cat")
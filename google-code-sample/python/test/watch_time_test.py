@@ -0,0 +1,94 @@
+from src import playback_history
+from src.command_parser import CommandParser
+from src.watch_time import (WatchTimeAggregate, WatchTimeRecorder,
+                            format_duration)
+from src.video_player import VideoPlayer
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_recorder_measures_unpaused_time():
+    clock = _Clock()
+    aggregate = WatchTimeAggregate()
+    recorder = WatchTimeRecorder(aggregate, clock=clock)
+    for advance, video_id, event in (
+            (0, "a", playback_history.PLAY),
+            (10, "a", playback_history.PAUSE),
+            (50, "a", playback_history.CONTINUE),
+            (5, "a", playback_history.STOP),
+            (7, "b", playback_history.PLAY),
+            (3, "b", playback_history.STOP),
+            (1, "a", playback_history.PLAY)):
+        clock.now += advance
+        recorder.record(video_id, event)
+    assert aggregate.get("a") == (0, 0.0)  # nothing flushed yet
+    clock.now += 4
+    recorder.flush()
+    assert aggregate.get("a") == (2, 19.0)
+    assert aggregate.get("b") == (1, 3.0)
+    clock.now += 2
+    recorder.record("a", playback_history.STOP)
+    recorder.flush()
+    assert aggregate.get("a") == (2, 21.0)
+
+
+def test_batches_flush_to_shared_aggregate_and_file(tmp_path):
+    clock = _Clock()
+    path = tmp_path / "watch_time.txt"
+    aggregate = WatchTimeAggregate(path)
+    sessions = [WatchTimeRecorder(aggregate, batch_size=2, clock=clock)
+                for _ in range(2)]
+    for recorder in sessions:
+        recorder.record("a", playback_history.PLAY)
+        clock.now += 30
+        recorder.record("a", playback_history.STOP)
+    assert aggregate.get("a") == (2, 60.0)
+    assert path.read_text() == "a | 1 | 30.000\n" * 2
+    assert WatchTimeAggregate(path).top(5) == [("a", 2, 60.0)]
+    # Loading compacted the log
+    assert path.read_text() == "a | 2 | 60.000\n"
+
+
+def test_file_skips_interrupted_append(tmp_path):
+    path = tmp_path / "watch_time.txt"
+    path.write_text("a | 2 | 60.000\nb | 1 | 3.000\na | 1 | 1")
+    aggregate = WatchTimeAggregate(path)
+    assert aggregate.top(5) == [("a", 2, 60.0), ("b", 1, 3.0)]
+    assert path.read_text().endswith("\n")
+    aggregate.merge({"b": 1}, {"b": 2.0})
+    aggregate.compact()
+    assert sorted(path.read_text().splitlines()) == [
+        "a | 2 | 60.000", "b | 2 | 5.000"]
+
+
+def test_watch_time_command(capfd):
+    clock = _Clock()
+    player = VideoPlayer()
+    player._watch_time = WatchTimeRecorder(WatchTimeAggregate(), clock=clock)
+    parser = CommandParser(player)
+    parser.execute_command(["WATCH_TIME"])
+    parser.execute_command(["PLAY", "amazing_cats_video_id"])
+    clock.now += 3725
+    parser.execute_command(["PLAY", "funny_dogs_video_id"])
+    clock.now += 65
+    parser.execute_command(["PAUSE"])
+    clock.now += 1000
+    parser.execute_command(["WATCH_TIME", "5"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[0] == "No videos have been played yet"
+    assert lines[-3:] == [
+        "Most watched videos:",
+        "\t1) Amazing Cats (amazing_cats_video_id) [#cat #animal] - 1:02:05 over 1 plays",
+        "\t2) Funny Dogs (funny_dogs_video_id) [#dog #animal] - 0:01:05 over 1 plays"]
+
+
+def test_format_duration():
+    assert format_duration(0.4) == "0:00:00"
+    assert format_duration(3600 * 25 + 61) == "25:01:01"